@@ -1,58 +1,243 @@
 # ==========================================
 # BREAST CANCER MODEL TRAINER (CSV EDITION)
 # ==========================================
+import argparse
+import time
+
 import pandas as pd
 import numpy as np
 import joblib
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import cross_val_predict
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score, confusion_matrix
+
+from bootstrap import N_RESAMPLES, bootstrap_counts, print_intervals
+from compact_model import COMPACT_MODEL_FILE, export_compact_model
+from dataset_cache import open_dataset
+from drift_monitor import DRIFT_REFERENCE_FILE, DriftReference
+from evaluation import MIN_RECALL, evaluate, print_report, recall_operating_point, threshold_curve
+from instrumentation import REPORT_FILE, StageRecorder
+from model_registry import MODELS_DIR, REGRESSION_TOLERANCE, ModelRegistry, holdout_regressions
+from scoring import FEATURES, MODEL_FILE, THRESHOLD_ATTRIBUTE, load_model, model_threshold
+from split import is_test
+from streaming_train import CHUNK_SIZE, EPOCHS, read_chunks, split_cutoffs, train_streaming
 
 print("============================================================")
 print("BREAST CANCER ML MODEL TRAINING")
 print("============================================================")
 
-# 1. Load Data (DIRECTLY FROM CSV)
-# This bypasses the database error
-try:
-    print("Step 1: Loading data from 'data.csv'...")
-    df = pd.read_csv('data.csv')
-    print(f"   SUCCESS: Loaded {len(df)} rows.")
-except FileNotFoundError:
-    print("   ERROR: 'data.csv' not found. Make sure it is in this folder.")
-    exit()
-
-# 2. Preprocessing
-# Fix columns and encode M/B to 1/0
-print("Step 2: Preprocessing...")
-df.columns = df.columns.str.replace(' ', '_')
-y = df['diagnosis'].map({'M': 1, 'B': 0})
+parser = argparse.ArgumentParser(description="Train the breast cancer model.")
+parser.add_argument('--data', default='data.csv', help="Training CSV (default: data.csv)")
+parser.add_argument('--streaming', action='store_true',
+                    help="Out-of-core training: read the CSV in chunks instead of all at once (for files larger than RAM)")
+parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows per chunk with --streaming")
+parser.add_argument('--epochs', type=int, default=EPOCHS, help="Passes over the data with --streaming")
+parser.add_argument('--min-recall', type=float, default=MIN_RECALL,
+                    help="Recall the stored decision threshold must keep (default: 0.98)")
+parser.add_argument('--bootstrap', type=int, default=N_RESAMPLES,
+                    help="Bootstrap resamples for the confidence intervals (0 = skip)")
+parser.add_argument('--no-cache', action='store_true',
+                    help="Parse the CSV directly instead of using the columnar cache in .dataset_cache/")
+parser.add_argument('--report', nargs='?', const=REPORT_FILE,
+                    help=f"Time every step (wall, CPU, peak memory, rows) and save a JSON run report (default: {REPORT_FILE})")
+parser.add_argument('--profile-stages', metavar='DIR', help="With --report: also cProfile each step into DIR")
+parser.add_argument('--warm-start', action='store_true',
+                    help="Retrain starting from the deployed model's coefficients; keep the deployed model "
+                         "if the new one scores worse on the holdout")
+parser.add_argument('--regression-tolerance', type=float, default=REGRESSION_TOLERANCE,
+                    help=f"With --warm-start: how far a holdout metric may drop before the new model is rejected "
+                         f"(default: {REGRESSION_TOLERANCE})")
+parser.add_argument('--compare-cold', action='store_true',
+                    help="With --warm-start: also fit from scratch and report the iterations and time the warm start saved")
+parser.add_argument('--models-dir', default=MODELS_DIR,
+                    help=f"Where model versions are kept (default: {MODELS_DIR}/, see model_registry.py)")
+args = parser.parse_args()
+if args.warm_start and args.streaming:
+    parser.error("--warm-start works with the in-memory trainer only (not with --streaming)")
+
+# Off unless asked for: a disabled recorder costs nothing measurable
+recorder = StageRecorder('train', enabled=bool(args.report), profile_dir=args.profile_stages)
 
 # Select Features (Must match what we use in the App)
-features = ['radius_mean', 'texture_mean', 'perimeter_mean', 'area_mean', 'smoothness_mean', 'concavity_mean']
-X = df[features]
+features = FEATURES
+
+# Every run saves a new model version; an unversioned deployed model is kept as a version first
+registry = ModelRegistry(args.models_dir)
+registry.import_deployed()
+previous, previous_version, fit_stats, holdout, previous_holdout = None, None, None, None, None
+if args.warm_start:
+    current = registry.current()
+    if current is None:
+        print("   NOTE: No previous model to warm-start from - training from scratch")
+    else:
+        previous_version = current['version']
+        previous = load_model(registry.path(previous_version, MODEL_FILE))
+        if list(getattr(previous, 'feature_names_in_', [])) != features or not hasattr(previous, 'coef_'):
+            print(f"   NOTE: v{previous_version:04d} was trained on other inputs - training from scratch")
+            previous = None
+
+if args.streaming:
+    # Steps 1-5 without ever holding the whole file in memory (see streaming_train.py)
+    print(f"Steps 1-4: Streaming '{args.data}' in chunks of {args.chunk_size:,} rows ({args.epochs} epochs)...")
+    with recorder.stage('train_streaming'):
+        cutoffs = split_cutoffs(args.data, args.chunk_size)
+        model, acc, cm = train_streaming(args.data, features, args.chunk_size, args.epochs, cutoffs=cutoffs,
+                                         min_recall=args.min_recall)
+    print(f"Step 5: Evaluated on the held-out test rows (20%, picked by id hash) at threshold "
+          f"{model_threshold(model):.3g}")
+    # One more pass: what the training inputs looked like, for drift monitoring (drift_monitor.py)
+    with recorder.stage('drift_reference'):
+        drift_reference = DriftReference.from_chunks(
+            (X[~test] for X, _, test, _ in read_chunks(args.data, features, cutoffs, args.chunk_size)), features)
+
+else:
+    # 1. Load Data (DIRECTLY FROM CSV)
+    # This bypasses the database error
+    try:
+        print(f"Step 1: Loading data from '{args.data}'...")
+        recorder.start('load')
+        if args.no_cache:
+            df = pd.read_csv(args.data)
+        else:
+            # Parsed once into typed columns (see dataset_cache.py); later runs memory-map them
+            df = open_dataset(args.data).to_frame(['id', 'diagnosis'] + features)
+        recorder.stop(rows=len(df))
+        print(f"   SUCCESS: Loaded {len(df)} rows.")
+    except FileNotFoundError:
+        print(f"   ERROR: '{args.data}' not found. Make sure it is in this folder.")
+        exit()
+
+    # 2. Preprocessing
+    # Fix columns and encode M/B to 1/0
+    print("Step 2: Preprocessing...")
+    recorder.start('preprocess', rows=len(df))
+    df.columns = df.columns.str.replace(' ', '_')
+    y = (df['diagnosis'] == 'M').astype(int)
+
+    X = df[features]
+    recorder.stop()
 
-# 3. Split Data
-print("Step 3: Splitting Data (80% Train / 20% Test)...")
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # 3. Split Data
+    # By a salted hash of the id, cut per diagnosis (split.py): the same test patients as --streaming,
+    # SQL_Analysis/07_ml_models.py and 06_data_modeling.sql, on every run
+    print("Step 3: Splitting Data (80% Train / 20% Test per diagnosis, by patient id hash)...")
+    recorder.start('split', rows=len(df))
+    test = is_test(df['id'], y)
+    X_train, X_test, y_train, y_test = X[~test], X[test], y[~test], y[test]
+    recorder.stop()
 
-# 4. Train Model
-print("Step 4: Training Logistic Regression Model...")
-model = LogisticRegression(max_iter=500)
-model.fit(X_train, y_train)
+    # What the training inputs looked like: served requests are compared with it (drift_monitor.py)
+    with recorder.stage('drift_reference', rows=len(X_train)):
+        drift_reference = DriftReference.fit(X_train.to_numpy(dtype=np.float64), features)
 
-# 5. Evaluate
-print("Step 5: Evaluating...")
-y_pred = model.predict(X_test)
-acc = accuracy_score(y_test, y_pred)
-cm = confusion_matrix(y_test, y_pred)
+    # 4. Train Model
+    # With --warm-start the solver starts at the previous model's coefficients instead of zero:
+    # on data that changed a little, it is already close to the answer and needs fewer iterations
+    print("Step 4: Training Logistic Regression Model" +
+          (f" (warm start from v{previous_version:04d})..." if previous is not None else "..."))
+    recorder.start('fit', rows=len(X_train))
+    model = LogisticRegression(max_iter=500, warm_start=previous is not None)
+    if previous is not None:
+        model.coef_ = previous.coef_.copy()
+        model.intercept_ = previous.intercept_.copy()
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_stats = {'iterations': int(model.n_iter_[0]), 'seconds': time.perf_counter() - start}
+    model.warm_start = False  # The saved model refits from scratch, like any other
+    recorder.stop()
+
+    if previous is not None and args.compare_cold:
+        # The same fit from zero, only to report what the warm start saved
+        with recorder.stage('fit_cold', rows=len(X_train)):
+            start = time.perf_counter()
+            cold = LogisticRegression(max_iter=500).fit(X_train, y_train)
+            fit_stats.update(cold_iterations=int(cold.n_iter_[0]), cold_seconds=time.perf_counter() - start)
+        print(f"   Warm start: {fit_stats['iterations']} iterations in {fit_stats['seconds'] * 1000:.1f} ms; "
+              f"from scratch: {fit_stats['cold_iterations']} iterations in {fit_stats['cold_seconds'] * 1000:.1f} ms "
+              f"(saved {fit_stats['cold_iterations'] - fit_stats['iterations']} iterations, "
+              f"{(fit_stats['cold_seconds'] - fit_stats['seconds']) * 1000:.1f} ms)")
+
+    # 5. Evaluate
+    # The cut-off is picked on out-of-fold predictions for the training rows (test rows stay unseen),
+    # then stored on the model so app.py / batch_score.py / serve.py use it instead of 0.5
+    print(f"Step 5: Evaluating (decision threshold for recall >= {args.min_recall:.0%})...")
+    recorder.start('evaluate', rows=len(X_train) + len(X_test))
+    train_proba = cross_val_predict(LogisticRegression(max_iter=500), X_train, y_train, cv=5,
+                                    method='predict_proba')[:, 1]
+    model.decision_threshold_ = recall_operating_point(threshold_curve(y_train, train_proba), args.min_recall)
+
+    report = evaluate(y_test, model.predict_proba(X_test)[:, 1], args.min_recall, model.decision_threshold_)
+    print_report(report)
+    metrics = report['at_threshold']
+    acc = metrics['accuracy']
+    cm = [[metrics['tn'], metrics['fp']], [metrics['fn'], metrics['tp']]]
+    holdout = {'rows': len(X_test), 'threshold': report['threshold'], 'roc_auc': report['roc_auc'],
+               **{name: metrics[name] for name in ('recall', 'precision', 'accuracy', 'fn', 'fp')}}
+
+    if previous is not None:
+        # The previous model on the same holdout rows, at its own stored cut-off
+        previous_report = evaluate(y_test, previous.predict_proba(X_test)[:, 1], args.min_recall,
+                                   model_threshold(previous))
+        previous_metrics = previous_report['at_threshold']
+        previous_holdout = {'rows': len(X_test), 'threshold': previous_report['threshold'],
+                            'roc_auc': previous_report['roc_auc'],
+                            **{name: previous_metrics[name] for name in ('recall', 'precision', 'accuracy', 'fn', 'fp')}}
+        print(f"   Previous model v{previous_version:04d} on the same holdout:")
+        print_report(previous_report)
+    recorder.stop()
 
 print(f"\n   >>> MODEL ACCURACY: {acc:.2%}")
 print(f"   >>> FALSE NEGATIVES: {cm[1][0]} (Patients we missed)")
 
+# The test set is small, so show how far these numbers could move by chance
+if args.bootstrap:
+    print(f"\n   Bootstrap over the test rows ({args.bootstrap:,} resamples):")
+    tn, fp, fn, tp = np.ravel(cm)
+    with recorder.stage('bootstrap', rows=args.bootstrap):
+        intervals = bootstrap_counts(tn, fp, fn, tp, args.bootstrap)
+    print_intervals(intervals)
+
 # 6. Save Model
-print("\nStep 6: Saving Model...")
-joblib.dump(model, 'cancer_model.pkl')
-print("   SUCCESS: Model saved as 'cancer_model.pkl'")
+# As a new version under models/ (never overwritten); deploying it copies the files into place
+version = registry.next_version()
+print(f"\nStep 6: Saving Model (version v{version:04d})...")
+recorder.start('save')
+joblib.dump(model, registry.path(version, MODEL_FILE))
+
+# Compact copy for serving: coefficients only, loads with NumPy (no scikit-learn needed)
+artifact = export_compact_model(model, features, args.data, registry.path(version, COMPACT_MODEL_FILE))
+drift_reference.save(registry.path(version, DRIFT_REFERENCE_FILE))
+
+if holdout is None:  # Streaming: counts only
+    holdout = {'threshold': model_threshold(model), 'accuracy': float(acc), 'fn': int(cm[1][0]),
+               'fp': int(cm[0][1]), 'recall': float(cm[1][1] / max(cm[1][1] + cm[1][0], 1))}
+regressions = holdout_regressions(previous_holdout, holdout, args.regression_tolerance) if previous_holdout else []
+# Without a stored threshold, app.py / serve.py would score at 0.5 and miss cancers the recall target catches
+if getattr(model, THRESHOLD_ATTRIBUTE, None) is None:
+    regressions.append(f"no decision threshold for recall >= {args.min_recall:.0%}")
+registry.add(version, {
+    'mode': 'warm' if previous is not None else ('streaming' if args.streaming else 'cold'),
+    'parent': previous_version,
+    'training_data': args.data,
+    'training_data_sha256': artifact['training_data_sha256'],
+    'fit': fit_stats,
+    'holdout': holdout,
+    'previous_holdout': previous_holdout,
+    'regressions': regressions,
+}, promote=not regressions)
+print(f"   SUCCESS: Model, compact model and drift reference ({drift_reference.rows:,} training rows) "
+      f"saved in '{registry.path(version, '')}'")
+if regressions:
+    deployed = registry.current()
+    kept = f"KEPT v{deployed['version']:04d}" if deployed else "NOT DEPLOYED"
+    print(f"   {kept}: the new model failed a deployment check ({'; '.join(regressions)})")
+    print(f"   ('python model_registry.py --promote {version}' deploys it anyway)")
+else:
+    print(f"   SUCCESS: Deployed as '{MODEL_FILE}', '{COMPACT_MODEL_FILE}' and '{DRIFT_REFERENCE_FILE}'")
+recorder.stop()
+
+if args.report:
+    report = recorder.save(args.report)
+    recorder.print_summary(report)
+    print(f"   SUCCESS: Run report saved as '{args.report}'")
 print("============================================================")
 print("READY FOR APP DEPLOYMENT")
\ No newline at end of file
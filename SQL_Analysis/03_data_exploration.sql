@@ -4,6 +4,9 @@ BREAST CANCER DATA ANALYSIS - DATA EXPLORATION
 ================================================================================
 Purpose: Explore and understand the data
 Prerequisites: Run 01_database_setup.sql and 02_data_loading.sql first
+Note: Each query below scans the whole table again. For every statistic of
+      all 30 columns per diagnosis in one pass (plus std, quantiles and
+      missing/negative counts) run `python profiling.py` in the project root.
 ================================================================================
 */
 
@@ -4,6 +4,9 @@ BREAST CANCER DATA ANALYSIS - DATA CLEANING
 ================================================================================
 Purpose: Clean the data and fix any problems
 Prerequisites: Run scripts 01-03 first
+Note: These checks cover radius_mean and area_mean only. To check all 30
+      measurement columns (and ids/diagnosis) before loading, use
+      `python load_data_alternative.py --mode bulk --validate` (validation.py)
 ================================================================================
 */
 
@@ -63,17 +66,24 @@ FROM cleaned_breast_cancer_data;
 -- SECTION 3: FIX PROBLEMS (if any)
 -- ============================================================================
 -- Step 4: If there are missing values, fill them with the average
+-- The averages are computed once up front instead of in a subquery per row
+SELECT AVG(radius_mean), AVG(area_mean)
+INTO @avg_radius_mean, @avg_area_mean
+FROM cleaned_breast_cancer_data;
+
 UPDATE cleaned_breast_cancer_data
 SET 
-    radius_mean = COALESCE(radius_mean, (SELECT AVG(radius_mean) FROM cleaned_breast_cancer_data)),
-    area_mean = COALESCE(area_mean, (SELECT AVG(area_mean) FROM cleaned_breast_cancer_data)),
+    radius_mean = COALESCE(radius_mean, @avg_radius_mean),
+    area_mean = COALESCE(area_mean, @avg_area_mean),
     cleaning_notes = CONCAT(COALESCE(cleaning_notes, ''), '; Fixed missing values')
 WHERE radius_mean IS NULL OR area_mean IS NULL;
 
 -- Step 5: Make sure diagnosis is uppercase and has no spaces
+-- Only rows that actually change are rewritten (BINARY: a case-sensitive comparison)
 UPDATE cleaned_breast_cancer_data
 SET 
-    diagnosis = UPPER(TRIM(diagnosis));
+    diagnosis = UPPER(TRIM(diagnosis))
+WHERE BINARY diagnosis <> BINARY UPPER(TRIM(diagnosis));
 
 -- ============================================================================
 -- SECTION 4: VERIFY CLEANING
@@ -10,62 +10,50 @@ Prerequisites: Run scripts 01-04 first
 USE breast_cancer_db;
 
 -- ============================================================================
--- SECTION 1: CREATE RATIO FEATURES
+-- SECTION 1: ADD THE FEATURE COLUMNS
 -- ============================================================================
--- Feature 1: Perimeter to Area Ratio
--- First, add a new column
+-- One ALTER for all four columns: every ALTER TABLE ... ADD COLUMN can
+-- rebuild the whole table, so we only want to do it once
 ALTER TABLE cleaned_breast_cancer_data
-ADD COLUMN perimeter_to_area_ratio DECIMAL(10,4);
-
--- Then calculate the ratio for each row
--- We use CASE to avoid dividing by zero
-UPDATE cleaned_breast_cancer_data
-SET perimeter_to_area_ratio = 
-    CASE 
-        WHEN area_mean > 0 THEN (perimeter_mean * perimeter_mean) / area_mean
-        ELSE NULL
-    END;
+    ADD COLUMN perimeter_to_area_ratio DECIMAL(10,4),  -- Feature 1
+    ADD COLUMN radius_spread DECIMAL(10,4),            -- Feature 2
+    ADD COLUMN area_spread DECIMAL(10,4),              -- Feature 3
+    ADD COLUMN high_risk_flag TINYINT(1) DEFAULT 0;    -- Feature 4
 
 -- ============================================================================
--- SECTION 2: CREATE SPREAD FEATURES
+-- SECTION 2: RISK FLAG CUT-OFFS
 -- ============================================================================
 
--- Feature 2: Radius Spread
-ALTER TABLE cleaned_breast_cancer_data
-ADD COLUMN radius_spread DECIMAL(10,4);
-
-UPDATE cleaned_breast_cancer_data
-SET radius_spread = radius_worst - radius_mean;
-
--- Feature 3: Area Spread
-ALTER TABLE cleaned_breast_cancer_data
-ADD COLUMN area_spread DECIMAL(10,4);
-
-UPDATE cleaned_breast_cancer_data
-SET area_spread = area_worst - area_mean;
+-- Calculate average and standard deviation first (one pass over the table)
+SELECT AVG(radius_mean), AVG(concavity_mean), STDDEV(radius_mean), STDDEV(concavity_mean)
+INTO @avg_radius, @avg_concavity, @std_radius, @std_concavity
+FROM cleaned_breast_cancer_data;
 
 -- ============================================================================
--- SECTION 3: CREATE RISK FLAGS
+-- SECTION 3: CALCULATE ALL FEATURES (ONE UPDATE)
 -- ============================================================================
-
--- Feature 4: High Risk Flag
-ALTER TABLE cleaned_breast_cancer_data
-ADD COLUMN high_risk_flag TINYINT(1) DEFAULT 0;
-
--- Calculate average and standard deviation first
-SET @avg_radius = (SELECT AVG(radius_mean) FROM cleaned_breast_cancer_data);
-SET @avg_concavity = (SELECT AVG(concavity_mean) FROM cleaned_breast_cancer_data);
-SET @std_radius = (SELECT STDDEV(radius_mean) FROM cleaned_breast_cancer_data);
-SET @std_concavity = (SELECT STDDEV(concavity_mean) FROM cleaned_breast_cancer_data);
-
--- Flag cases where both radius and concavity are above average
+-- One pass over the table writes all four features, instead of one UPDATE each
 UPDATE cleaned_breast_cancer_data
-SET high_risk_flag = CASE 
-    WHEN radius_mean > (@avg_radius + @std_radius) 
-     AND concavity_mean > (@avg_concavity + @std_concavity)
-    THEN 1 
-    ELSE 0 
-END;
+SET
+    -- Feature 1: Perimeter to Area Ratio
+    -- We use CASE to avoid dividing by zero
+    perimeter_to_area_ratio =
+        CASE
+            WHEN area_mean > 0 THEN (perimeter_mean * perimeter_mean) / area_mean
+            ELSE NULL
+        END,
+    -- Feature 2: Radius Spread
+    radius_spread = radius_worst - radius_mean,
+    -- Feature 3: Area Spread
+    area_spread = area_worst - area_mean,
+    -- Feature 4: High Risk Flag
+    -- Flag cases where both radius and concavity are above average
+    high_risk_flag = CASE
+        WHEN radius_mean > (@avg_radius + @std_radius)
+         AND concavity_mean > (@avg_concavity + @std_concavity)
+        THEN 1
+        ELSE 0
+    END;
 
 -- ============================================================================
 -- SECTION 4: SUMMARY
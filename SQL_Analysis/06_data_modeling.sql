@@ -17,40 +17,65 @@ USE breast_cancer_db;
 CREATE TABLE IF NOT EXISTS train_test_split (
     id BIGINT PRIMARY KEY,
     dataset_type VARCHAR(10) NOT NULL,  -- 'train' or 'test'
-    FOREIGN KEY (id) REFERENCES cleaned_breast_cancer_data(id)
+    FOREIGN KEY (id) REFERENCES cleaned_breast_cancer_data(id),
+    INDEX idx_dataset_type (dataset_type)  -- For the WHERE dataset_type = ... lookups below
 );
 
--- Step 2: Split data 80% training, 20% test
--- First, get counts for each diagnosis type
-SET @total_malignant = (SELECT COUNT(*) FROM cleaned_breast_cancer_data WHERE diagnosis = 'M');
-SET @total_benign = (SELECT COUNT(*) FROM cleaned_breast_cancer_data WHERE diagnosis = 'B');
-SET @train_malignant = FLOOR(@total_malignant * 0.8);  -- 80% of malignant
-SET @train_benign = FLOOR(@total_benign * 0.8);        -- 80% of benign
-
--- Insert training set (80% of each type)
-INSERT INTO train_test_split (id, dataset_type)
-SELECT id, 'train'
+-- Step 2: Split data 80% training, 20% test, stratified by diagnosis
+-- Each id goes to a bucket 0-9999 by a salted hash (same formula as split.py,
+-- so Python gets the very same split). Per diagnosis, the test set is every
+-- row below the first bucket where the running row count reaches 20% of the
+-- class (rounded half up), so both classes get 20% test rows.
+-- No ORDER BY RAND() sort: a per-class histogram of the buckets and a running
+-- SUM() OVER it (window functions need MySQL 8+), then one INSERT ... SELECT.
+SET @split_salt = 30;         -- SPLIT_SALT in split.py (hand-picked, see there)
+SET @test_buckets = 2000;     -- 20% of 10000 buckets
+
+-- 2a: The cut-off bucket per diagnosis
+DROP TEMPORARY TABLE IF EXISTS split_cutoffs;
+CREATE TEMPORARY TABLE split_cutoffs AS
+SELECT diagnosis,
+       -- A class too small for one test row (round(20% of rows) = 0) gets no test rows
+       MIN(CASE WHEN total * @test_buckets + 5000 < 10000 THEN 0 ELSE bucket + 1 END) AS cutoff
 FROM (
-    -- Get 80% of malignant cases (randomly)
-    SELECT id FROM cleaned_breast_cancer_data 
-    WHERE diagnosis = 'M' 
-    ORDER BY RAND()
-    LIMIT @train_malignant
-    
-    UNION ALL
-    
-    -- Get 80% of benign cases (randomly)
-    SELECT id FROM cleaned_breast_cancer_data 
-    WHERE diagnosis = 'B' 
-    ORDER BY RAND()
-    LIMIT @train_benign
-) AS train_ids;
-
--- Insert test set (the remaining 20%)
-INSERT INTO train_test_split (id, dataset_type)
-SELECT id, 'test'
-FROM cleaned_breast_cancer_data
-WHERE id NOT IN (SELECT id FROM train_test_split WHERE dataset_type = 'train');
+    SELECT diagnosis, bucket,
+           SUM(n) OVER (PARTITION BY diagnosis ORDER BY bucket) AS running,
+           SUM(n) OVER (PARTITION BY diagnosis) AS total
+    FROM (
+        SELECT diagnosis, h3 % 10000 AS bucket, COUNT(*) AS n
+        FROM (
+            SELECT id, diagnosis, (h2 * h2 + @split_salt) % 2147483647 AS h3
+            FROM (
+                SELECT id, diagnosis, (h1 * h1 + 48271) % 2147483647 AS h2
+                FROM (
+                    SELECT id, diagnosis, ((id % 2147483647) * 48271 + @split_salt) % 2147483647 AS h1
+                    FROM cleaned_breast_cancer_data
+                ) AS step1
+            ) AS step2
+        ) AS step3
+        GROUP BY diagnosis, bucket
+    ) AS histogram
+) AS cumulative
+-- running >= round(20% of total), in integers
+WHERE (running + 1) * 10000 > total * @test_buckets + 5000
+GROUP BY diagnosis;
+
+-- 2b: Assign every row
+INSERT IGNORE INTO train_test_split (id, dataset_type)
+SELECT step3.id, CASE WHEN step3.h3 % 10000 < c.cutoff THEN 'test' ELSE 'train' END
+FROM (
+    SELECT id, diagnosis, (h2 * h2 + @split_salt) % 2147483647 AS h3
+    FROM (
+        SELECT id, diagnosis, (h1 * h1 + 48271) % 2147483647 AS h2
+        FROM (
+            SELECT id, diagnosis, ((id % 2147483647) * 48271 + @split_salt) % 2147483647 AS h1
+            FROM cleaned_breast_cancer_data
+        ) AS step1
+    ) AS step2
+) AS step3
+JOIN split_cutoffs c ON c.diagnosis = step3.diagnosis;
+
+DROP TEMPORARY TABLE split_cutoffs;
 
 -- Step 3: Check the split
 SELECT 
@@ -6,18 +6,40 @@ Purpose: Train and evaluate machine learning models on the prepared data
 Prerequisites: 
     - Run SQL scripts 01-06 first
     - Install: pip install pandas scikit-learn mysql-connector-python
+    - Or run without MySQL: python 07_ml_models.py --source csv
+      (reads data.csv and computes the engineered features in Python)
+    - Or read ml_ready_data from a local SQLite file:
+      python pipeline_runner.py --factors 1 --keep breast_cancer.db
+      python 07_ml_models.py --source sqlite
+    - Time every step: python 07_ml_models.py --source csv --report
+      (ml_run_report.json; add --profile-stages DIR for cProfile dumps)
 ================================================================================
 """
 
+import argparse
+import os
+import sys
+import time
+
 import pandas as pd
-import mysql.connector
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import cross_val_predict
 from sklearn.linear_model import LogisticRegression
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
 import warnings
 warnings.filterwarnings('ignore')
 
+# Shared Python modules (features.py, ...) live in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bootstrap import N_RESAMPLES, bootstrap_counts, print_intervals
+from instrumentation import StageRecorder
+from evaluation import MIN_RECALL, classification_metrics, evaluate, print_report, recall_operating_point, threshold_curve
+from features import (ENGINEERED_FEATURES, MODEL_BUNDLE_FILE, compute_features, fit_thresholds, high_risk_flag,
+                      round_decimal, save_model_bundle)
+from tree_compiler import COMPILED_TREE_FILE, compile_tree
+from split import dataset_type, is_test
+from db import SQLITE_FILE, ML_READY_DTYPES, get_pool, read_frame
+from model_search import LEADERBOARD_FILE, MIN_RECALL as SEARCH_MIN_RECALL, N_FOLDS, best_candidate, make_model, search
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -28,6 +50,31 @@ DB_CONFIG = {
     'user': 'root',
     'password': 'your_password_here'  # Change this!
 }
+CSV_FILE = 'data.csv'
+REPORT_FILE = 'ml_run_report.json'
+
+parser = argparse.ArgumentParser(description="Train and compare the breast cancer models.")
+parser.add_argument('--source', choices=['mysql', 'sqlite', 'csv'], default='mysql',
+                    help="mysql = ml_ready_data view (default), sqlite = the same view in --sqlite-path, "
+                         "csv = data.csv with features computed in Python")
+parser.add_argument('--sqlite-path', default=SQLITE_FILE, help=f"SQLite database for --source sqlite (default: {SQLITE_FILE})")
+parser.add_argument('--search', action='store_true',
+                    help="Also run a cross-validated model search (see model_search.py) and keep its best model")
+parser.add_argument('--folds', type=int, default=N_FOLDS, help="Cross-validation folds for --search")
+parser.add_argument('--min-recall', type=float, default=SEARCH_MIN_RECALL,
+                    help="Recall a --search candidate must reach before precision decides (default: 0.95)")
+parser.add_argument('--threshold-recall', type=float, default=MIN_RECALL,
+                    help="Recall the saved model's decision threshold must keep (default: 0.98)")
+parser.add_argument('--workers', type=int, default=0, help="Processes for --search (0 = one per CPU)")
+parser.add_argument('--bootstrap', type=int, default=N_RESAMPLES,
+                    help="Bootstrap resamples for the metric confidence intervals (0 = skip)")
+parser.add_argument('--report', nargs='?', const=REPORT_FILE,
+                    help=f"Time every step (wall, CPU, peak memory, rows) and save a JSON run report (default: {REPORT_FILE})")
+parser.add_argument('--profile-stages', metavar='DIR', help="With --report: also cProfile each step into DIR")
+args = parser.parse_args()
+
+# Off unless asked for: a disabled recorder costs nothing measurable
+recorder = StageRecorder('ml', enabled=bool(args.report), profile_dir=args.profile_stages)
 
 print("=" * 60)
 print("BREAST CANCER ML MODEL TRAINING")
@@ -37,47 +84,67 @@ print()
 # ============================================================================
 # STEP 1: LOAD DATA FROM DATABASE
 # ============================================================================
-print("Step 1: Loading data from database...")
+print(f"Step 1: Loading data from {CSV_FILE}..." if args.source == 'csv' else "Step 1: Loading data from database...")
+recorder.start('load')
+
+if args.source == 'csv':
+    # Same result as scripts 02-06 without MySQL: values rounded like the
+    # DECIMAL(10,4) columns, engineered features computed by features.py
+    df = pd.read_csv(CSV_FILE)
+    df.columns = df.columns.str.replace(' ', '_')
+    measurement_columns = [c for c in df.columns if c.endswith(('_mean', '_se', '_worst'))]
+    df[measurement_columns] = round_decimal(df[measurement_columns].to_numpy(), 4)
+    df['diagnosis'] = df['diagnosis'].str.strip().str.upper()
+    df['dataset_type'] = dataset_type(df['id'], df['diagnosis'])  # The same split as 06_data_modeling.sql
+    # high_risk_flag is recomputed from the training rows' thresholds in step 2
+    df[ENGINEERED_FEATURES] = compute_features(df, fit_thresholds(df[df['dataset_type'] == 'train']), decimals=4)
+    print(f"✓ Loaded {len(df)} records and computed {len(ENGINEERED_FEATURES)} engineered features")
 
-try:
-    # Connect to MySQL database
-    connection = mysql.connector.connect(**DB_CONFIG)
-    print("✓ Connected to database")
+else:
+    try:
+        # A pooled connection (db.py); the MySQL config above is used for the pool
+        pool = get_pool(args.source, args.sqlite_path, config=DB_CONFIG)
+        connection = pool.acquire()
+        print("✓ Connected to database")
     
-    # Load data from the ml_ready_data view we created
-    query = """
-    SELECT 
-        id,
-        diagnosis,
-        radius_mean, texture_mean, area_mean, perimeter_mean,
-        concavity_mean, compactness_mean,
-        perimeter_to_area_ratio,
-        radius_spread,
-        area_spread,
-        high_risk_flag,
-        dataset_type
-    FROM ml_ready_data
-    """
+        # Load data from the ml_ready_data view we created
+        query = """
+        SELECT 
+            id,
+            diagnosis,
+            radius_mean, texture_mean, area_mean, perimeter_mean,
+            concavity_mean, compactness_mean,
+            perimeter_to_area_ratio,
+            radius_spread,
+            area_spread,
+            high_risk_flag,
+            dataset_type
+        FROM ml_ready_data
+        """
     
-    # Read data into pandas DataFrame
-    df = pd.read_sql(query, connection)
-    print(f"✓ Loaded {len(df)} records")
+        # Read data into pandas DataFrame: streamed in fetchmany() blocks of typed
+        # NumPy arrays instead of pd.read_sql's one big list of row tuples
+        df = read_frame(connection, query, dtypes=ML_READY_DTYPES)
+        print(f"✓ Loaded {len(df)} records")
     
-    connection.close()
-    print("✓ Database connection closed")
+        pool.release(connection)
+        print("✓ Database connection returned to the pool")
     
-except Exception as e:
-    print(f"ERROR: Could not load data from database: {e}")
-    print("\nTroubleshooting:")
-    print("1. Make sure MySQL is running")
-    print("2. Check your database credentials in DB_CONFIG")
-    print("3. Make sure you've run SQL scripts 01-06 first")
-    exit(1)
+    except Exception as e:
+        print(f"ERROR: Could not load data from database: {e}")
+        print("\nTroubleshooting:")
+        print("1. Make sure MySQL is running")
+        print("2. Check your database credentials in DB_CONFIG")
+        print("3. Make sure you've run SQL scripts 01-06 first")
+        print("4. For --source sqlite: python pipeline_runner.py --factors 1 --keep breast_cancer.db")
+        exit(1)
+recorder.stop(rows=len(df))
 
 # ============================================================================
 # STEP 2: PREPARE DATA FOR MODELING
 # ============================================================================
 print("\nStep 2: Preparing data for modeling...")
+recorder.start('prepare', rows=len(df))
 
 # Separate features (X) and target (y)
 # Features: all columns except id, diagnosis, and dataset_type
@@ -85,7 +152,6 @@ feature_columns = ['radius_mean', 'texture_mean', 'area_mean', 'perimeter_mean',
                    'concavity_mean', 'compactness_mean',
                    'perimeter_to_area_ratio', 'radius_spread', 'area_spread', 'high_risk_flag']
 
-X = df[feature_columns]
 y = df['diagnosis']
 
 # Convert diagnosis to binary (M=1, B=0)
@@ -94,22 +160,31 @@ y = (y == 'M').astype(int)
 print(f"✓ Features: {len(feature_columns)} columns")
 print(f"✓ Target: {y.sum()} malignant, {len(y) - y.sum()} benign")
 
+recorder.stop()
+
 # Split into training and test sets (using the split we created in SQL)
-# Or create a new split here
-train_data = df[df['dataset_type'] == 'train']
-test_data = df[df['dataset_type'] == 'test']
+# Or compute the same id-hash split here (split.py)
+recorder.start('split', rows=len(df))
+test = (df['dataset_type'] == 'test').to_numpy()
 
-if len(train_data) > 0 and len(test_data) > 0:
+if test.any() and not test.all():
     # Use the SQL split
-    X_train = train_data[feature_columns]
-    X_test = test_data[feature_columns]
-    y_train = (train_data['diagnosis'] == 'M').astype(int)
-    y_test = (test_data['diagnosis'] == 'M').astype(int)
-    print(f"✓ Using SQL train/test split: {len(X_train)} train, {len(X_test)} test")
+    print(f"✓ Using SQL train/test split: {(~test).sum()} train, {test.sum()} test")
 else:
     # Create new split if SQL split doesn't exist
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
-    print(f"✓ Created new train/test split: {len(X_train)} train, {len(X_test)} test")
+    test = is_test(df['id'], df['diagnosis'])
+    print(f"✓ Created new train/test split by id hash: {(~test).sum()} train, {test.sum()} test")
+
+# The high_risk_flag cut-offs (mean + 1 std, as in 05_feature_engineering.sql) from the training
+# rows only - the flag from the database used every row, test rows included. Saved with the
+# model so predictions compute the same flag
+feature_thresholds = fit_thresholds(df[~test])
+df['high_risk_flag'] = high_risk_flag(df, feature_thresholds)
+
+X = df[feature_columns]
+X_train, X_test, y_train, y_test = X[~test], X[test], y[~test], y[test]
+test_data = df[test]  # Keeps ids for ml_predictions.csv
+recorder.stop()
 
 # ============================================================================
 # STEP 3: TRAIN MODEL 1 - LOGISTIC REGRESSION
@@ -119,8 +194,9 @@ print("MODEL 1: LOGISTIC REGRESSION")
 print("=" * 60)
 
 # Create and train the model
-model_lr = LogisticRegression(random_state=42, max_iter=1000)
-model_lr.fit(X_train, y_train)
+with recorder.stage('fit_lr', rows=len(X_train)):
+    model_lr = LogisticRegression(random_state=42, max_iter=1000)
+    model_lr.fit(X_train, y_train)
 print("✓ Model trained")
 
 # Make predictions
@@ -128,10 +204,8 @@ y_pred_lr = model_lr.predict(X_test)
 y_pred_proba_lr = model_lr.predict_proba(X_test)[:, 1]
 
 # Calculate metrics
-accuracy_lr = accuracy_score(y_test, y_pred_lr)
-precision_lr = precision_score(y_test, y_pred_lr)
-recall_lr = recall_score(y_test, y_pred_lr)
-f1_lr = f1_score(y_test, y_pred_lr)
+metrics_lr = classification_metrics(y_test, y_pred_lr)  # One pass for all metrics
+accuracy_lr, precision_lr, recall_lr, f1_lr = (metrics_lr[k] for k in ('accuracy', 'precision', 'recall', 'f1'))
 
 print(f"\nResults:")
 print(f"  Accuracy:  {accuracy_lr:.4f} ({accuracy_lr*100:.2f}%)")
@@ -140,10 +214,9 @@ print(f"  Recall:    {recall_lr:.4f} ({recall_lr*100:.2f}%)")
 print(f"  F1 Score:  {f1_lr:.4f} ({f1_lr*100:.2f}%)")
 
 # Confusion Matrix
-cm_lr = confusion_matrix(y_test, y_pred_lr)
 print(f"\nConfusion Matrix:")
-print(f"  True Negatives:  {cm_lr[0,0]}  |  False Positives: {cm_lr[0,1]}")
-print(f"  False Negatives: {cm_lr[1,0]}  |  True Positives:  {cm_lr[1,1]}")
+print(f"  True Negatives:  {metrics_lr['tn']}  |  False Positives: {metrics_lr['fp']}")
+print(f"  False Negatives: {metrics_lr['fn']}  |  True Positives:  {metrics_lr['tp']}")
 
 # Feature importance (coefficients)
 print(f"\nTop 5 Most Important Features:")
@@ -164,18 +237,17 @@ print("MODEL 2: DECISION TREE")
 print("=" * 60)
 
 # Create and train the model
-model_dt = DecisionTreeClassifier(random_state=42, max_depth=5)
-model_dt.fit(X_train, y_train)
+with recorder.stage('fit_dt', rows=len(X_train)):
+    model_dt = DecisionTreeClassifier(random_state=42, max_depth=5)
+    model_dt.fit(X_train, y_train)
 print("✓ Model trained")
 
 # Make predictions
 y_pred_dt = model_dt.predict(X_test)
 
 # Calculate metrics
-accuracy_dt = accuracy_score(y_test, y_pred_dt)
-precision_dt = precision_score(y_test, y_pred_dt)
-recall_dt = recall_score(y_test, y_pred_dt)
-f1_dt = f1_score(y_test, y_pred_dt)
+metrics_dt = classification_metrics(y_test, y_pred_dt)  # One pass for all metrics
+accuracy_dt, precision_dt, recall_dt, f1_dt = (metrics_dt[k] for k in ('accuracy', 'precision', 'recall', 'f1'))
 
 print(f"\nResults:")
 print(f"  Accuracy:  {accuracy_dt:.4f} ({accuracy_dt*100:.2f}%)")
@@ -184,10 +256,9 @@ print(f"  Recall:    {recall_dt:.4f} ({recall_dt*100:.2f}%)")
 print(f"  F1 Score:  {f1_dt:.4f} ({f1_dt*100:.2f}%)")
 
 # Confusion Matrix
-cm_dt = confusion_matrix(y_test, y_pred_dt)
 print(f"\nConfusion Matrix:")
-print(f"  True Negatives:  {cm_dt[0,0]}  |  False Positives: {cm_dt[0,1]}")
-print(f"  False Negatives: {cm_dt[1,0]}  |  True Positives:  {cm_dt[1,1]}")
+print(f"  True Negatives:  {metrics_dt['tn']}  |  False Positives: {metrics_dt['fp']}")
+print(f"  False Negatives: {metrics_dt['fn']}  |  True Positives:  {metrics_dt['tp']}")
 
 # Feature importance
 print(f"\nTop 5 Most Important Features:")
@@ -199,6 +270,44 @@ feature_importance_dt = feature_importance_dt.sort_values('importance', ascendin
 for idx, row in feature_importance_dt.head(5).iterrows():
     print(f"  {row['feature']}: {row['importance']:.4f}")
 
+# ============================================================================
+# STEP 4b (--search): CROSS-VALIDATED MODEL SEARCH
+# ============================================================================
+if args.search:
+    print("\n" + "=" * 60)
+    print("MODEL SEARCH (STRATIFIED K-FOLD, RECALL-CONSTRAINED)")
+    print("=" * 60)
+
+    # Only the training rows: the test set stays untouched for the final comparison
+    search_start = time.perf_counter()
+    with recorder.stage('search', rows=len(X_train)):
+        leaderboard = search(df.loc[X_train.index], feature_columns, n_folds=args.folds,
+                             min_recall=args.min_recall, workers=args.workers or None)
+    print(f"✓ {len(leaderboard)} candidates x {args.folds} folds in {time.perf_counter() - search_start:.1f}s")
+    print(f"✓ {int(leaderboard['meets_recall'].sum())} candidates reach recall >= {args.min_recall:.2f}")
+
+    print("\nTop 10 Candidates:")
+    print(leaderboard.head(10)[['rank', 'candidate', 'recall', 'precision', 'accuracy',
+                                'false_negatives', 'fit_seconds']].to_string(index=False))
+    leaderboard.to_csv(LEADERBOARD_FILE, index=False)
+    print(f"✓ Leaderboard saved to {LEADERBOARD_FILE}")
+
+    # Refit the winner on all training rows and score it on the test set like the other two
+    search_name, search_type, search_params = best_candidate(leaderboard)
+    model_search = make_model(search_type, search_params)
+    model_search.fit(X_train, y_train)
+    y_pred_search = model_search.predict(X_test)
+
+    metrics_search = classification_metrics(y_test, y_pred_search)  # One pass for all metrics
+    accuracy_search, precision_search, recall_search, f1_search = (metrics_search[k] for k in ('accuracy', 'precision', 'recall', 'f1'))
+
+    print(f"\nBest candidate: {search_name}")
+    print(f"  Accuracy:  {accuracy_search:.4f} ({accuracy_search*100:.2f}%)")
+    print(f"  Precision: {precision_search:.4f} ({precision_search*100:.2f}%)")
+    print(f"  Recall:    {recall_search:.4f} ({recall_search*100:.2f}%)")
+    print(f"  F1 Score:  {f1_search:.4f} ({f1_search*100:.2f}%)")
+    print(f"  False Negatives: {metrics_search['fn']}  |  False Positives: {metrics_search['fp']}")
+
 # ============================================================================
 # STEP 5: COMPARE MODELS
 # ============================================================================
@@ -214,11 +323,33 @@ comparison = pd.DataFrame({
     'F1 Score': [f1_lr, f1_dt]
 })
 
+if args.search:
+    comparison.loc[len(comparison)] = [f'Search: {search_name}', accuracy_search, precision_search,
+                                       recall_search, f1_search]
+
 print("\n" + comparison.to_string(index=False))
 
+# About 114 test rows: show how far each number could move by chance
+if args.bootstrap:
+    recorder.start('bootstrap')
+    print(f"\nBootstrap confidence intervals ({args.bootstrap:,} resamples of the test rows):")
+    model_metrics = [('Logistic Regression', metrics_lr), ('Decision Tree', metrics_dt)]
+    if args.search:
+        model_metrics.append((f'Search: {search_name}', metrics_search))
+    for name, metrics in model_metrics:
+        print(f"\n  {name}")
+        print_intervals(bootstrap_counts(metrics['tn'], metrics['fp'], metrics['fn'], metrics['tp'], args.bootstrap),
+                        indent='    ')
+    recorder.stop(rows=args.bootstrap * len(model_metrics))
+
 # Find best model
-best_model_name = comparison.loc[comparison['Accuracy'].idxmax(), 'Model']
-print(f"\n✓ Best Model: {best_model_name} (based on accuracy)")
+if args.search:
+    # Chosen by cross-validated recall, not by accuracy on this one test split
+    best_model_name = f'Search: {search_name}'
+    print(f"\n✓ Best Model: {search_name} (cross-validated, recall >= {args.min_recall:.2f} then precision)")
+else:
+    best_model_name = comparison.loc[comparison['Accuracy'].idxmax(), 'Model']
+    print(f"\n✓ Best Model: {best_model_name} (based on accuracy)")
 
 # ============================================================================
 # STEP 6: SAVE RESULTS
@@ -228,11 +359,14 @@ print("SAVING RESULTS")
 print("=" * 60)
 
 # Save predictions to CSV
+recorder.start('save')
 results_df = test_data[['id', 'diagnosis']].copy()
 results_df['predicted_lr'] = y_pred_lr
 results_df['predicted_dt'] = y_pred_dt
 results_df['predicted_lr'] = results_df['predicted_lr'].map({1: 'M', 0: 'B'})
 results_df['predicted_dt'] = results_df['predicted_dt'].map({1: 'M', 0: 'B'})
+if args.search:
+    results_df['predicted_search'] = pd.Series(y_pred_search, index=results_df.index).map({1: 'M', 0: 'B'})
 
 results_df.to_csv('ml_predictions.csv', index=False)
 print("✓ Predictions saved to ml_predictions.csv")
@@ -241,16 +375,50 @@ print("✓ Predictions saved to ml_predictions.csv")
 comparison.to_csv('model_comparison.csv', index=False)
 print("✓ Model comparison saved to model_comparison.csv")
 
+recorder.stop()
+
+# Decision threshold for the saved model: picked on out-of-fold predictions for the
+# training rows (recall >= --threshold-recall), checked on the test rows
+recorder.start('threshold', rows=len(X_train))
+saved_model = model_search if args.search else model_lr
+if args.search:
+    oof_model = make_model(search_type, search_params)
+else:
+    oof_model = LogisticRegression(random_state=42, max_iter=1000)
+train_proba = cross_val_predict(oof_model, X_train, y_train, cv=5, method='predict_proba')[:, 1]
+saved_model.decision_threshold_ = recall_operating_point(threshold_curve(y_train, train_proba), args.threshold_recall)
+print(f"✓ Decision threshold for recall >= {args.threshold_recall:.0%}: {saved_model.decision_threshold_:.4f}")
+print_report(evaluate(y_test, saved_model.predict_proba(X_test)[:, 1], args.threshold_recall,
+                      saved_model.decision_threshold_), indent='  ')
+recorder.stop()
+
+recorder.start('save')
+# Save the logistic regression (or the --search winner) with its feature order, high_risk_flag thresholds
+# and decision threshold (stored on the model as decision_threshold_)
+save_model_bundle(saved_model, feature_columns, feature_thresholds, MODEL_BUNDLE_FILE)
+print(f"✓ Model and feature thresholds saved to {MODEL_BUNDLE_FILE}")
+
+# The decision tree as flat arrays, scored with NumPy only (see tree_compiler.py)
+compiled_dt = compile_tree(model_dt, metadata={'feature_thresholds': feature_thresholds})
+compiled_dt.save(COMPILED_TREE_FILE)
+print(f"✓ Decision tree compiled to {COMPILED_TREE_FILE} "
+      f"({len(compiled_dt.feature)} nodes, depth {compiled_dt.depth})")
+recorder.stop()
+
 # ============================================================================
 # FINAL SUMMARY
 # ============================================================================
 print("\n" + "=" * 60)
 print("SUMMARY")
 print("=" * 60)
-print(f"✓ Trained 2 models successfully")
+print(f"✓ Trained {3 if args.search else 2} models successfully")
 print(f"✓ Tested on {len(X_test)} samples")
 print(f"✓ Best accuracy: {comparison['Accuracy'].max()*100:.2f}%")
 print(f"✓ Results saved to CSV files")
+if args.report:
+    report = recorder.save(args.report)
+    recorder.print_summary(report)
+    print(f"✓ Run report saved to {args.report}")
 print("\n" + "=" * 60)
 print("ML MODEL TRAINING COMPLETE!")
 print("=" * 60)
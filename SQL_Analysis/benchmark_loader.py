@@ -0,0 +1,79 @@
+"""
+Loader Benchmark: Row-by-Row vs Bulk Inserts
+============================================
+Purpose: Compare rows/sec of the original iterrows() loop against the bulk
+executemany() loader, on a local SQLite database, at growing data sizes.
+
+The data is data.csv repeated N times (each copy gets new ids).
+
+Usage:
+    python benchmark_loader.py                    # 1x, 100x and 1000x data.csv
+    python benchmark_loader.py --factors 1 10 --batch-size 10000
+
+Note: the row-by-row loop at 1000x (569,000 rows) takes a few minutes.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from db import connect
+from load_data_alternative import BATCH_SIZE, CSV_FILE, insert_rows_bulk, insert_rows_one_by_one
+
+
+def scaled_frame(df, factor):
+    """data.csv repeated `factor` times, with ids shifted so every copy is unique."""
+    id_step = 10 ** len(str(df['id'].max()))
+    scaled = pd.concat([df] * factor, ignore_index=True)
+    scaled['id'] = scaled['id'].to_numpy() + np.repeat(np.arange(factor, dtype=np.int64) * id_step, len(df))
+    return scaled
+
+
+def time_insert(insert, df, workdir, **kwargs):
+    """Load df into a fresh SQLite file with `insert`; returns seconds."""
+    path = os.path.join(workdir, f'bench_{time.perf_counter_ns()}.db')
+    connection = connect('sqlite', path)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):  # Hide the progress lines
+            start = time.perf_counter()
+            inserted, errors = insert(connection, df, **kwargs)
+            seconds = time.perf_counter() - start
+        assert errors == 0 and inserted == len(df), f"{errors} rows failed"
+    finally:
+        connection.close()
+        os.remove(path)
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark row-by-row vs bulk loading into SQLite.")
+    parser.add_argument('--factors', type=int, nargs='+', default=[1, 100, 1000],
+                        help="Multiples of data.csv to load (default: 1 100 1000)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    df = pd.read_csv(CSV_FILE)
+
+    print("=" * 70)
+    print("LOADER BENCHMARK (SQLite)")
+    print("=" * 70)
+    print(f"{'size':>6} {'rows':>10} {'row-by-row rows/s':>19} {'bulk rows/s':>13} {'speedup':>9}")
+
+    with tempfile.TemporaryDirectory(prefix='loader_bench_') as workdir:
+        for factor in args.factors:
+            data = scaled_frame(df, factor)
+            row_seconds = time_insert(insert_rows_one_by_one, data, workdir)
+            bulk_seconds = time_insert(insert_rows_bulk, data, workdir, batch_size=args.batch_size)
+
+            print(f"{factor:>5}x {len(data):>10,} {len(data) / row_seconds:>19,.0f} "
+                  f"{len(data) / bulk_seconds:>13,.0f} {row_seconds / bulk_seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
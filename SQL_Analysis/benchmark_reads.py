@@ -0,0 +1,114 @@
+"""
+Read Benchmark: pd.read_sql vs Streamed NumPy Blocks
+====================================================
+Purpose: Compare peak memory and time of reading the ml_ready_data view
+three ways, on a local SQLite database, at growing data sizes:
+
+- read_sql : pd.read_sql(query, connection), what 07_ml_models.py used to do
+- frame    : db.read_frame(), fetchmany() blocks of typed NumPy arrays joined
+             into one DataFrame (what 07_ml_models.py does now)
+- stream   : db.stream_query() consumed block by block (per-class sums and
+             counts), never holding the whole table
+
+Peak memory is measured with tracemalloc (Python objects and NumPy buffers),
+so it shows what each approach allocates on top of the database itself.
+tracemalloc slows allocation-heavy code down, so time comes from a separate
+untraced run.
+The database is built by pipeline_runner.py (data.csv repeated N times).
+
+Usage:
+    python benchmark_reads.py                     # 1x, 100x and 1000x data.csv
+    python benchmark_reads.py --factors 1 10 --fetch-size 50000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmark_loader import scaled_frame
+from db import FETCH_SIZE, ML_READY_DTYPES, get_pool, read_frame, stream_query
+from load_data_alternative import CSV_FILE
+from pipeline_runner import run_pipeline
+
+QUERY = "SELECT * FROM ml_ready_data"
+
+
+def read_with_read_sql(connection, fetch_size):
+    return len(pd.read_sql(QUERY, connection))
+
+
+def read_with_frame(connection, fetch_size):
+    return len(read_frame(connection, QUERY, fetch_size=fetch_size, dtypes=ML_READY_DTYPES))
+
+
+def read_with_stream(connection, fetch_size):
+    """Per-diagnosis row counts and radius_mean sums, one block at a time."""
+    rows = 0
+    totals = {}
+    for block in stream_query(connection, QUERY, fetch_size=fetch_size, dtypes=ML_READY_DTYPES):
+        rows += len(block['id'])
+        for diagnosis in ('M', 'B'):
+            mask = block['diagnosis'] == diagnosis
+            count, total = totals.get(diagnosis, (0, 0.0))
+            totals[diagnosis] = (count + int(mask.sum()), total + float(block['radius_mean'][mask].sum()))
+    return rows
+
+
+READERS = [('read_sql', read_with_read_sql), ('frame', read_with_frame), ('stream', read_with_stream)]
+
+
+def measure(reader, connection, fetch_size):
+    """(seconds, peak MB allocated, rows) of one read."""
+    start = time.perf_counter()
+    rows = reader(connection, fetch_size)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        reader(connection, fetch_size)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak / 1024 ** 2, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pd.read_sql against streamed NumPy blocks.")
+    parser.add_argument('--factors', type=int, nargs='+', default=[1, 100, 1000],
+                        help="Multiples of data.csv to read (default: 1 100 1000)")
+    parser.add_argument('--fetch-size', type=int, default=FETCH_SIZE,
+                        help=f"Rows per fetchmany() block (default: {FETCH_SIZE})")
+    args = parser.parse_args()
+
+    df = pd.read_csv(CSV_FILE)
+
+    print("=" * 78)
+    print("READ BENCHMARK: ml_ready_data (SQLite), seconds / peak MB")
+    print("=" * 78)
+    print(f"{'size':>6} {'rows':>10} " + ' '.join(f'{name:>17}' for name, _ in READERS))
+
+    with tempfile.TemporaryDirectory(prefix='read_bench_') as workdir:
+        for factor in args.factors:
+            path = os.path.join(workdir, f'reads_{factor}.db')
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_pipeline(scaled_frame(df, factor), path)
+
+            pool = get_pool('sqlite', path, size=1)
+            results = []
+            with pool.connection() as connection:
+                for _, reader in READERS:
+                    seconds, peak_mb, rows = measure(reader, connection, args.fetch_size)
+                    results.append(f'{seconds:>7.2f}s {peak_mb:>7.1f}MB')
+            pool.close()
+            assert rows == len(df) * factor
+            print(f"{factor:>5}x {rows:>10,} " + ' '.join(f'{result:>17}' for result in results))
+
+
+if __name__ == "__main__":
+    main()
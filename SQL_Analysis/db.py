@@ -0,0 +1,297 @@
+"""
+Database Helpers for the Breast Cancer Project
+==============================================
+Purpose: One place for the table columns, for opening database connections
+and for reading query results.
+
+Two backends are supported:
+- 'mysql'  : the real project database (needs mysql-connector-python and a running server)
+- 'sqlite' : a local file database with the same tables, so the Python tools
+             can be run and benchmarked without MySQL
+
+Reading (WHY WE DO THIS):
+pd.read_sql() fetches the whole result as Python tuples (~30 objects per row)
+before building the DataFrame, so peak memory is many times the data itself.
+stream_query() reads fetchmany() blocks from an unbuffered (server-side)
+cursor and converts each block into typed NumPy arrays, so a consumer holds
+one block of Python objects at a time. read_frame() stitches the blocks into
+a DataFrame when the whole table is needed.
+
+Usage:
+    pool = get_pool('mysql')                 # or get_pool('sqlite', 'breast_cancer.db')
+    with pool.connection() as connection:
+        for block in stream_query(connection, "SELECT * FROM ml_ready_data", dtypes=ML_READY_DTYPES):
+            ...                               # {'id': int64 array, 'radius_mean': float64 array, ...}
+"""
+
+import contextlib
+import numbers
+import queue
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    import mysql.connector
+    from mysql.connector import Error as MySQLError
+except ImportError:  # Only needed for the MySQL backend
+    mysql = None
+    MySQLError = None
+
+# Update these with your MySQL connection details
+DB_CONFIG = {
+    'host': 'localhost',
+    'database': 'breast_cancer_db',
+    'user': 'root',
+    'password': 'your_password_here'  # Change this!
+}
+
+SQLITE_FILE = 'breast_cancer.db'
+POOL_SIZE = 4        # Connections kept open per database
+FETCH_SIZE = 10_000  # Rows per fetchmany() block
+
+# The 30 measurement columns, using the database names
+# (the CSV spells 'concave_points_*' as 'concave points_*')
+MEASUREMENT_COLUMNS = [
+    f'{measure}_{stat}'
+    for stat in ('mean', 'se', 'worst')
+    for measure in ('radius', 'texture', 'perimeter', 'area', 'smoothness', 'compactness',
+                    'concavity', 'concave_points', 'symmetry', 'fractal_dimension')
+]
+RAW_COLUMNS = ['id', 'diagnosis'] + MEASUREMENT_COLUMNS
+
+# Column types of the ml_ready_data view (06_data_modeling.sql), for stream_query()/read_frame()
+ML_READY_DTYPES = {
+    'id': np.int64,
+    'diagnosis': object,
+    **{column: np.float64 for column in ('radius_mean', 'texture_mean', 'area_mean', 'perimeter_mean',
+                                         'concavity_mean', 'compactness_mean', 'perimeter_to_area_ratio',
+                                         'radius_spread', 'area_spread')},
+    'high_risk_flag': np.int64,
+    'dataset_type': object,
+}
+
+# Errors raised by either backend, for `except DatabaseErrors:`
+DatabaseErrors = (sqlite3.Error,) + ((MySQLError,) if MySQLError else ())
+
+# Same tables as 01_database_setup.sql (plus the 05_feature_engineering.sql columns), in SQLite syntax
+SQLITE_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS raw_breast_cancer_data (
+    id INTEGER PRIMARY KEY,
+    diagnosis TEXT NOT NULL,
+    {', '.join(f'{column} REAL' for column in MEASUREMENT_COLUMNS)},
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS cleaned_breast_cancer_data (
+    id INTEGER PRIMARY KEY,
+    diagnosis TEXT NOT NULL,
+    {', '.join(f'{column} REAL' for column in MEASUREMENT_COLUMNS)},
+    cleaning_notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Added by 05_feature_engineering.sql in MySQL
+    perimeter_to_area_ratio REAL,
+    radius_spread REAL,
+    area_spread REAL,
+    high_risk_flag INTEGER DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_diagnosis ON raw_breast_cancer_data(diagnosis);
+CREATE INDEX IF NOT EXISTS idx_diagnosis_cleaned ON cleaned_breast_cancer_data(diagnosis);
+"""
+
+
+def csv_to_db_columns(columns):
+    """Map CSV header names to database column names ('concave points_mean' -> 'concave_points_mean')."""
+    return [column.strip().replace(' ', '_') for column in columns]
+
+
+def connect(backend='mysql', sqlite_path=SQLITE_FILE, config=None):
+    """
+    Open a connection to the project database.
+    For SQLite the tables are created if they don't exist yet.
+    `config` overrides DB_CONFIG for MySQL.
+    """
+    if backend == 'mysql':
+        if mysql is None:
+            raise RuntimeError("mysql-connector-python is not installed (pip install mysql-connector-python)")
+        return mysql.connector.connect(**(config or DB_CONFIG))
+
+    if backend == 'sqlite':
+        # check_same_thread=False: a pooled connection may be checked out by another thread later
+        connection = sqlite3.connect(sqlite_path, check_same_thread=False)
+        connection.executescript(SQLITE_SCHEMA)
+        return connection
+
+    raise ValueError(f"Unknown backend '{backend}' (use 'mysql' or 'sqlite')")
+
+
+class ConnectionPool:
+    """
+    Up to `size` open connections to one database, shared by every caller.
+
+    Connections are opened on first use and reused afterwards, so a tool that
+    reads, loads and re-reads pays for one connect. When all of them are
+    checked out, connection() waits for one to come back (up to `timeout`).
+    """
+
+    def __init__(self, backend='mysql', sqlite_path=SQLITE_FILE, config=None, size=POOL_SIZE, timeout=30):
+        self.backend = backend
+        self.sqlite_path = sqlite_path
+        self.config = config
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()  # Most recently used first: warmest connection
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Check a connection out; give it back with release(). Prefer `with pool.connection()`."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                connection = connect(self.backend, self.sqlite_path, self.config)
+                self._opened += 1
+                return connection
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RuntimeError(f"No free database connection after {self.timeout}s "
+                               f"(pool size {self.size})") from None
+
+    def release(self, connection):
+        """Return a connection from acquire() to the pool (instead of closing it)."""
+        self._idle.put(connection)
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Check a connection out for the `with` block; uncommitted work is rolled back on errors."""
+        connection = self.acquire()
+        try:
+            yield connection
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            self.release(connection)
+
+    def close(self):
+        """Close the idle connections (checked-out ones are closed when they come back and close() runs again)."""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            connection.close()
+            with self._lock:
+                self._opened -= 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(backend='mysql', sqlite_path=SQLITE_FILE, config=None, size=POOL_SIZE):
+    """The shared pool for a database (created on first use)."""
+    config = config or DB_CONFIG
+    key = (backend, sqlite_path) if backend == 'sqlite' else (backend, tuple(sorted(config.items())))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(backend, sqlite_path, config, size)
+        return _pools[key]
+
+
+def _stream_cursor(connection):
+    # SQLite cursors already step through the result lazily; MySQL needs an
+    # unbuffered cursor, otherwise execute() pulls the whole result to the client
+    return connection.cursor() if is_sqlite(connection) else connection.cursor(buffered=False)
+
+
+def _column_array(values, dtype):
+    """One column of a block as a NumPy array; NULL becomes NaN in float columns."""
+    if dtype is None:
+        # Unknown column: numbers become float64 (NaN for NULL), anything else stays object
+        if all(value is None or isinstance(value, numbers.Number) for value in values):
+            dtype = np.float64
+        else:
+            dtype = object
+    if dtype is object:
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+        return array
+    return np.array(values, dtype=dtype)
+
+
+def stream_query(connection, query, params=(), fetch_size=FETCH_SIZE, dtypes=None):
+    """
+    Run a query and yield its result in blocks of up to `fetch_size` rows.
+
+    Each block is a dict {column name: NumPy array}. `dtypes` maps column names
+    to NumPy types (see ML_READY_DTYPES); other columns are float64 when they
+    hold numbers and object otherwise. Decimal values from MySQL DECIMAL
+    columns are converted by NumPy like any other number.
+    An empty result gives one empty block, so the column names are always known.
+    """
+    dtypes = dtypes or {}
+    cursor = _stream_cursor(connection)
+    try:
+        cursor.execute(query, params)
+        names = [description[0] for description in cursor.description]
+        rows = cursor.fetchmany(fetch_size)
+        while True:
+            columns = list(zip(*rows)) or [()] * len(names)
+            yield {name: _column_array(values, dtypes.get(name)) for name, values in zip(names, columns)}
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                return
+    finally:
+        # A consumer that stops early leaves rows on the MySQL connection; drop them so it can be reused
+        if not is_sqlite(connection) and getattr(connection, 'unread_result', False):
+            connection.consume_results()
+        cursor.close()
+
+
+def read_frame(connection, query, params=(), fetch_size=FETCH_SIZE, dtypes=None):
+    """
+    The whole result as a DataFrame, built from stream_query() blocks.
+    Same result as pd.read_sql() with much lower peak memory (see benchmark_reads.py).
+    """
+    blocks = list(stream_query(connection, query, params, fetch_size, dtypes))
+    return pd.DataFrame({name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]})
+
+
+def is_sqlite(connection):
+    return isinstance(connection, sqlite3.Connection)
+
+
+def placeholder(connection):
+    """Parameter marker for the connection's driver: '?' for SQLite, '%s' for MySQL."""
+    return '?' if is_sqlite(connection) else '%s'
+
+
+def to_db_rows(df):
+    """
+    Convert the CSV columns to plain Python values in one vectorized pass.
+
+    WHY: Converting row by row means calling pd.notna() and float() 30 times per
+    row. Here each column is converted once: ids to int, measurements to float,
+    NaN to None (NULL). Returns a list of 32-value tuples in RAW_COLUMNS order.
+    """
+    frame = df.copy(deep=False)
+    frame.columns = csv_to_db_columns(frame.columns)
+
+    columns = [frame['id'].astype(np.int64).astype(object).to_numpy(),
+               frame['diagnosis'].astype(str).to_numpy(dtype=object)]
+    for name in MEASUREMENT_COLUMNS:
+        values = frame[name].to_numpy(dtype=np.float64)
+        converted = values.astype(object)  # Python floats, which every driver accepts
+        converted[np.isnan(values)] = None
+        columns.append(converted)
+
+    return list(zip(*columns))
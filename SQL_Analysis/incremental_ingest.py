@@ -0,0 +1,210 @@
+"""
+Incremental Data Ingestion
+==========================
+Purpose: Refresh the database with only what changed in data.csv, instead of
+deleting everything and reloading it.
+
+HOW IT WORKS:
+1. Every incoming row gets a content hash (diagnosis + the 30 measurements).
+2. The hash of every loaded id is kept in the ingest_state table.
+3. Ids we have never seen are INSERTed, ids whose hash changed are UPDATEd,
+   everything else is left alone.
+4. Only the inserted/updated ids are pushed through the cleaning step
+   (04_data_cleaning.sql) and the feature step (05_feature_engineering.sql).
+   The high_risk_flag depends on the average/std of the whole table, so it is
+   re-checked everywhere, but only rows whose flag actually flips are written.
+
+Everything is written in ONE transaction, committed at the very end, with
+ingest_state written last: if any step fails, the caller's rollback() undoes
+all of it, including the stored hashes, so the next run retries those ids
+instead of treating them as unchanged.
+
+Note: ids that are already in raw_breast_cancer_data but not yet in
+ingest_state (for example after a full reload) are counted as updated once,
+which records their hash for the following runs.
+
+Used by: python load_data_alternative.py --mode incremental
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from db import RAW_COLUMNS, csv_to_db_columns, is_sqlite, placeholder, to_db_rows
+
+BATCH_SIZE = 5000
+
+STATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS ingest_state (
+    id BIGINT PRIMARY KEY,
+    row_hash BIGINT NOT NULL,
+    ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def row_hashes(frame):
+    """64-bit content hash per row (diagnosis + measurements), computed in one vectorized pass."""
+    hashes = pd.util.hash_pandas_object(frame[RAW_COLUMNS[1:]], index=False).to_numpy()
+    return hashes.view(np.int64)  # Signed, so it fits a BIGINT column
+
+
+def _executemany(cursor, query, rows, batch_size):
+    """executemany() in chunks of batch_size rows (no commit: the caller commits once)."""
+    for start in range(0, len(rows), batch_size):
+        cursor.executemany(query, rows[start:start + batch_size])
+
+
+def _existing_state(cursor):
+    """DataFrame of every id already in the raw table with its stored hash (NaN if untracked)."""
+    cursor.execute("""
+        SELECT r.id, s.row_hash
+        FROM raw_breast_cancer_data r
+        LEFT JOIN ingest_state s ON s.id = r.id
+    """)
+    # dtype=object first: going through float64 would corrupt the 64-bit hashes
+    existing = pd.DataFrame(cursor.fetchall(), columns=['id', 'row_hash'], dtype=object)
+    return existing.astype({'id': np.int64, 'row_hash': 'Int64'})
+
+
+def _cleaned_rows(cursor, frame):
+    """
+    Apply the 04_data_cleaning.sql rules to the changed rows:
+    trim/uppercase the diagnosis and fill missing radius/area with the table average.
+    """
+    cleaned = frame.copy()
+    cleaned['diagnosis'] = cleaned['diagnosis'].astype(str).str.strip().str.upper()
+    notes = pd.Series('Copied from raw data', index=cleaned.index)
+
+    missing = cleaned['radius_mean'].isna() | cleaned['area_mean'].isna()
+    if missing.any():
+        cursor.execute("SELECT AVG(radius_mean), AVG(area_mean) FROM cleaned_breast_cancer_data")
+        avg_radius, avg_area = cursor.fetchone()
+        cleaned['radius_mean'] = cleaned['radius_mean'].fillna(float(avg_radius) if avg_radius is not None else np.nan)
+        cleaned['area_mean'] = cleaned['area_mean'].fillna(float(avg_area) if avg_area is not None else np.nan)
+        notes[missing] += '; Fixed missing values'
+
+    return [row + (note,) for row, note in zip(to_db_rows(cleaned), notes)]
+
+
+def _update_high_risk_flags(cursor, marker):
+    """
+    Recompute the mean + 1 std thresholds and rewrite only the flags that change.
+    Returns the number of rows whose flag flipped.
+    """
+    cursor.execute("""
+        SELECT AVG(radius_mean), AVG(radius_mean * radius_mean),
+               AVG(concavity_mean), AVG(concavity_mean * concavity_mean)
+        FROM cleaned_breast_cancer_data
+    """)
+    avg_r, avg_r2, avg_c, avg_c2 = [float(v) if v is not None else 0.0 for v in cursor.fetchone()]
+    # Population standard deviation, same as MySQL's STDDEV()
+    radius_cutoff = avg_r + math.sqrt(max(avg_r2 - avg_r * avg_r, 0.0))
+    concavity_cutoff = avg_c + math.sqrt(max(avg_c2 - avg_c * avg_c, 0.0))
+
+    flag = f"CASE WHEN radius_mean > {marker} AND concavity_mean > {marker} THEN 1 ELSE 0 END"
+    cursor.execute(f"""
+        UPDATE cleaned_breast_cancer_data
+        SET high_risk_flag = {flag}
+        WHERE high_risk_flag IS NULL OR high_risk_flag <> {flag}
+    """, (radius_cutoff, concavity_cutoff, radius_cutoff, concavity_cutoff))
+    return cursor.rowcount
+
+
+def ingest_incremental(connection, df, batch_size=BATCH_SIZE):
+    """
+    Insert new ids, update changed ids, skip unchanged ones, then refresh the
+    cleaned table and engineered features for just those ids. One transaction:
+    nothing is committed unless every step succeeds (the caller rolls back).
+
+    Returns a dict with inserted / updated / unchanged / flags_changed counts.
+    """
+    frame = df.copy(deep=False)
+    frame.columns = csv_to_db_columns(frame.columns)
+    frame = frame[RAW_COLUMNS].drop_duplicates('id', keep='last').reset_index(drop=True)
+    frame['row_hash'] = row_hashes(frame)
+
+    marker = placeholder(connection)
+    cursor = connection.cursor()
+    cursor.execute(STATE_TABLE_SQL)  # DDL (an implicit commit on MySQL): before any row is written
+
+    # Step 1: Compare the incoming hashes with what we loaded last time
+    existing = _existing_state(cursor)
+    merged = frame.merge(existing, on='id', how='left', suffixes=('', '_stored'), indicator=True)
+    is_new = (merged['_merge'] == 'left_only').to_numpy()
+    # Untracked ids (no stored hash) count as changed
+    differs = (merged['row_hash'] != merged['row_hash_stored']).fillna(True).to_numpy(dtype=bool)
+    is_changed = ~is_new & differs
+    new_rows = frame[is_new]
+    changed_rows = frame[is_changed]
+
+    # Step 2: Write the raw table
+    columns = RAW_COLUMNS[1:]
+    _executemany(cursor, f"""
+        INSERT INTO raw_breast_cancer_data ({', '.join(RAW_COLUMNS)})
+        VALUES ({', '.join([marker] * len(RAW_COLUMNS))})
+    """, to_db_rows(new_rows), batch_size)
+    _executemany(cursor, f"""
+        UPDATE raw_breast_cancer_data
+        SET {', '.join(f'{column} = {marker}' for column in columns)}
+        WHERE id = {marker}
+    """, [row[1:] + row[:1] for row in to_db_rows(changed_rows)], batch_size)
+
+    touched = pd.concat([new_rows, changed_rows])
+
+    # Step 3: Cleaning (04) for the touched ids only
+    flags_changed = 0
+    if len(touched):
+        cursor.execute("DROP TABLE IF EXISTS temp.ingest_changed_ids" if is_sqlite(connection)
+                       else "DROP TEMPORARY TABLE IF EXISTS ingest_changed_ids")
+        cursor.execute("CREATE TEMPORARY TABLE ingest_changed_ids (id BIGINT PRIMARY KEY)")
+        _executemany(cursor, f"INSERT INTO ingest_changed_ids (id) VALUES ({marker})",
+                     [(int(i),) for i in touched['id']], batch_size)
+
+        cursor.execute("""
+            SELECT c.id FROM cleaned_breast_cancer_data c
+            JOIN ingest_changed_ids t ON t.id = c.id
+        """)
+        already_cleaned = {row[0] for row in cursor.fetchall()}
+        cleaned_rows = _cleaned_rows(cursor, touched[RAW_COLUMNS])
+
+        _executemany(cursor, f"""
+            INSERT INTO cleaned_breast_cancer_data ({', '.join(RAW_COLUMNS)}, cleaning_notes)
+            VALUES ({', '.join([marker] * (len(RAW_COLUMNS) + 1))})
+        """, [row for row in cleaned_rows if row[0] not in already_cleaned], batch_size)
+        _executemany(cursor, f"""
+            UPDATE cleaned_breast_cancer_data
+            SET {', '.join(f'{column} = {marker}' for column in columns + ['cleaning_notes'])}
+            WHERE id = {marker}
+        """, [row[1:] + row[:1] for row in cleaned_rows if row[0] in already_cleaned], batch_size)
+
+        # Step 4: Feature engineering (05) for the touched ids only
+        cursor.execute("""
+            UPDATE cleaned_breast_cancer_data
+            SET perimeter_to_area_ratio = CASE
+                    WHEN area_mean > 0 THEN (perimeter_mean * perimeter_mean) / area_mean
+                    ELSE NULL
+                END,
+                radius_spread = radius_worst - radius_mean,
+                area_spread = area_worst - area_mean
+            WHERE id IN (SELECT id FROM ingest_changed_ids)
+        """)
+        flags_changed = _update_high_risk_flags(cursor, marker)
+
+    # Step 5: Remember the new hashes - last, so they are only stored together with the rows above
+    tracked = set(existing.loc[existing['row_hash'].notna(), 'id'])
+    state = [(int(h), int(i)) for i, h in zip(touched['id'], touched['row_hash'])]
+    _executemany(cursor, f"UPDATE ingest_state SET row_hash = {marker} WHERE id = {marker}",
+                 [row for row in state if row[1] in tracked], batch_size)
+    _executemany(cursor, f"INSERT INTO ingest_state (row_hash, id) VALUES ({marker}, {marker})",
+                 [row for row in state if row[1] not in tracked], batch_size)
+    connection.commit()
+
+    cursor.close()
+    return {
+        'inserted': len(new_rows),
+        'updated': len(changed_rows),
+        'unchanged': len(frame) - len(new_rows) - len(changed_rows),
+        'flags_changed': flags_changed,
+    }
@@ -11,101 +11,77 @@ Prerequisites:
 - pip install pandas mysql-connector-python
 - MySQL server running
 - Database created (run 01_database_setup.sql first)
+
+LOADING MODES:
+- row  : the original method, one INSERT per row (slow, kept for comparison)
+- bulk : converts whole columns at once and inserts with executemany() in
+         chunked transactions of --batch-size rows (much faster)
+- incremental : keeps the existing data, inserts only new ids, updates only
+         ids whose values changed and refreshes the cleaned table and features
+         for just those ids (see incremental_ingest.py)
+
+--validate checks every row first (validation.py in the project root): rows
+with duplicate/missing ids, unknown diagnoses, negative or out-of-range
+measurements go to quarantine.csv with a reason instead of the database, and
+missing measurements are filled with the class mean of data.csv.
+
+--report times every step (and, in bulk mode, every batch) and saves wall
+time, CPU time, peak memory and rows per second as JSON (instrumentation.py);
+--profile-stages DIR also keeps a cProfile dump per step.
+
+Usage:
+    python load_data_alternative.py                          # MySQL, row by row
+    python load_data_alternative.py --mode bulk              # MySQL, bulk
+    python load_data_alternative.py --mode bulk --backend sqlite   # local SQLite file, no MySQL needed
+    python load_data_alternative.py --mode incremental       # nightly refresh
+    python load_data_alternative.py --mode bulk --validate   # quarantine bad rows first
+    python load_data_alternative.py --mode bulk --report     # + load_report.json
 """
 
-import pandas as pd
-import mysql.connector
-from mysql.connector import Error
+import argparse
 import os
+import sys
+import time
+
+import pandas as pd
 
-# Configuration - UPDATE THESE VALUES
-DB_CONFIG = {
-    'host': 'localhost',
-    'database': 'breast_cancer_db',
-    'user': 'root',
-    'password': 'your_password_here'  # Change this!
-}
+from db import SQLITE_FILE, RAW_COLUMNS, DatabaseErrors, get_pool, placeholder, to_db_rows
+from incremental_ingest import ingest_incremental
+
+# Shared Python modules (validation.py, ...) live in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import NULL_RECORDER, StageRecorder
+from validation import QUARANTINE_FILE, Validator, print_counts, validate_frame
 
 CSV_FILE = 'data.csv'  # Path to your CSV file
+BATCH_SIZE = 5000      # Rows per executemany() call and per transaction in bulk mode
+REPORT_FILE = 'load_report.json'
 
-def load_data_to_mysql():
-    """
-    Load CSV data into MySQL database.
-    
-    WHY: This function reads the CSV file and inserts each row into the database.
-    It's slower than LOAD DATA INFILE but more compatible across systems.
-    """
-    
-    # Step 1: Read CSV file
-    # WHY: pandas makes CSV reading easy and handles encoding issues
-    print("Reading CSV file...")
-    try:
-        df = pd.read_csv(CSV_FILE)
-        print(f"✓ Loaded {len(df)} records from CSV")
-    except FileNotFoundError:
-        print(f"ERROR: File '{CSV_FILE}' not found!")
-        print("Please ensure the CSV file is in the same directory as this script.")
-        return False
-    except Exception as e:
-        print(f"ERROR reading CSV: {e}")
-        return False
-    
-    # Step 2: Connect to MySQL
-    # WHY: Need database connection to insert data
-    print("Connecting to MySQL database...")
-    connection = None
-    try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        if connection.is_connected():
-            print("✓ Connected to MySQL database")
-    except Error as e:
-        print(f"ERROR connecting to MySQL: {e}")
-        print("\nTroubleshooting:")
-        print("1. Make sure MySQL server is running")
-        print("2. Check your database credentials in DB_CONFIG")
-        print("3. Ensure database 'breast_cancer_db' exists (run 01_database_setup.sql first)")
-        return False
-    
-    # Step 3: Clear existing data (optional)
-    # WHY: Allows re-running the script without duplicates
-    cursor = connection.cursor()
-    try:
-        cursor.execute("DELETE FROM raw_breast_cancer_data")
-        connection.commit()
-        print("✓ Cleared existing data")
-    except Error as e:
-        print(f"Warning: Could not clear existing data: {e}")
-    
-    # Step 4: Insert data row by row
-    # WHY: Insert each row individually (slower but reliable)
-    print("Inserting data into database...")
-    
-    # Prepare SQL insert statement
+
+def insert_query(connection):
+    """Parameterized INSERT for all 32 raw columns."""
     # WHY: Using parameterized queries prevents SQL injection
-    insert_query = """
+    marker = placeholder(connection)
+    return f"""
     INSERT INTO raw_breast_cancer_data (
-        id, diagnosis,
-        radius_mean, texture_mean, perimeter_mean, area_mean,
-        smoothness_mean, compactness_mean, concavity_mean, concave_points_mean,
-        symmetry_mean, fractal_dimension_mean,
-        radius_se, texture_se, perimeter_se, area_se,
-        smoothness_se, compactness_se, concavity_se, concave_points_se,
-        symmetry_se, fractal_dimension_se,
-        radius_worst, texture_worst, perimeter_worst, area_worst,
-        smoothness_worst, compactness_worst, concavity_worst, concave_points_worst,
-        symmetry_worst, fractal_dimension_worst
+        {', '.join(RAW_COLUMNS)}
     ) VALUES (
-        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-        %s, %s
+        {', '.join([marker] * len(RAW_COLUMNS))}
     )
     """
-    
-    # Insert rows
+
+
+def insert_rows_one_by_one(connection, df):
+    """
+    Insert each row individually (slower but reliable).
+    Returns (inserted_count, error_count).
+    """
+    cursor = connection.cursor()
+    query = insert_query(connection)
+
     inserted_count = 0
     error_count = 0
-    
+
     for index, row in df.iterrows():
         try:
             # Convert row to tuple
@@ -145,30 +121,165 @@ def load_data_to_mysql():
                 float(row['fractal_dimension_worst']) if pd.notna(row['fractal_dimension_worst']) else None,
             )
             
-            cursor.execute(insert_query, values)
+            cursor.execute(query, values)
             inserted_count += 1
             
             # Progress indicator
             if (index + 1) % 100 == 0:
                 print(f"  Processed {index + 1}/{len(df)} records...")
                 
-        except Error as e:
+        except DatabaseErrors as e:
             error_count += 1
             print(f"  Error inserting row {index + 1} (ID: {row['id']}): {e}")
             continue
-    
+
     # Commit all inserts
     # WHY: Transactions ensure data integrity
     connection.commit()
+    cursor.close()
+    return inserted_count, error_count
+
+
+def insert_rows_bulk(connection, df, batch_size=BATCH_SIZE, recorder=NULL_RECORDER):
+    """
+    Insert rows with executemany(), committing every batch_size rows.
+    A failing batch is rolled back and counted as errors; the rest still load.
+    Each batch is an 'insert_batch' stage of the recorder.
+    Returns (inserted_count, error_count).
+    """
+    cursor = connection.cursor()
+    query = insert_query(connection)
+
+    inserted_count = 0
+    error_count = 0
+
+    for start in range(0, len(df), batch_size):
+        rows = to_db_rows(df.iloc[start:start + batch_size])
+        try:
+            with recorder.stage('insert_batch', rows=len(rows)):
+                cursor.executemany(query, rows)
+                connection.commit()
+            inserted_count += len(rows)
+        except DatabaseErrors as e:
+            connection.rollback()
+            error_count += len(rows)
+            print(f"  Error inserting rows {start + 1}-{start + len(rows)}: {e}")
+            continue
+
+        print(f"  Processed {inserted_count + error_count}/{len(df)} records...")
+
+    cursor.close()
+    return inserted_count, error_count
+
+
+def load_data_to_mysql(mode='row', backend='mysql', batch_size=BATCH_SIZE, sqlite_path=SQLITE_FILE,
+                       validate=False, quarantine_path=QUARANTINE_FILE, recorder=NULL_RECORDER):
+    """
+    Load CSV data into the database (MySQL by default, or a local SQLite file).
     
-    print(f"\n✓ Data loading complete!")
-    print(f"  Successfully inserted: {inserted_count} records")
+    WHY: This function reads the CSV file and inserts it into the database.
+    It's slower than LOAD DATA INFILE but more compatible across systems.
+    Each step is timed by the recorder (a no-op unless --report is given).
+    """
+    
+    # Step 1: Read CSV file
+    # WHY: pandas makes CSV reading easy and handles encoding issues
+    print("Reading CSV file...")
+    try:
+        with recorder.stage('read_csv') as stage:
+            df = pd.read_csv(CSV_FILE)
+            stage.rows = len(df)
+        print(f"✓ Loaded {len(df)} records from CSV")
+    except FileNotFoundError:
+        print(f"ERROR: File '{CSV_FILE}' not found!")
+        print("Please ensure the CSV file is in the same directory as this script.")
+        return False
+    except Exception as e:
+        print(f"ERROR reading CSV: {e}")
+        return False
+
+    # Step 1b: Validate (optional)
+    # WHY: Bad rows are set aside with a reason before they reach the database
+    if validate:
+        print("Validating rows...")
+        validator = Validator.from_reference()
+        start = time.perf_counter()
+        with recorder.stage('validate', rows=len(df)):
+            df = validate_frame(df, validator, quarantine_path)
+        print_counts(validator.counts, time.perf_counter() - start)
+        if validator.counts['quarantined']:
+            print(f"✓ Quarantined rows saved to {quarantine_path}")
+    
+    # Step 2: Connect to the database
+    # WHY: Need database connection to insert data
+    # (from the shared pool in db.py, so later reads in the same process reuse it)
+    target = 'MySQL' if backend == 'mysql' else f"SQLite ('{sqlite_path}')"
+    print(f"Connecting to {target} database...")
+    pool = get_pool(backend, sqlite_path)
+    connection = None
+    try:
+        connection = pool.acquire()
+        print(f"✓ Connected to {target} database")
+    except (RuntimeError, *DatabaseErrors) as e:
+        print(f"ERROR connecting to {target}: {e}")
+        print("\nTroubleshooting:")
+        print("1. Make sure MySQL server is running")
+        print("2. Check your database credentials in DB_CONFIG (db.py)")
+        print("3. Ensure database 'breast_cancer_db' exists (run 01_database_setup.sql first)")
+        print("4. Or try the local SQLite backend: --backend sqlite")
+        return False
+    
+    # Step 3: Clear existing data (optional)
+    # WHY: Allows re-running the script without duplicates
+    # (not needed in incremental mode, which only touches new/changed ids)
+    cursor = connection.cursor()
+    if mode != 'incremental':
+        try:
+            with recorder.stage('clear'):
+                cursor.execute("DELETE FROM raw_breast_cancer_data")
+                connection.commit()
+            print("✓ Cleared existing data")
+        except DatabaseErrors as e:
+            print(f"Warning: Could not clear existing data: {e}")
+    
+    # Step 4: Insert data
+    recorder.start('insert', rows=len(df))
+    if mode == 'incremental':
+        print("Comparing CSV with the database and applying changes...")
+        try:
+            counts = ingest_incremental(connection, df, batch_size)
+        except DatabaseErrors as e:
+            connection.rollback()
+            pool.release(connection)
+            recorder.stop()
+            print(f"ERROR during incremental ingest: {e}")
+            return False
+        print(f"\n✓ Incremental ingest complete!")
+        print(f"  Inserted:  {counts['inserted']} new records")
+        print(f"  Updated:   {counts['updated']} changed records")
+        print(f"  Unchanged: {counts['unchanged']} records")
+        print(f"  High risk flags changed: {counts['flags_changed']}")
+        inserted_count, error_count = counts['inserted'] + counts['updated'], 0
+    elif mode == 'bulk':
+        # WHY: executemany() in chunked transactions is far faster than one INSERT per row
+        print(f"Inserting data into database in batches of {batch_size}...")
+        inserted_count, error_count = insert_rows_bulk(connection, df, batch_size, recorder)
+    else:
+        # WHY: Insert each row individually (slower but reliable)
+        print("Inserting data into database...")
+        inserted_count, error_count = insert_rows_one_by_one(connection, df)
+    recorder.stop()
+    
+    if mode != 'incremental':
+        print(f"\n✓ Data loading complete!")
+        print(f"  Successfully inserted: {inserted_count} records")
     if error_count > 0:
         print(f"  Errors encountered: {error_count} records")
     
     # Step 5: Verify data was loaded
     # WHY: Always verify after data loading
     print("\nVerifying data...")
+    recorder.start('verify')
     cursor.execute("SELECT COUNT(*) FROM raw_breast_cancer_data")
     count = cursor.fetchone()[0]
     print(f"✓ Total records in database: {count}")
@@ -181,18 +292,39 @@ def load_data_to_mysql():
         GROUP BY diagnosis
     """)
     results = cursor.fetchall()
+    recorder.stop()
     print("\nDiagnosis distribution:")
     for diagnosis, count in results:
         print(f"  {diagnosis}: {count} records")
     
     # Cleanup
     cursor.close()
-    connection.close()
-    print("\n✓ Database connection closed")
+    pool.release(connection)
+    print("\n✓ Database connection returned to the pool")
     
     return True
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load data.csv into the breast cancer database.")
+    parser.add_argument('--mode', choices=['row', 'bulk', 'incremental'], default='row',
+                        help="row = one INSERT per row (original), bulk = batched executemany, "
+                             "incremental = only new/changed ids")
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], default='mysql',
+                        help="mysql (DB_CONFIG) or a local SQLite file")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f"Rows per batch/transaction in bulk/incremental mode (default: {BATCH_SIZE})")
+    parser.add_argument('--sqlite-path', default=SQLITE_FILE,
+                        help=f"SQLite database file (default: {SQLITE_FILE})")
+    parser.add_argument('--validate', action='store_true',
+                        help="Check every row first and send bad ones to the quarantine file")
+    parser.add_argument('--quarantine', default=QUARANTINE_FILE,
+                        help=f"Quarantine file for --validate (default: {QUARANTINE_FILE})")
+    parser.add_argument('--report', nargs='?', const=REPORT_FILE,
+                        help=f"Time every step and save a JSON run report (default: {REPORT_FILE})")
+    parser.add_argument('--profile-stages', metavar='DIR', help="With --report: also cProfile each step into DIR")
+    args = parser.parse_args()
+    recorder = StageRecorder('load', enabled=bool(args.report), profile_dir=args.profile_stages)
+
     print("=" * 60)
     print("Breast Cancer Data Loading Script")
     print("=" * 60)
@@ -208,7 +340,12 @@ if __name__ == "__main__":
         exit(1)
     
     # Run the loading process
-    success = load_data_to_mysql()
+    success = load_data_to_mysql(args.mode, args.backend, args.batch_size, args.sqlite_path,
+                                 args.validate, args.quarantine, recorder)
+    if args.report:
+        report = recorder.save(args.report)
+        recorder.print_summary(report)
+        print(f"✓ Run report saved to {args.report}")
     
     if success:
         print("\n" + "=" * 60)
@@ -223,5 +360,4 @@ if __name__ == "__main__":
         print("\n" + "=" * 60)
         print("FAILED! Please check the errors above and try again.")
         print("=" * 60)
-        exit(1)
-
+        exit(1)
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Cross-Validated Model Search
+============================
+Purpose: Pick the model by what this project cares about - not missing cancer -
+instead of by accuracy on one train/test split.
+
+HOW IT WORKS:
+1. The training rows are split into stratified k folds ONCE. For every fold the
+   preprocessing is done ONCE: the high_risk_flag cut-offs (mean + 1 std) are
+   re-fitted on the fold's training part, and a standardized copy of the
+   matrices is made for the logistic regressions.
+2. The fold matrices are handed to every worker process when it starts, so a
+   candidate only fits and predicts - nothing is recomputed per candidate.
+3. Every candidate in the grid (C / class_weight for logistic regression,
+   depth / leaf size / class_weight for trees) runs on all folds, in parallel.
+4. Ranking is recall-constrained: candidates whose cross-validated recall is
+   at least --min-recall come first, ordered by precision (fewest false
+   alarms); the rest follow, ordered by recall.
+
+Used by: python 07_ml_models.py --search
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+N_FOLDS = 5
+MIN_RECALL = 0.95
+RANDOM_STATE = 42
+LEADERBOARD_FILE = 'model_search_leaderboard.csv'
+
+LOGISTIC_C = [0.01, 0.1, 1.0, 10.0, 100.0]
+TREE_DEPTHS = [2, 3, 4, 5, 6, 8, None]
+TREE_MIN_LEAF = [1, 5, 10]
+CLASS_WEIGHTS = [None, 'balanced', {0: 1, 1: 3}]
+
+
+def candidate_grid():
+    """All candidates as (name, model type, parameters)."""
+    candidates = []
+    for class_weight in CLASS_WEIGHTS:
+        for c in LOGISTIC_C:
+            params = {'C': c, 'class_weight': class_weight}
+            candidates.append((f"logistic C={c} weight={_weight_name(class_weight)}", 'logistic', params))
+        for depth in TREE_DEPTHS:
+            for min_leaf in TREE_MIN_LEAF:
+                params = {'max_depth': depth, 'min_samples_leaf': min_leaf, 'class_weight': class_weight}
+                candidates.append((f"tree depth={depth} leaf={min_leaf} weight={_weight_name(class_weight)}",
+                                   'tree', params))
+    return candidates
+
+
+def _weight_name(class_weight):
+    if isinstance(class_weight, dict):
+        return f"1:{class_weight[1]}"
+    return str(class_weight)
+
+
+def make_model(model_type, params, random_state=RANDOM_STATE):
+    """A fresh, unfitted model. Logistic regressions get their own scaler, so they take raw features."""
+    if model_type == 'logistic':
+        return make_pipeline(StandardScaler(),
+                             LogisticRegression(max_iter=1000, random_state=random_state, **params))
+    return DecisionTreeClassifier(random_state=random_state, **params)
+
+
+def prepare_folds(df, feature_columns, n_folds=N_FOLDS, random_state=RANDOM_STATE):
+    """
+    Stratified folds with their preprocessing done once.
+    Returns a list of dicts: raw and standardized train/validation matrices plus labels.
+    """
+    X = df[feature_columns].to_numpy(dtype=np.float64)
+    y = (df['diagnosis'] == 'M').to_numpy().astype(np.int8)
+    radius = df['radius_mean'].to_numpy(dtype=np.float64)
+    concavity = df['concavity_mean'].to_numpy(dtype=np.float64)
+    flag_column = feature_columns.index('high_risk_flag') if 'high_risk_flag' in feature_columns else None
+
+    folds = []
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state)
+    for train_index, val_index in splitter.split(X, y):
+        X_fold = X.copy()
+        if flag_column is not None:
+            # Cut-offs from the fold's training rows only, like the final model gets them from its training data
+            radius_cut = radius[train_index].mean() + radius[train_index].std()
+            concavity_cut = concavity[train_index].mean() + concavity[train_index].std()
+            X_fold[:, flag_column] = (radius > radius_cut) & (concavity > concavity_cut)
+
+        X_train, X_val = X_fold[train_index], X_fold[val_index]
+        mean = X_train.mean(axis=0)
+        std = X_train.std(axis=0)
+        std[std == 0] = 1.0
+        folds.append({'X_train': X_train, 'X_val': X_val,
+                      'X_train_scaled': (X_train - mean) / std, 'X_val_scaled': (X_val - mean) / std,
+                      'y_train': y[train_index], 'y_val': y[val_index]})
+    return folds
+
+
+# Fold matrices of the current worker process (set once by _init_worker)
+_worker_folds = None
+
+
+def _init_worker(folds):
+    global _worker_folds
+    _worker_folds = folds
+
+
+def evaluate_candidate(candidate):
+    """Fit one candidate on every cached fold; returns its leaderboard row."""
+    name, model_type, params = candidate
+    scaled = model_type == 'logistic'
+    tn = fp = fn = tp = 0
+    fold_recalls = []
+    fit_seconds = 0.0
+    for fold in _worker_folds:
+        if scaled:
+            model = LogisticRegression(max_iter=1000, random_state=RANDOM_STATE, **params)
+            X_train, X_val = fold['X_train_scaled'], fold['X_val_scaled']
+        else:
+            model = make_model(model_type, params)
+            X_train, X_val = fold['X_train'], fold['X_val']
+
+        start = time.perf_counter()
+        model.fit(X_train, fold['y_train'])
+        fit_seconds += time.perf_counter() - start
+
+        predicted = model.predict(X_val)
+        actual = fold['y_val']
+        fold_tp = int(np.sum((predicted == 1) & (actual == 1)))
+        fold_fn = int(np.sum((predicted == 0) & (actual == 1)))
+        tp += fold_tp
+        fn += fold_fn
+        fp += int(np.sum((predicted == 1) & (actual == 0)))
+        tn += int(np.sum((predicted == 0) & (actual == 0)))
+        fold_recalls.append(fold_tp / (fold_tp + fold_fn) if fold_tp + fold_fn else 0.0)
+
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    return {
+        'candidate': name,
+        'model_type': model_type,
+        'params': repr(params),
+        'recall': recall,
+        'recall_std': float(np.std(fold_recalls)),
+        'precision': precision,
+        'accuracy': (tp + tn) / (tp + tn + fp + fn),
+        'f1': 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        'false_negatives': fn,
+        'false_positives': fp,
+        'fit_seconds': fit_seconds,
+    }
+
+
+def rank_candidates(results, min_recall=MIN_RECALL):
+    """
+    Recall-constrained ranking: rows meeting min_recall first (by precision, then accuracy),
+    then the rest (by recall). Returns a new DataFrame with a 1-based 'rank' column.
+    """
+    board = pd.DataFrame(results)
+    board['meets_recall'] = board['recall'] >= min_recall
+    board['_objective'] = np.where(board['meets_recall'], board['precision'], board['recall'])
+    board = board.sort_values(['meets_recall', '_objective', 'accuracy', 'fit_seconds'],
+                              ascending=[False, False, False, True]).drop(columns='_objective')
+    board.insert(0, 'rank', np.arange(1, len(board) + 1))
+    return board.reset_index(drop=True)
+
+
+def _pool_context():
+    # This runs from the flat 07_ml_models.py script: "spawn" workers would re-run
+    # the whole script on import, so use fork where the platform has it.
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def search(df, feature_columns, n_folds=N_FOLDS, min_recall=MIN_RECALL, workers=None, candidates=None,
+           random_state=RANDOM_STATE):
+    """Run the whole grid with k-fold CV and return the ranked leaderboard."""
+    candidates = candidates or candidate_grid()
+    folds = prepare_folds(df, feature_columns, n_folds, random_state)
+    workers = workers or os.cpu_count() or 1
+    context = _pool_context()
+
+    if workers == 1 or context is None:
+        _init_worker(folds)
+        results = [evaluate_candidate(candidate) for candidate in candidates]
+    else:
+        chunksize = max(1, len(candidates) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(folds,)) as pool:
+            results = list(pool.map(evaluate_candidate, candidates, chunksize=chunksize))
+
+    return rank_candidates(results, min_recall)
+
+
+def best_candidate(board, candidates=None):
+    """(name, model type, params) of the top-ranked leaderboard row."""
+    name = board.loc[0, 'candidate']
+    return next(candidate for candidate in candidates or candidate_grid() if candidate[0] == name)
@@ -0,0 +1,290 @@
+"""
+SQL Pipeline Runner (SQLite)
+============================
+Purpose: Run the same stages as scripts 01-06 (driven by 00_run_all.sql)
+against a local SQLite file, time every stage, and repeat at growing data
+sizes to see which stage breaks first. No MySQL server needed.
+
+STAGES (and what changed compared to the MySQL scripts):
+1. setup    - 01: create the tables, plus an index on train_test_split(dataset_type)
+2. load     - 02: bulk executemany() load (load_data_alternative.py --mode bulk)
+3. explore  - 03: all the counts / averages / min / max in ONE scan of the table
+4. clean    - 04: one INSERT ... SELECT that copies, trims/uppercases the
+                  diagnosis and fills missing radius/area in the same pass
+                  (instead of copy + two full-table UPDATEs)
+5. features - 05: the mean/std cut-offs in one aggregate query, then ONE UPDATE
+                  that writes all four features (instead of ALTER + UPDATE per feature)
+6. split    - 06: 80/20 split per diagnosis by a salted hash of the id
+                  (split.py) in one INSERT ... SELECT over a bucket histogram -
+                  no sort of the rows, no second query
+                  (instead of ORDER BY RAND() per class plus a NOT IN (SELECT ...)
+                  for the test rows)
+7. export   - 06/07: read the training rows through the ml_ready_data view
+
+--naive runs stages 5 and 6 the way the MySQL scripts do, for comparison.
+--synthetic uses new rows drawn from per-class distributions fitted to
+data.csv (synthetic_data.py) instead of repeated copies of it.
+
+Usage:
+    python pipeline_runner.py                         # 1x, 10x and 100x data.csv
+    python pipeline_runner.py --factors 1 100 1000 --output pipeline_timings.csv
+    python pipeline_runner.py --naive
+    python pipeline_runner.py --factors 1000 10000 --synthetic
+    python pipeline_runner.py --factors 1 --keep breast_cancer.db   # then: 07_ml_models.py --source sqlite
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmark_loader import scaled_frame
+from db import MEASUREMENT_COLUMNS, connect
+from load_data_alternative import BATCH_SIZE, CSV_FILE, insert_rows_bulk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from split import sql_split_select
+from synthetic_data import SyntheticModel
+
+TRAIN_FRACTION = 0.8
+
+SPLIT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS train_test_split (
+    id INTEGER PRIMARY KEY REFERENCES cleaned_breast_cancer_data(id),
+    dataset_type TEXT NOT NULL  -- 'train' or 'test'
+);
+CREATE INDEX IF NOT EXISTS idx_dataset_type ON train_test_split(dataset_type);
+
+CREATE VIEW IF NOT EXISTS ml_ready_data AS
+SELECT
+    c.id, c.diagnosis,
+    c.radius_mean, c.texture_mean, c.area_mean, c.perimeter_mean,
+    c.concavity_mean, c.compactness_mean,
+    c.perimeter_to_area_ratio, c.radius_spread, c.area_spread, c.high_risk_flag,
+    COALESCE(t.dataset_type, 'unassigned') AS dataset_type
+FROM cleaned_breast_cancer_data c
+LEFT JOIN train_test_split t ON c.id = t.id;
+"""
+
+
+def stage_setup(connection, df):
+    connection.executescript(SPLIT_SCHEMA)
+    return 0
+
+
+def stage_load(connection, df, batch_size=BATCH_SIZE):
+    with contextlib.redirect_stdout(io.StringIO()):  # Hide the per-batch progress lines
+        inserted, errors = insert_rows_bulk(connection, df, batch_size)
+    if errors:
+        raise RuntimeError(f"{errors} rows failed to load")
+    return inserted
+
+
+def stage_explore(connection, df):
+    """Every number from 03_data_exploration.sql, in a single scan."""
+    row = connection.execute("""
+        SELECT
+            COUNT(*),
+            SUM(diagnosis = 'M'), SUM(diagnosis = 'B'),
+            AVG(radius_mean), AVG(area_mean), AVG(perimeter_mean),
+            MIN(radius_mean), MAX(radius_mean), MIN(area_mean), MAX(area_mean),
+            AVG(CASE WHEN diagnosis = 'M' THEN radius_mean END),
+            AVG(CASE WHEN diagnosis = 'B' THEN radius_mean END),
+            AVG(CASE WHEN diagnosis = 'M' THEN area_mean END),
+            AVG(CASE WHEN diagnosis = 'B' THEN area_mean END)
+        FROM raw_breast_cancer_data
+    """).fetchone()
+    return row[0]
+
+
+def stage_clean(connection, df):
+    """04_data_cleaning.sql as one INSERT ... SELECT."""
+    columns = ', '.join(MEASUREMENT_COLUMNS)
+    selected = ', '.join(
+        f"COALESCE(r.{c}, a.avg_{c}) AS {c}" if c in ('radius_mean', 'area_mean') else f"r.{c}"
+        for c in MEASUREMENT_COLUMNS
+    )
+    cursor = connection.execute(f"""
+        INSERT INTO cleaned_breast_cancer_data (id, diagnosis, {columns}, cleaning_notes)
+        SELECT
+            r.id, UPPER(TRIM(r.diagnosis)), {selected},
+            CASE WHEN r.radius_mean IS NULL OR r.area_mean IS NULL
+                 THEN 'Copied from raw data; Fixed missing values'
+                 ELSE 'Copied from raw data' END
+        FROM raw_breast_cancer_data r
+        CROSS JOIN (SELECT AVG(radius_mean) AS avg_radius_mean, AVG(area_mean) AS avg_area_mean
+                    FROM raw_breast_cancer_data) a
+    """)
+    connection.commit()
+    return cursor.rowcount
+
+
+def _risk_cutoffs(connection):
+    """mean + 1 population std of radius_mean and concavity_mean (MySQL's STDDEV), one scan."""
+    avg_r, avg_r2, avg_c, avg_c2 = connection.execute("""
+        SELECT AVG(radius_mean), AVG(radius_mean * radius_mean),
+               AVG(concavity_mean), AVG(concavity_mean * concavity_mean)
+        FROM cleaned_breast_cancer_data
+    """).fetchone()
+    return (avg_r + max(avg_r2 - avg_r * avg_r, 0.0) ** 0.5,
+            avg_c + max(avg_c2 - avg_c * avg_c, 0.0) ** 0.5)
+
+
+def stage_features(connection, df):
+    """05_feature_engineering.sql: all four features in one UPDATE (ROUND 4 = the DECIMAL(10,4) columns)."""
+    radius_cutoff, concavity_cutoff = _risk_cutoffs(connection)
+    cursor = connection.execute("""
+        UPDATE cleaned_breast_cancer_data
+        SET perimeter_to_area_ratio = CASE WHEN area_mean > 0
+                                           THEN ROUND((perimeter_mean * perimeter_mean) / area_mean, 4)
+                                      END,
+            radius_spread = ROUND(radius_worst - radius_mean, 4),
+            area_spread = ROUND(area_worst - area_mean, 4),
+            high_risk_flag = (radius_mean > ? AND concavity_mean > ?)
+    """, (radius_cutoff, concavity_cutoff))
+    connection.commit()
+    return cursor.rowcount
+
+
+def stage_features_naive(connection, df):
+    """05 as written for MySQL: one full-table UPDATE per feature."""
+    radius_cutoff, concavity_cutoff = _risk_cutoffs(connection)
+    for statement in (
+        "UPDATE cleaned_breast_cancer_data SET perimeter_to_area_ratio = CASE WHEN area_mean > 0 "
+        "THEN ROUND((perimeter_mean * perimeter_mean) / area_mean, 4) ELSE NULL END",
+        "UPDATE cleaned_breast_cancer_data SET radius_spread = ROUND(radius_worst - radius_mean, 4)",
+        "UPDATE cleaned_breast_cancer_data SET area_spread = ROUND(area_worst - area_mean, 4)",
+    ):
+        connection.execute(statement)
+    cursor = connection.execute("""
+        UPDATE cleaned_breast_cancer_data
+        SET high_risk_flag = CASE WHEN radius_mean > ? AND concavity_mean > ? THEN 1 ELSE 0 END
+    """, (radius_cutoff, concavity_cutoff))
+    connection.commit()
+    return cursor.rowcount
+
+
+def stage_split(connection, df, train_fraction=TRAIN_FRACTION):
+    """Id-hash split cut per diagnosis (split.py): a bucket histogram, no sort of the rows."""
+    cursor = connection.execute(f"""
+        INSERT OR IGNORE INTO train_test_split (id, dataset_type)
+        {sql_split_select('cleaned_breast_cancer_data', test_fraction=1 - train_fraction)}
+    """)
+    connection.commit()
+    return cursor.rowcount
+
+
+def stage_split_naive(connection, df, train_fraction=TRAIN_FRACTION):
+    """06 as written for MySQL: ORDER BY RANDOM() per class, then NOT IN for the test rows."""
+    for diagnosis in ('M', 'B'):
+        (count,) = connection.execute("SELECT COUNT(*) FROM cleaned_breast_cancer_data WHERE diagnosis = ?",
+                                      (diagnosis,)).fetchone()
+        connection.execute("""
+            INSERT INTO train_test_split (id, dataset_type)
+            SELECT id, 'train' FROM cleaned_breast_cancer_data
+            WHERE diagnosis = ? ORDER BY RANDOM() LIMIT ?
+        """, (diagnosis, int(count * train_fraction)))
+    connection.execute("""
+        INSERT INTO train_test_split (id, dataset_type)
+        SELECT id, 'test' FROM cleaned_breast_cancer_data
+        WHERE id NOT IN (SELECT id FROM train_test_split WHERE dataset_type = 'train')
+    """)
+    connection.commit()
+    (rows,) = connection.execute("SELECT COUNT(*) FROM train_test_split").fetchone()
+    return rows
+
+
+def stage_export(connection, df):
+    """What 07_ml_models.py reads: the training rows of ml_ready_data."""
+    cursor = connection.execute("SELECT * FROM ml_ready_data WHERE dataset_type = 'train'")
+    rows = 0
+    while True:
+        block = cursor.fetchmany(10_000)
+        if not block:
+            return rows
+        rows += len(block)
+
+
+def stages(naive=False):
+    return [
+        ('setup', stage_setup),
+        ('load', stage_load),
+        ('explore', stage_explore),
+        ('clean', stage_clean),
+        ('features', stage_features_naive if naive else stage_features),
+        ('split', stage_split_naive if naive else stage_split),
+        ('export', stage_export),
+    ]
+
+
+def run_pipeline(df, sqlite_path, naive=False):
+    """Run every stage on a fresh database; returns [(stage, seconds, rows)]."""
+    if os.path.exists(sqlite_path):
+        os.remove(sqlite_path)
+    timings = []
+    start = time.perf_counter()
+    connection = connect('sqlite', sqlite_path)  # Creates the 01 tables
+    connect_seconds = time.perf_counter() - start
+    try:
+        for name, stage in stages(naive):
+            start = time.perf_counter()
+            rows = stage(connection, df)
+            seconds = time.perf_counter() - start
+            if name == 'setup':
+                seconds += connect_seconds
+            timings.append((name, seconds, rows))
+    finally:
+        connection.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the SQL pipeline stages on SQLite at growing data sizes.")
+    parser.add_argument('--factors', type=int, nargs='+', default=[1, 10, 100],
+                        help="Multiples of data.csv to run (default: 1 10 100)")
+    parser.add_argument('--naive', action='store_true',
+                        help="Run features/split like the MySQL scripts (per-feature UPDATEs, ORDER BY RANDOM, NOT IN)")
+    parser.add_argument('--synthetic', action='store_true',
+                        help="Synthetic rows (synthetic_data.py) instead of repeated copies of data.csv")
+    parser.add_argument('--output', help="Also save the timings to this CSV file")
+    parser.add_argument('--keep', metavar='PATH',
+                        help="Keep the database of the last run here (e.g. for 07_ml_models.py --source sqlite)")
+    args = parser.parse_args()
+
+    df = pd.read_csv(CSV_FILE)
+    names = [name for name, _ in stages(args.naive)]
+    synthetic = SyntheticModel.fit(CSV_FILE) if args.synthetic else None
+
+    print("=" * 90)
+    print(f"SQL PIPELINE STAGE TIMINGS (SQLite{', naive features/split' if args.naive else ''}), seconds")
+    print("=" * 90)
+    print(f"{'size':>6} {'rows':>10} " + ' '.join(f'{name:>9}' for name in names) + f" {'total':>9}")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='pipeline_') as workdir:
+        for factor in args.factors:
+            data = synthetic.frame(len(df) * factor) if synthetic else scaled_frame(df, factor)
+            timings = run_pipeline(data, os.path.join(workdir, 'pipeline.db'), args.naive)
+            total = sum(seconds for _, seconds, _ in timings)
+            print(f"{factor:>5}x {len(data):>10,} " + ' '.join(f'{seconds:>9.3f}' for _, seconds, _ in timings)
+                  + f" {total:>9.3f}")
+            results += [{'factor': factor, 'rows': len(data), 'stage': name, 'seconds': seconds,
+                         'stage_rows': rows} for name, seconds, rows in timings]
+        if args.keep:
+            shutil.copyfile(os.path.join(workdir, 'pipeline.db'), args.keep)
+
+    if args.output:
+        pd.DataFrame(results).to_csv(args.output, index=False)
+        print(f"\n✓ Timings saved to {args.output}")
+    if args.keep:
+        print(f"✓ Database kept as {args.keep}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,127 @@
+import os
+
 import streamlit as st
-import joblib
 import numpy as np
+import pandas as pd
+
+from prediction_cache import MAX_ENTRIES, PredictionCache
+from scoring import FEATURES, MODEL_FILE, load_model, model_fingerprint, model_threshold, score_block
+
+# Decimals each single-patient input shows (number_input's default "%.2f", "%.4f" for the last two).
+# Predictions are cached per displayed value: re-submitting the same inputs doesn't rerun the model.
+INPUT_DECIMALS = (2, 2, 2, 2, 4, 4)
+PREDICTION_CACHE_SIZE = int(os.environ.get('ONCOMETRIC_PREDICTION_CACHE_SIZE', MAX_ENTRIES))
 
 # 1. Load the trained model
 # This 'cancer_model.pkl' must be in the same folder!
-model = joblib.load('cancer_model.pkl')
+# The model is cached for the whole process (all users, all reruns). The file's
+# fingerprint is part of the cache key, so a retrained model is picked up automatically.
+@st.cache_resource(max_entries=1, show_spinner="Loading model...")
+def get_model(path, fingerprint):
+    return load_model(path)
+
+
+# One prediction cache shared by every session; it drops its entries when the model file changes
+@st.cache_resource
+def get_prediction_cache(max_entries):
+    return PredictionCache(max_entries, INPUT_DECIMALS)
+
+
+fingerprint = model_fingerprint(MODEL_FILE)
+model = get_model(MODEL_FILE, fingerprint)
+prediction_cache = get_prediction_cache(PREDICTION_CACHE_SIZE)
+
+# Malignant risk at or above this is reported as MALIGNANT. The trainer stores the
+# cut-off that keeps recall >= 98% with the model (older models fall back to 0.5).
+# Set ONCOMETRIC_THRESHOLD to change it for a deployment.
+DECISION_THRESHOLD = float(os.environ.get('ONCOMETRIC_THRESHOLD', model_threshold(model)))
 
 # 2. App Title and Description
 st.title("OncoMetric: Breast Cancer Risk Assistant 🔬")
 st.write("Enter the tumor measurements below to predict the diagnosis.")
 st.write("*(Model trained on Wisconsin Breast Cancer Dataset)*")
+st.caption(f"Decision threshold: a malignant risk of {DECISION_THRESHOLD:.0%} or more is flagged as MALIGNANT.")
+
+single_tab, batch_tab = st.tabs(["Single Patient", "Batch Upload (CSV)"])
+
+with single_tab:
+    # 3. Create Input Fields for the Doctor
+    # We need inputs for the 6 features you selected
+    col1, col2 = st.columns(2)
+
+    with col1:
+        radius = st.number_input("Radius Mean", min_value=0.0, max_value=30.0, value=14.0)
+        texture = st.number_input("Texture Mean", min_value=0.0, max_value=40.0, value=19.0)
+        perimeter = st.number_input("Perimeter Mean", min_value=0.0, max_value=200.0, value=90.0)
+
+    with col2:
+        area = st.number_input("Area Mean", min_value=0.0, max_value=2500.0, value=600.0)
+        smoothness = st.number_input("Smoothness Mean", min_value=0.0, max_value=0.2, value=0.09, format="%.4f")
+        concavity = st.number_input("Concavity Mean", min_value=0.0, max_value=0.5, value=0.08, format="%.4f")
+
+    # 4. Predict Button
+    if st.button("Predict Diagnosis"):
+        # Prepare the data for the model (must match the training shape)
+        features = [radius, texture, perimeter, area, smoothness, concavity]
+
+        # Make Prediction (one probability call, label comes from the threshold),
+        # or reuse it if these inputs were already scored with this model
+        prediction, risk = prediction_cache.predict(model, fingerprint, features, DECISION_THRESHOLD)
+
+        # 5. Display Result
+        if prediction == 1:
+            st.error(f"🚨 Prediction: MALIGNANT (Risk: {risk:.2%})")
+            st.write("Recommendation: Urgent Biopsy Recommended.")
+        else:
+            st.success(f"✅ Prediction: BENIGN (Confidence: {1 - risk:.2%})")
+            st.write("Recommendation: Routine Monitor.")
+
+    with st.expander("Prediction cache"):
+        stats = prediction_cache.stats()
+        st.caption(f"{stats['hits']:,} hits, {stats['misses']:,} misses ({stats['hit_rate']:.0%} hit rate), "
+                   f"{stats['evictions']:,} evictions, {stats['invalidations']:,} model reloads; "
+                   f"{stats['size']:,} of {stats['max_entries']:,} entries in use "
+                   f"(ONCOMETRIC_PREDICTION_CACHE_SIZE).")
+
+with batch_tab:
+    st.write("Upload a CSV with one patient per row. It needs these columns:")
+    st.code(", ".join(FEATURES))
+    uploaded = st.file_uploader("Patient measurements (CSV)", type="csv")
+
+    if uploaded is not None:
+        patients = pd.read_csv(uploaded)
+        # Same column clean-up as the trainer ('concave points_mean' -> 'concave_points_mean')
+        patients.columns = patients.columns.str.strip().str.replace(' ', '_')
+        missing = [name for name in FEATURES if name not in patients.columns]
+
+        if missing:
+            st.error(f"Missing columns: {', '.join(missing)}")
+        else:
+            # Blank or non-numeric cells become NaN; those rows are reported and left out
+            values = patients[FEATURES].apply(pd.to_numeric, errors='coerce')
+            bad = ~np.isfinite(values.to_numpy(dtype=np.float64)).all(axis=1)
+            if bad.any():
+                # By id, or by position in the file (1 = the first patient)
+                if 'id' in patients.columns:
+                    where = 'ids ' + ', '.join(patients.loc[bad, 'id'].astype(str).head(20))
+                else:
+                    where = 'rows ' + ', '.join(str(i + 1) for i in np.flatnonzero(bad)[:20])
+                more = f" and {bad.sum() - 20} more" if bad.sum() > 20 else ""
+                st.error(f"Skipped {bad.sum()} rows with blank or non-numeric measurements ({where}{more}).")
+            patients, values = patients[~bad], values[~bad]
+
+            if len(patients):
+                # Score every patient in one vectorized call
+                labels, risk = score_block(model, values, DECISION_THRESHOLD)
+
+                results = patients[(['id'] if 'id' in patients.columns else []) + FEATURES].copy()
+                results[FEATURES] = values
+                results['prediction'] = np.where(labels == 1, 'MALIGNANT', 'BENIGN')
+                results['malignant_risk'] = risk.round(4)
 
-# 3. Create Input Fields for the Doctor
-# We need inputs for the 6 features you selected
-col1, col2 = st.columns(2)
-
-with col1:
-    radius = st.number_input("Radius Mean", min_value=0.0, max_value=30.0, value=14.0)
-    texture = st.number_input("Texture Mean", min_value=0.0, max_value=40.0, value=19.0)
-    perimeter = st.number_input("Perimeter Mean", min_value=0.0, max_value=200.0, value=90.0)
-
-with col2:
-    area = st.number_input("Area Mean", min_value=0.0, max_value=2500.0, value=600.0)
-    smoothness = st.number_input("Smoothness Mean", min_value=0.0, max_value=0.2, value=0.09, format="%.4f")
-    concavity = st.number_input("Concavity Mean", min_value=0.0, max_value=0.5, value=0.08, format="%.4f")
-
-# 4. Predict Button
-if st.button("Predict Diagnosis"):
-    # Prepare the data for the model (must match the training shape)
-    features = np.array([[radius, texture, perimeter, area, smoothness, concavity]])
-    
-    # Make Prediction
-    prediction = model.predict(features)
-    probability = model.predict_proba(features)
-
-    # 5. Display Result
-    if prediction[0] == 1:
-        st.error(f"🚨 Prediction: MALIGNANT (Risk: {probability[0][1]:.2%})")
-        st.write("Recommendation: Urgent Biopsy Recommended.")
-    else:
-        st.success(f"✅ Prediction: BENIGN (Confidence: {probability[0][0]:.2%})")
-        st.write("Recommendation: Routine Monitor.")
\ No newline at end of file
+                malignant = int(labels.sum())
+                st.write(f"Scored **{len(results)}** patients: **{malignant}** malignant, "
+                         f"**{len(results) - malignant}** benign.")
+                st.dataframe(results)
+                st.download_button("Download predictions", results.to_csv(index=False),
+                                   file_name="predictions.csv", mime="text/csv")
@@ -0,0 +1,262 @@
+"""
+Batch Scoring for the Breast Cancer Model
+==========================================
+Purpose: Score whole screening-lab CSV exports with cancer_model.pkl
+
+WHY WE DO THIS:
+The Streamlit app scores one patient per button click. Lab exports can have
+tens of millions of rows, so here we read the CSV in fixed-size chunks, score
+each chunk with a single vectorized call and append the results to the output
+file straight away. Memory stays the same no matter how big the input is.
+
+PARALLEL MODE (--workers N):
+The file is cut into byte-range shards that start and end on line boundaries.
+Each shard is scored by a process pool worker that loads the model once when it
+starts (the model is never pickled per task). Every shard writes its own part
+file and the parts are joined back in shard order, so the output rows come out
+in exactly the same order as the input rows.
+Note: this assumes one record per line (no quoted fields containing newlines),
+which is true for the lab exports and data.csv.
+
+Usage:
+    python batch_score.py data.csv predictions.csv
+    python batch_score.py big_export.csv predictions.csv --chunk-size 200000
+    python batch_score.py big_export.csv predictions.csv --workers 32
+"""
+
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from scoring import FEATURES, MODEL_FILE, load_model, model_threshold, score_block
+
+CHUNK_SIZE = 100_000   # Rows held in memory at once
+REPORT_EVERY = 10      # Print progress every N chunks
+SHARDS_PER_WORKER = 4  # More shards than workers keeps every core busy until the end
+
+
+def predictions_frame(model, chunk, threshold=None):
+    """Score one parsed chunk and return the output rows for it (threshold None = the model's own cut-off)."""
+    if threshold is None:
+        threshold = model_threshold(model)
+    labels, proba = score_block(model, chunk[FEATURES], threshold)
+
+    result = pd.DataFrame({
+        'prediction': np.where(labels == 1, 'M', 'B'),
+        'malignant_probability': proba,
+    })
+    if 'id' in chunk.columns:
+        result.insert(0, 'id', chunk['id'].to_numpy())
+    return result
+
+
+def _usecols(columns):
+    """The columns we actually parse: the model features, plus 'id' when the file has one."""
+    return FEATURES + (['id'] if 'id' in columns else [])
+
+
+def score_csv(input_path, output_path, model, chunk_size=CHUNK_SIZE, threshold=None, verbose=True):
+    """
+    Stream input_path through the model and write predictions to output_path.
+
+    Only the six model features (plus 'id' when present) are parsed.
+    The output keeps the input row order: id, prediction (M/B), malignant_probability.
+    Returns (rows_scored, seconds).
+    """
+    header = pd.read_csv(input_path, nrows=0).columns
+
+    reader = pd.read_csv(
+        input_path,
+        usecols=_usecols(header),
+        dtype={name: np.float64 for name in FEATURES},
+        chunksize=chunk_size,
+    )
+
+    total_rows = 0
+    start = time.perf_counter()
+    with open(output_path, 'w', newline='') as out:
+        for chunk_number, chunk in enumerate(reader, start=1):
+            result = predictions_frame(model, chunk, threshold)
+            result.to_csv(out, header=(chunk_number == 1), index=False, float_format='%.6f')
+
+            total_rows += len(chunk)
+            if verbose and chunk_number % REPORT_EVERY == 0:
+                elapsed = time.perf_counter() - start
+                print(f"  Scored {total_rows:,} rows ({total_rows / elapsed:,.0f} rows/sec)")
+
+    return total_rows, time.perf_counter() - start
+
+
+# ============================================================================
+# PARALLEL MODE
+# ============================================================================
+
+def find_shards(input_path, n_shards):
+    """
+    Split the body of the CSV (everything after the header line) into at most
+    n_shards byte ranges [start, end) that each begin at the start of a line.
+    """
+    size = os.path.getsize(input_path)
+    with open(input_path, 'rb') as f:
+        f.readline()  # header
+        body_start = f.tell()
+        step = max((size - body_start) // max(n_shards, 1), 1)
+
+        boundaries = [body_start]
+        for i in range(1, n_shards):
+            # Jump ahead, then move forward to the next line start
+            f.seek(body_start + i * step - 1)
+            f.readline()
+            position = f.tell()
+            if position >= size:
+                break
+            if position > boundaries[-1]:
+                boundaries.append(position)
+        boundaries.append(size)
+
+    return [(start, end) for start, end in zip(boundaries[:-1], boundaries[1:]) if end > start]
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of `prefix` followed by bytes [start, end) of an open binary file."""
+
+    def __init__(self, f, start, end, prefix=b''):
+        f.seek(start)
+        self._f = f
+        self._prefix = prefix
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._prefix:
+            n = min(len(buffer), len(self._prefix))
+            buffer[:n] = self._prefix[:n]
+            self._prefix = self._prefix[n:]
+            return n
+        if self._remaining <= 0:
+            return 0
+        n = self._f.readinto(memoryview(buffer)[:min(len(buffer), self._remaining)])
+        self._remaining -= n
+        return n
+
+
+# Each worker process keeps its own copy of the model, loaded once by _init_worker
+_worker_model = None
+
+
+def _init_worker(model_path):
+    global _worker_model
+    _worker_model = load_model(model_path)
+
+
+def _score_shard(task):
+    """Score one byte-range shard into its own part file (no header). Runs in a worker."""
+    input_path, start, end, columns, part_path, chunk_size, threshold = task
+
+    rows = 0
+    with open(input_path, 'rb') as f, open(part_path, 'w', newline='') as out:
+        # Put the header line in front of the shard so pandas parses it exactly
+        # like the whole file (including the trailing comma in data.csv's header)
+        header = f.readline()
+        reader = pd.read_csv(
+            io.BufferedReader(_ByteRange(f, start, end, prefix=header)),
+            usecols=_usecols(columns),
+            dtype={name: np.float64 for name in FEATURES},
+            chunksize=chunk_size,
+        )
+        for chunk in reader:
+            result = predictions_frame(_worker_model, chunk, threshold)
+            result.to_csv(out, header=False, index=False, float_format='%.6f')
+            rows += len(chunk)
+    return rows
+
+
+def score_csv_parallel(input_path, output_path, model_path, workers, chunk_size=CHUNK_SIZE,
+                       threshold=None, verbose=True):
+    """
+    Score input_path with a pool of `workers` processes.
+
+    Output is identical to score_csv(): same columns, same row order.
+    Returns (rows_scored, seconds).
+    """
+    columns = list(pd.read_csv(input_path, nrows=0).columns)
+    out_columns = (['id'] if 'id' in columns else []) + ['prediction', 'malignant_probability']
+    shards = find_shards(input_path, workers * SHARDS_PER_WORKER)
+
+    total_rows = 0
+    start = time.perf_counter()
+    part_dir = tempfile.mkdtemp(prefix='batch_score_', dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        tasks = [
+            (input_path, shard_start, shard_end, columns,
+             os.path.join(part_dir, f'part_{number:05d}.csv'), chunk_size, threshold)
+            for number, (shard_start, shard_end) in enumerate(shards)
+        ]
+
+        with open(output_path, 'w', newline='') as out, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                    initargs=(model_path,)) as pool:
+            out.write(','.join(out_columns) + '\n')
+            # map() hands results back in submission order, so each part can be
+            # appended as soon as it (and every part before it) is finished.
+            for task, rows in zip(tasks, pool.map(_score_shard, tasks)):
+                part_path = task[4]
+                with open(part_path, 'r', newline='') as part:
+                    shutil.copyfileobj(part, out)
+                os.remove(part_path)
+
+                total_rows += rows
+                if verbose:
+                    elapsed = time.perf_counter() - start
+                    print(f"  Scored {total_rows:,} rows ({total_rows / elapsed:,.0f} rows/sec)")
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
+
+    return total_rows, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV file with the breast cancer model.")
+    parser.add_argument('input', help="CSV file with the model feature columns")
+    parser.add_argument('output', help="Where to write the predictions CSV")
+    parser.add_argument('--model', default=MODEL_FILE, help=f"Model file (default: {MODEL_FILE})")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help=f"Rows per chunk (default: {CHUNK_SIZE:,})")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="Malignant probability cut-off (default: the one stored with the model, else 0.5)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes (default: 1; use 0 for one per CPU core)")
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count()
+
+    print("=" * 60)
+    print("BREAST CANCER BATCH SCORING")
+    print("=" * 60)
+
+    if workers > 1:
+        print(f"Scoring '{args.input}' with {workers} worker processes...")
+        rows, seconds = score_csv_parallel(args.input, args.output, args.model, workers,
+                                           args.chunk_size, args.threshold)
+    else:
+        print(f"Loading model from '{args.model}'...")
+        model = load_model(args.model)
+
+        print(f"Scoring '{args.input}' in chunks of {args.chunk_size:,} rows...")
+        rows, seconds = score_csv(args.input, args.output, model, args.chunk_size, args.threshold)
+
+    rate = rows / seconds if seconds > 0 else float('inf')
+    print(f"\n✓ Scored {rows:,} rows in {seconds:.2f}s ({rate:,.0f} rows/sec)")
+    print(f"✓ Predictions saved to '{args.output}'")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Benchmarks for the OncoMetric pipeline.
+
+Run from the project root, for example:
+    python -m benchmarks.scoring_scaling
+"""
@@ -0,0 +1,55 @@
+"""
+Benchmark Datasets
+==================
+Purpose: Build larger copies of data.csv so the benchmarks have something to chew on.
+
+scaled_csv_path() repeats the real rows (fast; fine for parsing and scoring
+speed). synthetic_csv_path() draws new rows from per-class distributions
+fitted to data.csv (synthetic_data.py; use it when the values matter, e.g.
+for training).
+"""
+
+import os
+
+from synthetic_data import SEED, SyntheticModel
+
+
+def make_scaled_csv(source, destination, factor):
+    """
+    Write `factor` copies of the rows in `source` to `destination`.
+
+    Every copy gets new ids (original id + copy number * id step) so ids stay unique.
+    Rows are streamed, so this works for very large factors.
+    Returns the number of data rows written.
+    """
+    with open(source, 'r', newline='') as f:
+        header = f.readline()
+        rows = [line.rstrip('\r\n').split(',', 1) for line in f if line.strip()]
+
+    id_step = 10 ** len(str(max(int(row_id) for row_id, _ in rows)))
+    with open(destination, 'w', newline='') as out:
+        out.write(header.rstrip('\r\n') + '\n')
+        for copy in range(factor):
+            offset = copy * id_step
+            out.write(''.join(f"{int(row_id) + offset},{rest}\n" for row_id, rest in rows))
+
+    return len(rows) * factor
+
+
+def scaled_csv_path(source, factor, directory):
+    """Create (once) and return the path of a `factor`x copy of `source` in `directory`."""
+    path = os.path.join(directory, f"data_x{factor}.csv")
+    if not os.path.exists(path):
+        make_scaled_csv(source, path, factor)
+    return path
+
+
+def synthetic_csv_path(source, factor, directory, seed=SEED):
+    """Create (once) and return the path of a synthetic file with `factor` x the rows of `source`."""
+    path = os.path.join(directory, f"synthetic_x{factor}_seed{seed}.csv")
+    if not os.path.exists(path):
+        model = SyntheticModel.fit(source)
+        with open(source) as f:
+            rows = sum(1 for line in f if line.strip()) - 1
+        model.write_csv(path, rows * factor, seed)
+    return path
@@ -0,0 +1,139 @@
+"""
+Prediction Service Load Generator
+=================================
+Purpose: Measure serve.py locally - no external load-testing tools needed.
+
+Opens `--concurrency` keep-alive connections, each sending single-patient
+/predict requests back to back (rows taken from data.csv) for `--duration`
+seconds. Prints client-side latency percentiles and throughput, then the
+server's own /metrics (including the mean micro-batch size).
+
+Usage (from the project root):
+    python -m benchmarks.load_generator --start-server --concurrency 64 --duration 10
+    python -m benchmarks.load_generator --port 8000          # service already running
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from scoring import FEATURES, MODEL_FILE
+
+
+async def http_request(reader, writer, method, path, payload=None):
+    """Send one request on an open keep-alive connection; return (status, parsed JSON body)."""
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, payloads, stop_at, latencies, offset):
+    reader, writer = await asyncio.open_connection(host, port)
+    errors = 0
+    i = offset
+    try:
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            status, _ = await http_request(reader, writer, 'POST', '/predict', payloads[i % len(payloads)])
+            latencies.append(time.perf_counter() - start)
+            errors += status != 200
+            i += 1
+    finally:
+        writer.close()
+    return errors
+
+
+async def wait_for_server(host, port, timeout=30.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Service did not start on {host}:{port}")
+
+
+async def run_load(host, port, payloads, concurrency, duration):
+    await wait_for_server(host, port)
+
+    latencies = []
+    start = time.perf_counter()
+    errors = await asyncio.gather(*[
+        client(host, port, payloads, start + duration, latencies, offset=n * 7)
+        for n in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, server_metrics = await http_request(reader, writer, 'GET', '/metrics')
+    writer.close()
+    return latencies, sum(errors), elapsed, server_metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the prediction service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--concurrency', type=int, default=32, help="Concurrent connections (default: 32)")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds to run (default: 10)")
+    parser.add_argument('--data', default='data.csv', help="Where request payloads come from")
+    parser.add_argument('--start-server', action='store_true', help="Start serve.py for the duration of the test")
+    parser.add_argument('--model', default=MODEL_FILE, help="Model for --start-server")
+    parser.add_argument('--max-batch-size', type=int, default=64, help="Passed to serve.py with --start-server")
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help="Passed to serve.py with --start-server")
+    args = parser.parse_args()
+
+    rows = pd.read_csv(args.data, usecols=FEATURES)[FEATURES].to_numpy()
+    payloads = [{'features': dict(zip(FEATURES, map(float, row)))} for row in rows]
+
+    server = None
+    if args.start_server:
+        server = subprocess.Popen([
+            sys.executable, 'serve.py', '--model', args.model, '--host', args.host, '--port', str(args.port),
+            '--max-batch-size', str(args.max_batch_size), '--max-wait-ms', str(args.max_wait_ms),
+        ], stdout=subprocess.DEVNULL)
+
+    try:
+        latencies, errors, elapsed, server_metrics = asyncio.run(
+            run_load(args.host, args.port, payloads, args.concurrency, args.duration))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latencies_ms = np.array(latencies) * 1000.0
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    print("=" * 60)
+    print("PREDICTION SERVICE LOAD TEST")
+    print("=" * 60)
+    print(f"  Concurrency: {args.concurrency}   Duration: {elapsed:.1f}s")
+    print(f"  Requests:    {len(latencies):,} ({len(latencies) / elapsed:,.0f} req/sec), errors: {errors}")
+    print(f"  Latency:     p50 {p50:.2f} ms | p95 {p95:.2f} ms | p99 {p99:.2f} ms")
+    print("\nServer /metrics:")
+    print(json.dumps(server_metrics, indent=2))
+
+
+if __name__ == "__main__":
+    main()
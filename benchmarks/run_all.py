@@ -0,0 +1,340 @@
+"""
+Benchmark Suite: Ingest, Training and Scoring
+=============================================
+Purpose: Time the steps a change is most likely to slow down, the same way on
+every commit, and keep the numbers so two commits can be compared.
+
+WHAT IS MEASURED (seconds; median of --repeats runs unless noted):
+    csv_parse            pd.read_csv of data.csv repeated --factor times
+    sqlite_insert        load_data_alternative.insert_rows_bulk of the same rows
+                         into a fresh local SQLite file (the MySQL stand-in)
+    fit_lr / fit_dt      LogisticRegression (as 07_ml_models.py) and
+                         DecisionTreeClassifier(max_depth=5) on data.csv
+    score_single_*       p50/p95/p99 of score_block() on one patient with
+                         cancer_model.pkl (--single-calls calls)
+    score_batch_*        p50/p95/p99 of score_block() on --batch-size patients
+    app_import           importing streamlit's app runner in a fresh process
+    app_cold_start       new process -> first complete run of app.py
+                         (model load included), via streamlit's AppTest
+
+Results are saved as benchmarks/results/<commit>.json (<commit>-dirty.json
+when the working tree has uncommitted changes), with the Python version,
+platform and settings; a partial run (--only) updates just its metrics in
+the commit's file. `compare` flags every metric that got slower by more
+than --tolerance (relative) and exits with status 1 if there is one. Only
+compare results from the same machine.
+
+Usage (from the project root):
+    python -m benchmarks.run_all run
+    python -m benchmarks.run_all run --only scoring app --baseline main
+    python -m benchmarks.run_all compare 1a2b3c4 HEAD --tolerance 0.5
+    python -m benchmarks.run_all compare old.json new.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from benchmarks.datasets import scaled_csv_path
+from scoring import FEATURES, MODEL_FILE, load_model, model_threshold, score_block
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(PROJECT_ROOT, 'benchmarks', 'results')
+SOURCE_CSV = os.path.join(PROJECT_ROOT, 'data.csv')
+APP_FILE = os.path.join(PROJECT_ROOT, 'app.py')
+
+# The loader and the SQLite helpers live in SQL_Analysis/
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'SQL_Analysis'))
+from db import connect
+from load_data_alternative import BATCH_SIZE, insert_rows_bulk
+
+TOLERANCE = 0.25  # Sub-millisecond timings move 10-30% between runs on a busy machine
+FACTOR = 100
+REPEATS = 5
+SINGLE_CALLS = 2000
+BATCH_CALLS = 200
+SCORE_BATCH_SIZE = 10_000
+PERCENTILES = (50, 95, 99)
+
+# cancer_model.pkl was fitted on a DataFrame; the app scores plain arrays (feature-name warnings)
+warnings.filterwarnings('ignore')
+
+# Fresh interpreter: time the streamlit import, then one full run of app.py
+COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+finished = time.perf_counter()
+print(json.dumps({'import': imported - start, 'run': finished - imported,
+                  'errors': [str(error.value) for error in app.exception]}))
+"""
+
+
+def repeat(function, repeats):
+    """Seconds of `repeats` calls of function()."""
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def percentiles(name, seconds):
+    values = np.percentile(seconds, PERCENTILES)
+    return {f'{name}_p{p}': float(value) for p, value in zip(PERCENTILES, values)}
+
+
+def load_training_data():
+    df = pd.read_csv(SOURCE_CSV)
+    df.columns = df.columns.str.replace(' ', '_')
+    return df[FEATURES].to_numpy(), (df['diagnosis'] == 'M').to_numpy().astype(int)
+
+
+# -- Benchmarks -----------------------------------------------------------
+# Each returns {metric: seconds}; `args` carries the command-line settings
+
+def bench_ingest(args, workdir):
+    csv_path = scaled_csv_path(SOURCE_CSV, args.factor, workdir)
+    parse = repeat(lambda: pd.read_csv(csv_path), args.repeats)
+    df = pd.read_csv(csv_path)
+
+    def insert():
+        path = os.path.join(workdir, f'bench_{time.perf_counter_ns()}.db')
+        connection = connect('sqlite', path)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):  # Hide the per-batch progress lines
+                inserted, errors = insert_rows_bulk(connection, df, BATCH_SIZE)
+        finally:
+            connection.close()
+            os.remove(path)
+        if errors or inserted != len(df):
+            raise RuntimeError(f"SQLite insert failed: {errors} of {len(df)} rows")
+
+    return {'csv_parse': float(np.median(parse)),
+            'sqlite_insert': float(np.median(repeat(insert, args.repeats)))}
+
+
+def bench_training(args, workdir):
+    X, y = load_training_data()
+    fit_lr = repeat(lambda: LogisticRegression(max_iter=500).fit(X, y), args.repeats)
+    fit_dt = repeat(lambda: DecisionTreeClassifier(max_depth=5, random_state=42).fit(X, y), args.repeats)
+    return {'fit_lr': float(np.median(fit_lr)), 'fit_dt': float(np.median(fit_dt))}
+
+
+def bench_scoring(args, workdir):
+    model = load_model(os.path.join(PROJECT_ROOT, MODEL_FILE))
+    threshold = model_threshold(model)
+    X, _ = load_training_data()
+    rng = np.random.default_rng(42)
+    batch = pd.DataFrame(X[rng.integers(0, len(X), args.batch_size)], columns=FEATURES)  # As the batch tab
+    rows = [X[i:i + 1] for i in rng.integers(0, len(X), args.single_calls)]  # As the single-patient tab
+
+    score_block(model, rows[0], threshold)  # Warm-up: first call pays one-time setup
+    single = []
+    for row in rows:
+        start = time.perf_counter()
+        score_block(model, row, threshold)
+        single.append(time.perf_counter() - start)
+    batched = repeat(lambda: score_block(model, batch, threshold), args.batch_calls)
+    return {**percentiles('score_single', single), **percentiles('score_batch', batched)}
+
+
+def bench_app(args, workdir):
+    env = dict(os.environ, PYTHONWARNINGS='ignore')
+    imports, cold_starts = [], []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', COLD_START_SCRIPT, APP_FILE], cwd=PROJECT_ROOT,
+                                env=env, capture_output=True, text=True)
+        seconds = time.perf_counter() - start
+        if result.returncode != 0:
+            raise RuntimeError(f"app.py cold start failed:\n{result.stderr[-2000:]}")
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        if timings['errors']:
+            raise RuntimeError(f"app.py raised: {timings['errors']}")
+        imports.append(timings['import'])
+        cold_starts.append(seconds)
+    return {'app_import': float(np.median(imports)), 'app_cold_start': float(np.median(cold_starts))}
+
+
+BENCHMARKS = {
+    'ingest': bench_ingest,
+    'training': bench_training,
+    'scoring': bench_scoring,
+    'app': bench_app,
+}
+
+
+# -- Results --------------------------------------------------------------
+
+def git(*command):
+    try:
+        result = subprocess.run(['git', *command], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def current_commit():
+    """(commit hash or 'unknown', True if tracked files have uncommitted changes)."""
+    commit = git('rev-parse', 'HEAD')
+    dirty = bool(git('status', '--porcelain', '--untracked-files=no'))
+    return commit or 'unknown', dirty
+
+
+def result_path(commit, dirty):
+    return os.path.join(RESULTS_DIR, f"{commit[:12]}{'-dirty' if dirty else ''}.json")
+
+
+def resolve_result(reference):
+    """A results file path, or a git ref/commit whose results are in RESULTS_DIR."""
+    if os.path.isfile(reference):
+        return reference
+    commit = git('rev-parse', reference) or reference
+    for dirty in (False, True):
+        path = result_path(commit, dirty)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"No benchmark results for '{reference}' in {RESULTS_DIR} "
+                            f"(run: python -m benchmarks.run_all run)")
+
+
+def load_result(reference):
+    with open(resolve_result(reference)) as f:
+        return json.load(f)
+
+
+def compare(old, new, tolerance=TOLERANCE):
+    """Print old vs new per metric; returns the metrics that got slower by more than `tolerance`."""
+    print(f"{'metric':<18} {'old':>12} {'new':>12} {'change':>8}")
+    regressions = []
+    for name in sorted(set(old['metrics']) | set(new['metrics'])):
+        if name not in old['metrics'] or name not in new['metrics']:
+            side = 'old' if name in old['metrics'] else 'new'
+            print(f"{name:<18} {'(only in ' + side + ')':>34}")
+            continue
+        before, after = old['metrics'][name], new['metrics'][name]
+        change = after / before - 1 if before > 0 else 0.0
+        flag = ''
+        if change > tolerance:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        elif change < -tolerance:
+            flag = '  faster'
+        print(f"{name:<18} {format_seconds(before):>12} {format_seconds(after):>12} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def format_seconds(seconds):
+    return f'{seconds * 1000:.3f} ms' if seconds < 1 else f'{seconds:.3f} s'
+
+
+def print_comparison(old, new, tolerance):
+    print(f"\nComparing {old['commit'][:12]} -> {new['commit'][:12]}{' (dirty)' if new['dirty'] else ''}, "
+          f"tolerance {tolerance:.0%}")
+    if (old['platform'], old['cpu_count']) != (new['platform'], new['cpu_count']):
+        print("WARNING: the results come from different machines")
+    regressions = compare(old, new, tolerance)
+    if regressions:
+        print(f"\n✗ {len(regressions)} regression(s): {', '.join(regressions)}")
+    else:
+        print("\n✓ No regressions")
+    return regressions
+
+
+def run(args):
+    commit, dirty = current_commit()
+    print("=" * 60)
+    print(f"BENCHMARK SUITE @ {commit[:12]}{' (dirty)' if dirty else ''}")
+    print("=" * 60)
+
+    metrics = {}
+    with tempfile.TemporaryDirectory(prefix='bench_suite_') as workdir:
+        for name in args.only or BENCHMARKS:
+            start = time.perf_counter()
+            results = BENCHMARKS[name](args, workdir)
+            metrics.update(results)
+            print(f"✓ {name} ({time.perf_counter() - start:.1f}s)")
+            for metric, seconds in results.items():
+                print(f"    {metric:<18} {format_seconds(seconds):>12}")
+
+    result = {
+        'commit': commit,
+        'dirty': dirty,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': {key: getattr(args, key) for key in
+                     ('factor', 'repeats', 'single_calls', 'batch_calls', 'batch_size')},
+        'metrics': metrics,
+    }
+    path = args.output or result_path(commit, dirty)
+    if args.only and os.path.exists(path):
+        with open(path) as f:
+            result['metrics'] = {**json.load(f)['metrics'], **metrics}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\n✓ Results saved to {os.path.relpath(path)}")
+
+    if args.baseline:
+        return 1 if print_comparison(load_result(args.baseline), result, args.tolerance) else 0
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time ingest, training and scoring; compare commits.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Run the benchmarks and save the results for this commit")
+    run_parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help="Run only these groups")
+    run_parser.add_argument('--factor', type=int, default=FACTOR,
+                            help=f"Copies of data.csv for csv_parse / sqlite_insert (default: {FACTOR})")
+    run_parser.add_argument('--repeats', type=int, default=REPEATS, help=f"Runs per timing (default: {REPEATS})")
+    run_parser.add_argument('--single-calls', type=int, default=SINGLE_CALLS,
+                            help=f"Single-patient scoring calls (default: {SINGLE_CALLS})")
+    run_parser.add_argument('--batch-calls', type=int, default=BATCH_CALLS,
+                            help=f"Batch scoring calls (default: {BATCH_CALLS})")
+    run_parser.add_argument('--batch-size', type=int, default=SCORE_BATCH_SIZE,
+                            help=f"Patients per batch scoring call (default: {SCORE_BATCH_SIZE:,})")
+    run_parser.add_argument('--output', help="Results file (default: benchmarks/results/<commit>.json)")
+    run_parser.add_argument('--baseline', help="Then compare with this commit/ref or results file")
+    run_parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                            help=f"Relative slow-down counted as a regression (default: {TOLERANCE})")
+
+    compare_parser = commands.add_parser('compare', help="Compare two saved results")
+    compare_parser.add_argument('old', help="Commit/ref or results file")
+    compare_parser.add_argument('new', nargs='?', default='HEAD', help="Commit/ref or results file (default: HEAD)")
+    compare_parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                                help=f"Relative slow-down counted as a regression (default: {TOLERANCE})")
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'run':
+            sys.exit(run(args))
+        regressions = print_comparison(load_result(args.old), load_result(args.new), args.tolerance)
+    except FileNotFoundError as e:
+        sys.exit(f"ERROR: {e}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Batch Scoring Scaling Benchmark
+===============================
+Purpose: Show batch_score.py throughput going from 1 worker process to N.
+
+Usage (from the project root):
+    python -m benchmarks.scoring_scaling --factor 2000 --max-workers 32
+"""
+
+import argparse
+import os
+import tempfile
+
+from batch_score import CHUNK_SIZE, score_csv, score_csv_parallel
+from benchmarks.datasets import scaled_csv_path
+from scoring import MODEL_FILE, load_model
+
+
+def worker_counts(max_workers):
+    """1, 2, 4, ... up to max_workers (always including max_workers itself)."""
+    counts = []
+    n = 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch scoring from 1 to N worker processes.")
+    parser.add_argument('--source', default='data.csv', help="CSV to scale up (default: data.csv)")
+    parser.add_argument('--factor', type=int, default=2000, help="Copies of the source rows (default: 2000)")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count(), help="Largest pool to try")
+    parser.add_argument('--model', default=MODEL_FILE)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='scoring_bench_') as workdir:
+        input_path = scaled_csv_path(args.source, args.factor, workdir)
+        output_path = os.path.join(workdir, 'predictions.csv')
+
+        print(f"Input: {args.factor}x '{args.source}'")
+        print(f"{'workers':>8} {'rows':>12} {'seconds':>9} {'rows/sec':>12} {'speedup':>8}")
+
+        baseline = None
+        for workers in worker_counts(args.max_workers):
+            if workers == 1:
+                model = load_model(args.model)
+                rows, seconds = score_csv(input_path, output_path, model, args.chunk_size, verbose=False)
+            else:
+                rows, seconds = score_csv_parallel(input_path, output_path, args.model, workers,
+                                                   args.chunk_size, verbose=False)
+            rate = rows / seconds
+            baseline = baseline or rate
+            print(f"{workers:>8} {rows:>12,} {seconds:>9.2f} {rate:>12,.0f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Training Memory Benchmark: In-Memory vs Streaming
+=================================================
+Purpose: Compare peak RSS and wall time of `07_ml_models.py` (whole file in a
+DataFrame) and `07_ml_models.py --streaming` (chunked partial_fit) as the
+training file grows, to find where streaming starts to pay off.
+
+Each run is a separate process, so its peak RSS is measured on its own.
+The training files are synthetic rows (synthetic_data.py), not repeated
+copies of data.csv, so the models see realistic, non-duplicated data;
+--copies uses the repeated copies instead.
+
+Usage (from the project root):
+    python -m benchmarks.training_memory --factors 1 100 1000 5000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.datasets import scaled_csv_path, synthetic_csv_path
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAINER = os.path.join(PROJECT_ROOT, '07_ml_models.py')
+
+
+def run_trainer(data_path, workdir, extra_args=()):
+    """Run the trainer in its own process; returns (seconds, peak RSS in MB)."""
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT, PYTHONWARNINGS='ignore')
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, TRAINER, '--data', data_path, *extra_args],
+                               cwd=workdir, env=env, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"Trainer failed on {data_path} (exit code {process.returncode})")
+    return seconds, usage.ru_maxrss / 1024  # ru_maxrss is in KB on Linux
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS and wall time: in-memory vs streaming training.")
+    parser.add_argument('--source', default=os.path.join(PROJECT_ROOT, 'data.csv'))
+    parser.add_argument('--factors', type=int, nargs='+', default=[1, 100, 1000],
+                        help="Multiples of the source rows to train on (default: 1 100 1000)")
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--copies', action='store_true', help="Repeat data.csv instead of generating synthetic rows")
+    args = parser.parse_args()
+    make_csv = scaled_csv_path if args.copies else synthetic_csv_path
+
+    print("=" * 78)
+    print("TRAINING BENCHMARK: IN-MEMORY vs STREAMING")
+    print("=" * 78)
+    print(f"{'size':>6} {'rows':>11} {'file MB':>8} | {'in-memory s':>11} {'peak MB':>8} | "
+          f"{'streaming s':>11} {'peak MB':>8}")
+
+    with tempfile.TemporaryDirectory(prefix='training_bench_') as workdir:
+        for factor in args.factors:
+            data_path = make_csv(args.source, factor, workdir)
+            rows = factor * (sum(1 for _ in open(args.source)) - 1)
+            size_mb = os.path.getsize(data_path) / 2 ** 20
+
+            memory_seconds, memory_peak = run_trainer(data_path, workdir)
+            stream_seconds, stream_peak = run_trainer(
+                data_path, workdir, ['--streaming', '--chunk-size', str(args.chunk_size),
+                                     '--epochs', str(args.epochs)])
+
+            print(f"{factor:>5}x {rows:>11,} {size_mb:>8.1f} | {memory_seconds:>11.2f} {memory_peak:>8.0f} | "
+                  f"{stream_seconds:>11.2f} {stream_peak:>8.0f}")
+            os.remove(data_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Tree Scoring Benchmark: scikit-learn vs Compiled Arrays
+======================================================
+Purpose: Compare predict_proba() throughput of a fitted DecisionTreeClassifier
+(and optionally a random forest) against its tree_compiler.py version, at batch
+sizes from 1 row to 1M rows, and check both give identical outputs.
+
+The tree is trained like SQL_Analysis/07_ml_models.py (max_depth=5) on the
+30 measurements of data.csv; batches are rows drawn from data.csv with a little
+noise so they don't all land in the same leaves.
+
+Usage (from the project root):
+    python -m benchmarks.tree_scoring
+    python -m benchmarks.tree_scoring --forest 100 --max-batch 100000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from tree_compiler import compile_tree
+
+
+def best_time(function, X, min_seconds=0.2, max_repeats=1000):
+    """Fastest of repeated calls (at least one, until min_seconds have passed)."""
+    best = float('inf')
+    spent = 0.0
+    for _ in range(max_repeats):
+        start = time.perf_counter()
+        function(X)
+        seconds = time.perf_counter() - start
+        best = min(best, seconds)
+        spent += seconds
+        if spent >= min_seconds:
+            break
+    return best
+
+
+def batch_sizes(max_batch):
+    sizes = []
+    size = 1
+    while size < max_batch:
+        sizes.append(size)
+        size *= 10
+    return sizes + [max_batch]
+
+
+def compare(name, model, X_all, sizes):
+    compiled = compile_tree(model)
+    print(f"\n{name}: {len(compiled.feature):,} nodes, depth {compiled.depth}, {len(compiled.roots)} tree(s)")
+    print(f"{'batch':>9} | {'sklearn rows/s':>15} {'compiled rows/s':>16} {'speedup':>8} | identical")
+    for size in sizes:
+        X = X_all[:size]
+        identical = (np.array_equal(compiled.predict(X), model.predict(X))
+                     and np.allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12))
+        sklearn_seconds = best_time(model.predict_proba, X)
+        compiled_seconds = best_time(compiled.predict_proba, X)
+        print(f"{size:>9,} | {size / sklearn_seconds:>15,.0f} {size / compiled_seconds:>16,.0f} "
+              f"{sklearn_seconds / compiled_seconds:>7.2f}x | {'yes' if identical else 'NO'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compiled tree scoring against scikit-learn.")
+    parser.add_argument('--source', default='data.csv')
+    parser.add_argument('--max-batch', type=int, default=1_000_000, help="Largest batch (default: 1,000,000)")
+    parser.add_argument('--forest', type=int, default=0, help="Also benchmark a random forest with N trees")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.source)
+    df.columns = df.columns.str.replace(' ', '_')
+    columns = [c for c in df.columns if c.endswith(('_mean', '_se', '_worst'))]
+    X = df[columns].to_numpy()
+    y = (df['diagnosis'] == 'M').to_numpy().astype(int)
+
+    rng = np.random.default_rng(42)
+    X_all = X[rng.integers(0, len(X), args.max_batch)] * rng.uniform(0.9, 1.1, (args.max_batch, 1))
+
+    print("=" * 70)
+    print("TREE SCORING: SCIKIT-LEARN vs COMPILED ARRAYS")
+    print("=" * 70)
+    sizes = batch_sizes(args.max_batch)
+    compare("Decision tree (max_depth=5)", DecisionTreeClassifier(max_depth=5, random_state=42).fit(X, y),
+            X_all, sizes)
+    if args.forest:
+        forest = RandomForestClassifier(n_estimators=args.forest, random_state=42).fit(X, y)
+        compare(f"Random forest ({args.forest} trees)", forest, X_all, sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Bootstrap Confidence Intervals
+==============================
+Purpose: Show how much the test-set metrics could move by chance. With about
+114 test rows, one extra missed tumor changes recall by several points.
+
+HOW IT WORKS:
+Every test row is one of four outcomes (TN, FP, FN, TP), and every metric
+we report only depends on how many rows fall in each. Resampling n rows with
+replacement is exactly a multinomial draw of n over the four outcome shares,
+so each resample's counts are drawn directly from the confusion matrix:
+1. All resamples come from ONE multinomial call: a (resamples x 4) matrix.
+2. Accuracy, recall, precision, F1 and the FN count follow as whole-array
+   arithmetic - no Python loop over resamples, no scikit-learn calls.
+The cost is one draw per resample whatever the test-set size, and there is
+no per-row array, so the streaming trainer's test slice of a larger-than-RAM
+file costs the same as data.csv's 114 rows.
+
+Usage:
+    intervals = bootstrap_counts(tn, fp, fn, tp)            # 10,000 resamples, 95%
+    print_intervals(intervals)
+"""
+
+import numpy as np
+
+N_RESAMPLES = 10_000
+CONFIDENCE = 0.95
+SEED = 42
+
+METRICS = ['accuracy', 'recall', 'precision', 'f1', 'false_negatives']
+
+
+def metrics_from_count_arrays(tn, fp, fn, tp):
+    """The reported metrics for arrays of counts (one entry per resample). Undefined ratios are NaN."""
+    tn, fp, fn, tp = (np.asarray(c, dtype=np.float64) for c in (tn, fp, fn, tp))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        recall = tp / (tp + fn)
+        precision = tp / (tp + fp)
+        return {
+            'accuracy': (tp + tn) / (tp + tn + fp + fn),
+            'recall': recall,
+            'precision': precision,
+            'f1': 2 * tp / (2 * tp + fp + fn),
+            'false_negatives': fn,
+        }
+
+
+def _intervals(observed_counts, counts, confidence):
+    """{metric: (point estimate, low, high)} from the observed counts and (resamples, 4) resampled counts."""
+    observed = metrics_from_count_arrays(*observed_counts)
+    resampled = metrics_from_count_arrays(*counts.T)
+    tail = (1 - confidence) / 2 * 100
+    intervals = {}
+    for name in METRICS:
+        low, high = np.nanpercentile(resampled[name], [tail, 100 - tail])
+        intervals[name] = (float(observed[name]), float(low), float(high))
+    return intervals
+
+
+def bootstrap_counts(tn, fp, fn, tp, n_resamples=N_RESAMPLES, confidence=CONFIDENCE, seed=SEED):
+    """
+    Percentile bootstrap intervals from the confusion counts of the test rows.
+    Returns {metric: (point estimate, low, high)}.
+    """
+    observed = np.array([int(tn), int(fp), int(fn), int(tp)], dtype=np.int64)
+    n = int(observed.sum())
+    if n == 0:
+        counts = np.zeros((n_resamples, 4), dtype=np.int64)
+    else:
+        counts = np.random.default_rng(seed).multinomial(n, observed / n, size=n_resamples)
+    return _intervals(observed, counts, confidence)
+
+
+def print_intervals(intervals, confidence=CONFIDENCE, indent='   '):
+    print(f"{indent}{'metric':<16} {'estimate':>9}   {confidence:.0%} bootstrap interval")
+    for name in METRICS:
+        point, low, high = intervals[name]
+        if name == 'false_negatives':
+            print(f"{indent}{name:<16} {point:>9.0f}   [{low:.0f}, {high:.0f}]")
+        else:
+            print(f"{indent}{name:<16} {point:>9.2%}   [{low:.2%}, {high:.2%}]")
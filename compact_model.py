@@ -0,0 +1,146 @@
+"""
+Compact Model Artifact
+======================
+Purpose: Save the trained Logistic Regression as a small JSON file and score it
+with NumPy only.
+
+WHY WE DO THIS:
+cancer_model.pkl is a pickled scikit-learn object. Loading it imports all of
+scikit-learn and only works reliably with the same scikit-learn version that
+trained it. The model itself is just six coefficients and an intercept, so the
+JSON artifact stores exactly that (plus the feature order and a hash of the
+training data) and CompactModel evaluates it with a dot product.
+
+Usage:
+    from compact_model import CompactModel
+    model = CompactModel.load('cancer_model.json')
+    risk = model.predict_proba(X)[:, 1]
+
+To export from an existing pickle:
+    python compact_model.py cancer_model.pkl data.csv
+"""
+
+import hashlib
+import json
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+ARTIFACT_FORMAT_VERSION = 1
+COMPACT_MODEL_FILE = 'cancer_model.json'
+
+
+def file_sha256(path, block_size=1 << 20):
+    """SHA-256 of a file, read in blocks so large files don't need to fit in memory."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_pickle(path):
+    """
+    (model, scikit-learn version that pickled it). Unpickling drops that version from the model
+    (scikit-learn only warns when it differs from the running one), so it is read from the warning.
+    """
+    import warnings
+    import joblib
+    import sklearn
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        model = joblib.load(path)
+    version = sklearn.__version__
+    for warning in caught:
+        version = getattr(warning.message, 'original_sklearn_version', version)
+        warnings.showwarning(warning.message, warning.category, warning.filename, warning.lineno)
+    return model, version
+
+
+def export_compact_model(model, features, training_data_path, path=COMPACT_MODEL_FILE, sklearn_version=None):
+    """
+    Write a fitted binary LogisticRegression to a versioned JSON artifact.
+    sklearn_version: the version that pickled `model` (load_pickle()); by default the one pickling
+    it now would record, i.e. the running version for a model trained in this process.
+    Returns the artifact as a dict.
+    """
+    if sklearn_version is None:
+        sklearn_version = (model.__getstate__() or {}).get('_sklearn_version')
+    artifact = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'model_type': type(model).__name__,
+        'features': list(features),
+        'classes': [int(c) for c in model.classes_],
+        'coefficients': [float(c) for c in np.ravel(model.coef_)],
+        'intercept': float(np.ravel(model.intercept_)[0]),
+        'decision_threshold': getattr(model, 'decision_threshold_', None),
+        'training_data_sha256': file_sha256(training_data_path),
+        'sklearn_version': sklearn_version,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+    if len(artifact['coefficients']) != len(artifact['features']):
+        raise ValueError(f"Model has {len(artifact['coefficients'])} coefficients "
+                         f"but {len(artifact['features'])} features were given")
+
+    with open(path, 'w') as f:
+        json.dump(artifact, f, indent=2)
+    return artifact
+
+
+class CompactModel:
+    """
+    NumPy-only Logistic Regression scorer.
+
+    Mirrors the parts of the scikit-learn API the project uses:
+    classes_, decision_function(), predict_proba() and predict().
+    """
+
+    def __init__(self, features, classes, coefficients, intercept, metadata=None):
+        self.features = list(features)
+        self.classes_ = np.asarray(classes)
+        self.coef_ = np.asarray(coefficients, dtype=np.float64)
+        self.intercept_ = float(intercept)
+        self.metadata = metadata or {}
+        # Malignant-probability cut-off chosen by the trainer (None for older artifacts)
+        self.decision_threshold_ = self.metadata.get('decision_threshold')
+
+    @classmethod
+    def load(cls, path=COMPACT_MODEL_FILE):
+        with open(path) as f:
+            artifact = json.load(f)
+
+        version = artifact.get('format_version')
+        if version != ARTIFACT_FORMAT_VERSION:
+            raise ValueError(f"'{path}' has artifact format version {version}, "
+                             f"this scorer reads version {ARTIFACT_FORMAT_VERSION}")
+        return cls(artifact['features'], artifact['classes'], artifact['coefficients'],
+                   artifact['intercept'], metadata=artifact)
+
+    def _matrix(self, X):
+        # DataFrames are reordered by name, arrays must already be in feature order
+        if hasattr(X, 'columns'):
+            X = X[self.features]
+        return np.asarray(X, dtype=np.float64)
+
+    def decision_function(self, X):
+        return self._matrix(X) @ self.coef_ + self.intercept_
+
+    def predict_proba(self, X):
+        # Numerically stable logistic function: 1 / (1 + exp(-z))
+        positive = np.exp(-np.logaddexp(0.0, -self.decision_function(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python compact_model.py <model.pkl> <training_data.csv>")
+        sys.exit(1)
+
+    pickled, pickled_with = load_pickle(sys.argv[1])
+    exported = export_compact_model(pickled, pickled.feature_names_in_, sys.argv[2], sklearn_version=pickled_with)
+    print(f"✓ Exported {exported['model_type']} with {len(exported['features'])} features to '{COMPACT_MODEL_FILE}'")
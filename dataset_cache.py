@@ -0,0 +1,206 @@
+"""
+Columnar Dataset Cache
+======================
+Purpose: Parse data.csv once into a typed, column-per-file binary format and
+memory-map just the columns a program needs on later runs.
+
+WHY WE DO THIS:
+Every trainer/loader run used to re-parse the 32-column text file and fix the
+'concave points_*' column names again. The cache stores:
+    id           -> int64
+    diagnosis    -> uint8 codes + the list of labels ('B', 'M')
+    measurements -> float64 (30 columns, names with underscores)
+as NumPy .npy files. Opening a column is a memory map: nothing is read until
+it is used, and unused columns are never touched. The measurements are kept
+at the precision pandas parses them with (float64), so a cached run and a
+--no-cache run train on the same numbers and fit the same model.
+
+The cache lives in .dataset_cache/<sha256 of the CSV>/ next to the CSV, so a
+changed CSV automatically gets a fresh cache (older ones are removed). The
+hash is only recomputed when the file's size or modification time changes.
+
+Usage:
+    dataset = open_dataset('data.csv')
+    radius = dataset['radius_mean']            # float64 memmap
+    df = dataset.to_frame(['id', 'diagnosis', 'radius_mean'])
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+
+from compact_model import file_sha256
+
+CACHE_DIR_NAME = '.dataset_cache'
+# 2: no zero-filled rows for blank lines; 3: float64 measurements (older caches are rebuilt)
+CACHE_FORMAT_VERSION = 3
+CHUNK_SIZE = 100_000
+
+
+def _cache_root(csv_path):
+    return os.path.join(os.path.dirname(os.path.abspath(csv_path)), CACHE_DIR_NAME)
+
+
+def source_hash(csv_path):
+    """
+    SHA-256 of the CSV, remembered per (path, size, mtime) in the cache's
+    index.json so unchanged files aren't re-hashed on every run.
+    """
+    root = _cache_root(csv_path)
+    index_path = os.path.join(root, 'index.json')
+    info = os.stat(csv_path)
+    key = os.path.abspath(csv_path)
+
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+    entry = index.get(key)
+    if entry and entry['size'] == info.st_size and entry['mtime_ns'] == info.st_mtime_ns:
+        return entry['sha256']
+
+    digest = file_sha256(csv_path)
+    index[key] = {'size': info.st_size, 'mtime_ns': info.st_mtime_ns, 'sha256': digest}
+    os.makedirs(root, exist_ok=True)
+    # Through a temporary file: a run killed mid-write (or a concurrent reader) never sees half an index
+    temporary = f'{index_path}.{os.getpid()}.tmp'
+    with open(temporary, 'w') as f:
+        json.dump(index, f, indent=2)
+    os.replace(temporary, index_path)
+    return digest
+
+
+def _count_rows(csv_path):
+    """Upper bound on the data rows: lines after the header (pandas skips blank ones)."""
+    with open(csv_path, 'rb') as f:
+        lines = sum(block.count(b'\n') for block in iter(lambda: f.read(1 << 20), b''))
+        if f.tell() == 0:
+            return 0  # Empty file: no header, no rows
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b'\n':
+            lines += 1  # Last line has no newline
+    return max(lines - 1, 0)  # Header
+
+
+def build_cache(csv_path, cache_dir, chunk_size=CHUNK_SIZE):
+    """Convert the CSV into one .npy file per column, in chunks (bounded memory)."""
+    header = pd.read_csv(csv_path, nrows=0).columns
+    names = {column: column.strip().replace(' ', '_') for column in header if not column.startswith('Unnamed')}
+    measurements = [column for column in names if column not in ('id', 'diagnosis')]
+    n_rows = _count_rows(csv_path)
+
+    building = cache_dir + '.building'
+    shutil.rmtree(building, ignore_errors=True)
+    os.makedirs(building)
+
+    arrays = {'id': open_memmap(os.path.join(building, 'id.npy'), mode='w+', dtype=np.int64, shape=(n_rows,)),
+              'diagnosis': open_memmap(os.path.join(building, 'diagnosis.npy'), mode='w+', dtype=np.uint8,
+                                       shape=(n_rows,))}
+    for column in measurements:
+        arrays[names[column]] = open_memmap(os.path.join(building, f'{names[column]}.npy'), mode='w+',
+                                            dtype=np.float64, shape=(n_rows,))
+
+    labels = []
+    position = 0
+    for chunk in pd.read_csv(csv_path, usecols=list(names), chunksize=chunk_size):
+        end = position + len(chunk)
+        arrays['id'][position:end] = chunk['id'].to_numpy(dtype=np.int64)
+
+        diagnosis = chunk['diagnosis'].astype(str).str.strip().str.upper().to_numpy()
+        for label in pd.unique(diagnosis):
+            if label not in labels:
+                labels.append(label)
+        arrays['diagnosis'][position:end] = pd.Categorical(diagnosis, categories=labels).codes
+
+        for column in measurements:
+            arrays[names[column]][position:end] = chunk[column].to_numpy(dtype=np.float64)
+        position = end
+
+    for array in arrays.values():
+        array.flush()
+    columns = list(arrays)
+    del arrays
+
+    if position > n_rows:
+        raise ValueError(f"{csv_path}: parsed {position:,} rows but counted only {n_rows:,} lines")
+    if position < n_rows:
+        # Blank lines were counted but not parsed: cut every column to the rows actually written,
+        # otherwise the tail would read as zero-filled patients (id 0, first diagnosis label)
+        for name in columns:
+            path = os.path.join(building, f'{name}.npy')
+            full = np.load(path, mmap_mode='r')
+            trimmed = open_memmap(path + '.trim', mode='w+', dtype=full.dtype, shape=(position,))
+            trimmed[:] = full[:position]
+            trimmed.flush()
+            del full, trimmed
+            os.replace(path + '.trim', path)
+
+    with open(os.path.join(building, 'meta.json'), 'w') as f:
+        json.dump({'format_version': CACHE_FORMAT_VERSION, 'source': os.path.basename(csv_path),
+                   'rows': position, 'columns': ['id', 'diagnosis'] + [names[c] for c in measurements],
+                   'diagnosis_labels': labels}, f, indent=2)
+    os.replace(building, cache_dir)
+
+
+class CachedDataset:
+    """Read-only, memory-mapped columns of a cached CSV."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        with open(os.path.join(cache_dir, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.columns = self.meta['columns']
+        self.diagnosis_labels = self.meta['diagnosis_labels']
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def __getitem__(self, column):
+        if column not in self.columns:
+            raise KeyError(f"'{column}' is not in the dataset (columns: {', '.join(self.columns)})")
+        return np.load(os.path.join(self.cache_dir, f'{column}.npy'), mmap_mode='r')[:self.meta['rows']]
+
+    def labels(self):
+        """Diagnosis as a string array ('M' / 'B')."""
+        return np.asarray(self.diagnosis_labels, dtype=object)[self['diagnosis']]
+
+    def to_frame(self, columns=None):
+        """DataFrame of the requested columns (diagnosis decoded to categorical 'M'/'B')."""
+        data = {}
+        for column in columns or self.columns:
+            if column == 'diagnosis':
+                data[column] = pd.Categorical.from_codes(self['diagnosis'], categories=self.diagnosis_labels)
+            else:
+                data[column] = self[column]
+        return pd.DataFrame(data)
+
+
+def open_dataset(csv_path, chunk_size=CHUNK_SIZE):
+    """Open the cached copy of csv_path, building it first if the CSV is new or has changed."""
+    root = _cache_root(csv_path)
+    digest = source_hash(csv_path)
+    cache_dir = os.path.join(root, digest[:16])
+
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    valid = False
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            valid = json.load(f).get('format_version') == CACHE_FORMAT_VERSION
+    if not valid:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        build_cache(csv_path, cache_dir, chunk_size)
+        # Drop caches of older versions of the same file
+        source = os.path.basename(csv_path)
+        for name in os.listdir(root):
+            other = os.path.join(root, name)
+            other_meta = os.path.join(other, 'meta.json')
+            if other != cache_dir and os.path.exists(other_meta):
+                with open(other_meta) as f:
+                    if json.load(f).get('source') == source:
+                        shutil.rmtree(other, ignore_errors=True)
+
+    return CachedDataset(cache_dir)
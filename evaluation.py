@@ -0,0 +1,157 @@
+"""
+Threshold Evaluation
+====================
+Purpose: Evaluate a model at EVERY possible cut-off in one sorted pass, and
+pick the cut-off that keeps recall (malignant tumors caught) high enough.
+
+HOW IT WORKS:
+Sort the malignant probabilities once, highest first. Walking down the sorted
+list, every row either adds a true positive (malignant) or a false positive
+(benign), so a cumulative sum gives the confusion counts for every distinct
+threshold at once - O(n log n) for the sort, O(n) for everything else.
+ROC and precision/recall curves, AUCs and the operating point all come from
+those counts.
+
+A row is called malignant when probability >= threshold (same rule as
+scoring.score_block), so the threshold chosen here can be used as is.
+
+Usage:
+    report = evaluate(y_test, probabilities, min_recall=0.98)
+    print_report(report)
+    threshold = report['threshold']
+"""
+
+import numpy as np
+
+from scoring import DEFAULT_THRESHOLD
+
+MIN_RECALL = 0.98
+
+
+def threshold_curve(y_true, scores):
+    """
+    Confusion counts at every distinct threshold.
+    Returns a dict of arrays (thresholds descending): thresholds, tp, fp, fn, tn.
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    scores = np.asarray(scores, dtype=np.float64)
+
+    order = np.argsort(-scores, kind='mergesort')
+    sorted_scores = scores[order]
+    sorted_true = y_true[order]
+
+    # Last row of every run of equal scores: everything up to it is >= that score
+    last_of_group = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(sorted_scores) - 1]
+    tp = np.cumsum(sorted_true)[last_of_group]
+    fp = (last_of_group + 1) - tp
+    positives = int(y_true.sum())
+    negatives = len(y_true) - positives
+    return {
+        'thresholds': sorted_scores[last_of_group],
+        'tp': tp,
+        'fp': fp,
+        'fn': positives - tp,
+        'tn': negatives - fp,
+    }
+
+
+def _counts_at(curve, threshold):
+    """(tn, fp, fn, tp) when predicting malignant for score >= threshold."""
+    # Thresholds are descending: count how many are >= threshold
+    index = np.searchsorted(-curve['thresholds'], -threshold, side='right') - 1
+    if index < 0:  # Threshold above every score: nothing predicted malignant
+        return int(curve['tn'][0] + curve['fp'][0]), 0, int(curve['fn'][0] + curve['tp'][0]), 0
+    return int(curve['tn'][index]), int(curve['fp'][index]), int(curve['fn'][index]), int(curve['tp'][index])
+
+
+def metrics_from_counts(tn, fp, fn, tp):
+    """Accuracy, precision, recall, F1 and specificity from confusion counts."""
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return {
+        'accuracy': (tp + tn) / (tp + tn + fp + fn),
+        'precision': precision,
+        'recall': recall,
+        'f1': 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        'specificity': tn / (tn + fp) if tn + fp else 0.0,
+        'tn': tn, 'fp': fp, 'fn': fn, 'tp': tp,
+    }
+
+
+def classification_metrics(y_true, y_pred):
+    """All the metrics for hard 0/1 predictions, from one bincount of (actual, predicted) pairs."""
+    pairs = 2 * np.asarray(y_true, dtype=np.int64) + np.asarray(y_pred, dtype=np.int64)
+    tn, fp, fn, tp = (int(c) for c in np.bincount(pairs, minlength=4))
+    return metrics_from_counts(tn, fp, fn, tp)
+
+
+def metrics_at(curve, threshold):
+    return metrics_from_counts(*_counts_at(curve, threshold))
+
+
+def roc_curve(curve):
+    """(false positive rate, true positive rate), starting at (0, 0)."""
+    positives = curve['tp'][-1] + curve['fn'][-1]
+    negatives = curve['fp'][-1] + curve['tn'][-1]
+    fpr = np.r_[0.0, curve['fp'] / max(negatives, 1)]
+    tpr = np.r_[0.0, curve['tp'] / max(positives, 1)]
+    return fpr, tpr
+
+
+def pr_curve(curve):
+    """(recall, precision) for every threshold, highest threshold first."""
+    recall = curve['tp'] / np.maximum(curve['tp'] + curve['fn'], 1)
+    precision = curve['tp'] / np.maximum(curve['tp'] + curve['fp'], 1)
+    return recall, precision
+
+
+def roc_auc(curve):
+    fpr, tpr = roc_curve(curve)
+    return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+
+def average_precision(curve):
+    """Area under the PR curve as a step function (same definition as scikit-learn)."""
+    recall, precision = pr_curve(curve)
+    return float(np.sum(np.diff(np.r_[0.0, recall]) * precision))
+
+
+def recall_operating_point(curve, min_recall=MIN_RECALL):
+    """
+    The highest threshold whose recall is still >= min_recall.
+    Recall only grows as the threshold drops, while false positives grow too,
+    so the highest such threshold has the fewest false alarms.
+    """
+    recall, _ = pr_curve(curve)
+    reaching = np.flatnonzero(recall >= min_recall)
+    return float(curve['thresholds'][reaching[0]]) if len(reaching) else float(curve['thresholds'][-1])
+
+
+def evaluate(y_true, scores, min_recall=MIN_RECALL, threshold=None):
+    """
+    Full report for malignant probabilities `scores`.
+    threshold: use this cut-off instead of picking one (e.g. one chosen on training data).
+    """
+    curve = threshold_curve(y_true, scores)
+    if threshold is None:
+        threshold = recall_operating_point(curve, min_recall)
+    return {
+        'threshold': float(threshold),
+        'min_recall': min_recall,
+        'roc_auc': roc_auc(curve),
+        'average_precision': average_precision(curve),
+        'at_threshold': metrics_at(curve, threshold),
+        'at_default': metrics_at(curve, DEFAULT_THRESHOLD),
+        'curve': curve,
+    }
+
+
+def print_report(report, indent='   '):
+    """Print the operating point next to the default 0.5 cut-off."""
+    print(f"{indent}ROC AUC: {report['roc_auc']:.4f}   PR AUC (average precision): {report['average_precision']:.4f}")
+    print(f"{indent}{'cut-off':<22} {'recall':>7} {'precision':>9} {'accuracy':>8} {'FN':>4} {'FP':>4}")
+    for name, metrics in ((f"default {DEFAULT_THRESHOLD:.2f}", report['at_default']),
+                          (f"recall>={report['min_recall']:.2f} ({report['threshold']:.4f})",
+                           report['at_threshold'])):
+        print(f"{indent}{name:<22} {metrics['recall']:>7.2%} {metrics['precision']:>9.2%} "
+              f"{metrics['accuracy']:>8.2%} {metrics['fn']:>4} {metrics['fp']:>4}")
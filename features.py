@@ -0,0 +1,87 @@
+"""
+Engineered Features (Python version of 05_feature_engineering.sql)
+==================================================================
+Purpose: Compute the four engineered features in one vectorized NumPy pass,
+so training and serving don't need a round trip through MySQL.
+
+    perimeter_to_area_ratio = perimeter_mean^2 / area_mean   (NULL/NaN when area_mean <= 0)
+    radius_spread           = radius_worst - radius_mean
+    area_spread             = area_worst - area_mean
+    high_risk_flag          = 1 if radius_mean    > mean + 1 std
+                             and concavity_mean > mean + 1 std, else 0
+
+The mean + 1 std thresholds are "fitted" on the training rows only (population
+std, like MySQL's STDDEV), so the test rows don't shape a feature, and saved
+together with the model, so a single patient at serving time gets exactly the
+same flag as the training rows did.
+
+Usage:
+    thresholds = fit_thresholds(train_df)
+    engineered = compute_features(df, thresholds)             # DataFrame or dict of columns
+    df['high_risk_flag'] = high_risk_flag(df, thresholds)     # only the flag (needs 2 columns)
+"""
+
+import numpy as np
+
+ENGINEERED_FEATURES = ['perimeter_to_area_ratio', 'radius_spread', 'area_spread', 'high_risk_flag']
+
+# Raw measurements the engineered features are built from
+SOURCE_COLUMNS = ['radius_mean', 'perimeter_mean', 'area_mean', 'concavity_mean', 'radius_worst', 'area_worst']
+
+MODEL_BUNDLE_FILE = 'ml_model.pkl'
+
+
+def _column(block, name):
+    return np.asarray(block[name], dtype=np.float64)
+
+
+def round_decimal(values, decimals):
+    """Round half away from zero, like a MySQL DECIMAL(10, decimals) column does."""
+    scale = 10.0 ** decimals
+    return np.sign(values) * np.floor(np.abs(values) * scale + 0.5) / scale
+
+
+def fit_thresholds(block):
+    """Mean + 1 population std of radius_mean and concavity_mean (the high_risk_flag cut-offs)."""
+    thresholds = {}
+    for name in ('radius_mean', 'concavity_mean'):
+        values = _column(block, name)
+        thresholds[name] = float(np.nanmean(values) + np.nanstd(values))
+    return thresholds
+
+
+def high_risk_flag(block, thresholds):
+    """1 where radius_mean and concavity_mean are both above their thresholds, else 0."""
+    return ((_column(block, 'radius_mean') > thresholds['radius_mean'])
+            & (_column(block, 'concavity_mean') > thresholds['concavity_mean'])).astype(np.int64)
+
+
+def compute_features(block, thresholds, decimals=None):
+    """
+    Compute all four engineered features for a block of rows.
+
+    block: anything indexable by column name (DataFrame, dict of arrays, ...).
+    decimals: round the ratio/spreads like the DECIMAL(10,4) columns in MySQL (e.g. 4).
+    Returns an (n_rows, 4) float array in ENGINEERED_FEATURES order.
+    """
+    radius, perimeter, area, _, radius_worst, area_worst = (
+        _column(block, name) for name in SOURCE_COLUMNS
+    )
+
+    out = np.empty((len(radius), len(ENGINEERED_FEATURES)), dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(perimeter * perimeter, area, out=out[:, 0])
+    out[~(area > 0), 0] = np.nan  # Same as the CASE ... ELSE NULL in the SQL
+    np.subtract(radius_worst, radius, out=out[:, 1])
+    np.subtract(area_worst, area, out=out[:, 2])
+    out[:, 3] = high_risk_flag(block, thresholds)
+
+    if decimals is not None:
+        out[:, :3] = round_decimal(out[:, :3], decimals)
+    return out
+
+
+def save_model_bundle(model, feature_columns, thresholds, path=MODEL_BUNDLE_FILE):
+    """Save the model together with its feature order and fitted high_risk_flag thresholds."""
+    import joblib
+    joblib.dump({'model': model, 'feature_columns': list(feature_columns), 'feature_thresholds': thresholds}, path)
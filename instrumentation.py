@@ -0,0 +1,261 @@
+"""
+Stage Instrumentation
+=====================
+Purpose: Record how long each stage of a run took and what it cost - wall
+time, CPU time, peak memory and rows processed - and write it as a JSON run
+report, so a slow nightly run can be traced to the stage that got slow.
+
+HOW IT WORKS:
+    recorder = StageRecorder('train', enabled=True)
+    with recorder.stage('fit') as stage:        # a block...
+        model.fit(X, y)
+        stage.rows = len(X)
+    recorder.start('save')                       # ...or start/stop around
+    joblib.dump(model, 'cancer_model.pkl')       # straight-line script code
+    recorder.stop()
+    recorder.save('run_report.json')
+
+Per stage it records:
+    wall_seconds          time.perf_counter()
+    cpu_seconds           CPU of this process (all threads), plus
+    child_cpu_seconds     CPU of finished worker processes (pools)
+    peak_rss_mb           the stage's own peak resident memory: on Linux the
+                          kernel's high-water mark is reset when the stage
+                          starts (/proc/self/clear_refs); elsewhere it is the
+                          process peak so far; None on Windows (no
+                          `resource` module)
+    rows                  whatever the stage reports, and rows per second
+Stages with the same name (e.g. one per insert batch) are added up, with a
+call count.
+
+With profile_dir, each top-level stage also runs under cProfile: the stats
+go to <profile_dir>/<run>.<stage>.prof and the top functions to the report.
+
+A disabled recorder (the default in the trainers and the loader) hands out
+one shared no-op stage, so leaving the calls in costs about a microsecond
+per stage.
+"""
+
+import cProfile
+import contextlib
+import io
+import json
+import os
+import platform
+import pstats
+import sys
+import time
+from datetime import datetime, timezone
+
+REPORT_FILE = 'run_report.json'
+TOP_FUNCTIONS = 5
+
+_STATUS_FILE = '/proc/self/status'
+_CLEAR_REFS_FILE = '/proc/self/clear_refs'
+
+
+def _status_kb(field):
+    with open(_STATUS_FILE) as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1])
+    return 0
+
+
+def _can_reset_peak():
+    try:
+        with open(_CLEAR_REFS_FILE, 'w') as f:
+            f.write('5')
+        return _status_kb('VmHWM:') > 0
+    except OSError:
+        return False
+
+
+def _rusage_peak_mb():
+    """Process peak resident memory in MB, or None where there is no `resource` module (Windows)."""
+    try:
+        import resource  # Unix only: imported here so the trainers still import this module on Windows
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024  # Bytes on macOS, KB on Linux
+
+
+class _Stage:
+    """One running stage; set .rows inside the block to report throughput."""
+
+    __slots__ = ('name', 'rows', 'wall', 'cpu', 'child_cpu', 'peak_mb', 'profiler')
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.peak_mb = 0.0
+        self.profiler = None
+
+
+class _NullStage:
+    """What a disabled recorder hands out: does nothing, accepts .rows."""
+
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class StageRecorder:
+    """Collects per-stage measurements for one run (see the module docstring)."""
+
+    def __init__(self, run='run', enabled=True, profile_dir=None):
+        self.run = run
+        self.enabled = enabled
+        self.profile_dir = profile_dir
+        self.started_at = datetime.now(timezone.utc)
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._stack = []
+        self._results = {}  # Stage name -> totals, in first-seen order
+        self._profilers = {}
+        self._reset_peak = enabled and sys.platform.startswith('linux') and _can_reset_peak()
+        self._has_peak = self._reset_peak or (enabled and _rusage_peak_mb() is not None)
+
+    # -- Memory -----------------------------------------------------------
+    def _fold_peak(self):
+        """Credit the memory high-water mark since the last reset to every open stage."""
+        if not self._has_peak:
+            return
+        peak = _status_kb('VmHWM:') / 1024 if self._reset_peak else _rusage_peak_mb()
+        for stage in self._stack:
+            stage.peak_mb = max(stage.peak_mb, peak)
+
+    def _start_peak_window(self):
+        if self._reset_peak:
+            with open(_CLEAR_REFS_FILE, 'w') as f:
+                f.write('5')  # High-water mark := current RSS
+
+    # -- Stages -----------------------------------------------------------
+    def stage(self, name, rows=None):
+        """Context manager around one stage."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._stage(name, rows)
+
+    @contextlib.contextmanager
+    def _stage(self, name, rows):
+        stage = self._begin(name, rows)
+        try:
+            yield stage
+        finally:
+            self._end(stage)
+
+    def start(self, name, rows=None):
+        """Begin a stage without a `with` block; end it with stop()."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._begin(name, rows)
+
+    def stop(self, rows=None):
+        """End the most recently started stage (optionally reporting its rows)."""
+        if not self.enabled or not self._stack:
+            return
+        stage = self._stack[-1]
+        if rows is not None:
+            stage.rows = rows
+        self._end(stage)
+
+    def _begin(self, name, rows):
+        self._fold_peak()
+        stage = _Stage(name, rows)
+        self._stack.append(stage)
+        self._start_peak_window()
+        if self.profile_dir and len(self._stack) == 1:  # One profiler at a time: top-level stages only
+            stage.profiler = self._profilers.setdefault(name, cProfile.Profile())
+            stage.profiler.enable()
+        times = os.times()
+        stage.child_cpu = times.children_user + times.children_system
+        stage.cpu = time.process_time()
+        stage.wall = time.perf_counter()
+        return stage
+
+    def _end(self, stage):
+        wall = time.perf_counter() - stage.wall
+        cpu = time.process_time() - stage.cpu
+        times = os.times()
+        child_cpu = times.children_user + times.children_system - stage.child_cpu
+        if stage.profiler is not None:
+            stage.profiler.disable()
+        self._fold_peak()
+        self._stack.remove(stage)
+
+        totals = self._results.setdefault(stage.name, {
+            'stage': stage.name, 'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+            'child_cpu_seconds': 0.0, 'peak_rss_mb': 0.0, 'rows': None})
+        totals['calls'] += 1
+        totals['wall_seconds'] += wall
+        totals['cpu_seconds'] += cpu
+        totals['child_cpu_seconds'] += child_cpu
+        totals['peak_rss_mb'] = max(totals['peak_rss_mb'], stage.peak_mb) if self._has_peak else None
+        if stage.rows is not None:
+            totals['rows'] = (totals['rows'] or 0) + int(stage.rows)
+
+    # -- Report -----------------------------------------------------------
+    def _profile_summary(self, name, profiler):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f'{self.run}.{name}.prof')
+        profiler.dump_stats(path)
+        stats = pstats.Stats(profiler, stream=io.StringIO()).sort_stats('cumulative')
+        top = []
+        for (filename, line, function), (_, calls, _, cumulative, _) in stats.stats.items():
+            top.append((cumulative, f'{os.path.basename(filename)}:{line}({function})', calls))
+        top.sort(reverse=True)
+        return path, [{'function': where, 'calls': calls, 'cumulative_seconds': round(cumulative, 6)}
+                      for cumulative, where, calls in top[:TOP_FUNCTIONS]]
+
+    def report(self):
+        """The run report as a dict (what save() writes)."""
+        stages = []
+        for name, totals in self._results.items():
+            entry = dict(totals)
+            entry['rows_per_second'] = (entry['rows'] / entry['wall_seconds']
+                                        if entry['rows'] and entry['wall_seconds'] > 0 else None)
+            if name in self._profilers:
+                entry['profile'], entry['top_functions'] = self._profile_summary(name, self._profilers[name])
+            stages.append(entry)
+        return {
+            'run': self.run,
+            'argv': sys.argv,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'wall_seconds': time.perf_counter() - self._start_wall,
+            'cpu_seconds': time.process_time() - self._start_cpu,
+            'peak_rss_mb': _rusage_peak_mb(),
+            'peak_rss_per_stage': ('stage' if self._reset_peak else 'process so far') if self._has_peak
+                                  else 'unavailable',
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'stages': stages,
+        }
+
+    def save(self, path=REPORT_FILE):
+        report = self.report()
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        return report
+
+    def print_summary(self, report=None):
+        report = report or self.report()
+        print(f"\n   {'stage':<16} {'calls':>5} {'wall s':>9} {'cpu s':>9} {'peak MB':>9} {'rows':>11} {'rows/s':>11}")
+        for entry in report['stages']:
+            rows = f"{entry['rows']:,}" if entry['rows'] is not None else '-'
+            rate = f"{entry['rows_per_second']:,.0f}" if entry['rows_per_second'] else '-'
+            peak = f"{entry['peak_rss_mb']:.1f}" if entry['peak_rss_mb'] is not None else '-'
+            print(f"   {entry['stage']:<16} {entry['calls']:>5} {entry['wall_seconds']:>9.3f} "
+                  f"{entry['cpu_seconds'] + entry['child_cpu_seconds']:>9.3f} {peak:>9} "
+                  f"{rows:>11} {rate:>11}")
+
+
+NULL_RECORDER = StageRecorder('disabled', enabled=False)
@@ -0,0 +1,204 @@
+"""
+Model Registry
+==============
+Purpose: Keep every trained model as its own numbered version instead of
+overwriting cancer_model.pkl, and record which one is deployed.
+
+WHY WE DO THIS:
+07_ml_models.py used to write cancer_model.pkl / .json in place, so a bad
+retrain replaced the good model with no way back. With --warm-start the
+trainer can also decide to keep the previous model (when the new one scores
+worse on the holdout), which needs the previous model to still exist.
+
+HOW IT WORKS:
+    models/
+        registry.json          every version: how it was trained, holdout
+                               metrics, promoted or rejected; and 'current'
+        v0001/cancer_model.pkl
+        v0001/cancer_model.json
+        v0001/drift_reference.json
+        v0002/...
+A version's files are written once and never changed. Promoting a version
+copies its files over the deployed ones (cancer_model.pkl etc. in the working
+directory - what app.py, serve.py and batch_score.py load), each through a
+temporary file and os.replace, so a reader never sees half a model.
+The first time a registry is used, an existing unversioned cancer_model.pkl
+is imported as a version first, so it is never lost.
+
+Usage:
+    python model_registry.py                 # list versions
+    python model_registry.py --promote 3     # roll back / forward to v0003
+
+    registry = ModelRegistry()
+    version = registry.next_version()
+    joblib.dump(model, registry.path(version, MODEL_FILE))
+    registry.add(version, {...metrics...}, promote=True)
+"""
+
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+from compact_model import COMPACT_MODEL_FILE
+from drift_monitor import DRIFT_REFERENCE_FILE
+from scoring import MODEL_FILE
+
+MODELS_DIR = 'models'
+REGISTRY_FILE = 'registry.json'
+ARTIFACT_FILES = (MODEL_FILE, COMPACT_MODEL_FILE, DRIFT_REFERENCE_FILE)
+# Holdout metrics a retrained model must not lose on, most important first (missed cancers)
+HOLDOUT_METRICS = ('recall', 'roc_auc', 'accuracy')
+# Allowed drop per metric: one test row of ~115 moves accuracy by 0.9%; one missed cancer moves recall by ~2.4%
+REGRESSION_TOLERANCE = 0.01
+
+
+def _replace_file(source, target):
+    """Copy source over target atomically (a reader sees the old file or the new one)."""
+    temporary = f'{target}.tmp'
+    shutil.copyfile(source, temporary)
+    os.replace(temporary, target)
+
+
+class ModelRegistry:
+    """Numbered model versions under `directory` and the deployed copies in `deploy_dir`."""
+
+    def __init__(self, directory=MODELS_DIR, deploy_dir='.'):
+        self.directory = directory
+        self.deploy_dir = deploy_dir
+        self.registry_path = os.path.join(directory, REGISTRY_FILE)
+        if os.path.exists(self.registry_path):
+            with open(self.registry_path) as f:
+                self.data = json.load(f)
+        else:
+            self.data = {'current': None, 'versions': []}
+
+    # -- Lookups ----------------------------------------------------------
+    @property
+    def versions(self):
+        return self.data['versions']
+
+    def entry(self, version):
+        for entry in self.versions:
+            if entry['version'] == version:
+                return entry
+        raise KeyError(f"No model version {version} in {self.registry_path}")
+
+    def current(self):
+        """The deployed version's entry, or None for an empty registry."""
+        return None if self.data['current'] is None else self.entry(self.data['current'])
+
+    def next_version(self):
+        return max((entry['version'] for entry in self.versions), default=0) + 1
+
+    def path(self, version, name=MODEL_FILE):
+        """Where file `name` of `version` lives (its directory is created)."""
+        directory = os.path.join(self.directory, f'v{version:04d}')
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, name)
+
+    def deployed_path(self, name=MODEL_FILE):
+        return os.path.join(self.deploy_dir, name)
+
+    # -- Changes ----------------------------------------------------------
+    def _save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = f'{self.registry_path}.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(temporary, self.registry_path)
+
+    def import_deployed(self):
+        """
+        Empty registry but a deployed model: copy it in as a version (mode 'imported').
+        Returns that version, or None if there was nothing to import.
+        """
+        if self.versions or not os.path.exists(self.deployed_path(MODEL_FILE)):
+            return None
+        version = self.next_version()
+        files = []
+        for name in ARTIFACT_FILES:
+            if os.path.exists(self.deployed_path(name)):
+                shutil.copyfile(self.deployed_path(name), self.path(version, name))
+                files.append(name)
+        self.versions.append({'version': version, 'mode': 'imported', 'status': 'promoted', 'files': files,
+                              'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds')})
+        self.data['current'] = version
+        self._save()
+        return version
+
+    def add(self, version, details, promote):
+        """
+        Record `version` (its files already written with path()) and deploy it if `promote`.
+        details: anything worth keeping - training data, fit statistics, holdout metrics.
+        """
+        files = [name for name in ARTIFACT_FILES if os.path.exists(self.path(version, name))]
+        entry = {'version': version, **details, 'status': 'promoted' if promote else 'rejected',
+                 'files': files, 'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+        self.versions.append(entry)
+        if promote:
+            self.promote(version)
+        else:
+            self._save()
+        return entry
+
+    def promote(self, version):
+        """Make `version` the deployed model: copy its files into place and mark it current."""
+        entry = self.entry(version)
+        for name in entry['files']:
+            _replace_file(self.path(version, name), self.deployed_path(name))
+        entry['status'] = 'promoted'
+        self.data['current'] = version
+        self._save()
+
+
+def holdout_regressions(previous, candidate, tolerance=REGRESSION_TOLERANCE):
+    """
+    Metrics in HOLDOUT_METRICS where `candidate` is more than `tolerance` below `previous`
+    (both dicts of holdout metrics on the same rows). Empty list = no regression.
+    """
+    return [f"{name} {candidate[name]:.4f} < {previous[name]:.4f}" for name in HOLDOUT_METRICS
+            if name in previous and name in candidate and candidate[name] < previous[name] - tolerance]
+
+
+def print_versions(registry):
+    print(f"\n   {'version':>7}  {'status':<9} {'mode':<9} {'created (UTC)':<20} {'recall':>7} {'accuracy':>8} "
+          f"{'ROC AUC':>7} {'iters':>5}")
+    for entry in registry.versions:
+        holdout = entry.get('holdout') or {}
+        marker = '*' if entry['version'] == registry.data['current'] else ' '
+        recall = f"{holdout['recall']:.2%}" if 'recall' in holdout else '-'
+        accuracy = f"{holdout['accuracy']:.2%}" if 'accuracy' in holdout else '-'
+        auc = f"{holdout['roc_auc']:.4f}" if 'roc_auc' in holdout else '-'
+        iterations = (entry.get('fit') or {}).get('iterations', '-')
+        print(f"   {marker}v{entry['version']:04d}  {entry['status']:<9} {entry['mode']:<9} "
+              f"{entry['created_at'][:19]:<20} {recall:>7} {accuracy:>8} {auc:>7} {iterations:>5}")
+    print("   (* = deployed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List model versions or change the deployed one.")
+    parser.add_argument('--models-dir', default=MODELS_DIR, help=f"Registry directory (default: {MODELS_DIR}/)")
+    parser.add_argument('--promote', type=int, metavar='VERSION', help="Deploy this version (e.g. to roll back)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("MODEL REGISTRY")
+    print("=" * 60)
+    registry = ModelRegistry(args.models_dir)
+    if not registry.versions:
+        print(f"   No versions in {args.models_dir}/ yet - train with 07_ml_models.py")
+        return
+    if args.promote is not None:
+        try:
+            registry.promote(args.promote)
+        except KeyError as e:
+            print(f"   ERROR: {e.args[0]}")
+            raise SystemExit(1)
+        print(f"✓ Deployed v{args.promote:04d} ({', '.join(registry.entry(args.promote)['files'])})")
+    print_versions(registry)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Prediction Cache
+================
+Purpose: Remember recent single-patient predictions in the app, so submitting
+the same six measurements again doesn't run the model again.
+
+WHY WE DO THIS:
+The input widgets start at 14.0 / 19.0 / 90.0 / 600.0 / 0.09 / 0.08, and
+clinicians re-submit the same or almost the same values many times (every
+click on "Predict Diagnosis" reruns the whole script). Each of those ran the
+model - a scikit-learn predict_proba with its input validation - for an
+answer we already had.
+
+HOW IT WORKS:
+The key is (model fingerprint, threshold, inputs rounded to what the widgets
+display): 14.0001 and 14.00 show as the same number on screen, so they are
+one entry, and the cached answer is the one for the displayed values (those
+are what gets scored). The fingerprint (scoring.model_fingerprint: mtime and
+size of cancer_model.pkl) changes when the trainer writes a new model; the
+first lookup with a new fingerprint drops every entry of the old model.
+
+Entries live in an OrderedDict in least-recently-used order: a hit moves the
+entry to the end, and adding past max_entries evicts from the front. One
+lock guards the dict and the counters, so a single cache can be shared by all
+sessions and script threads (app.py keeps it in st.cache_resource). The model
+itself runs outside the lock; two threads missing on the same key at once
+both score it, which is harmless.
+
+Counters (stats()): hits, misses, evictions, invalidations, size and hit
+rate. A high eviction count next to a low hit rate means max_entries is too
+small for the traffic.
+
+Usage:
+    cache = PredictionCache(max_entries=4096, decimals=(2, 2, 2, 2, 4, 4))
+    label, risk = cache.predict(model, fingerprint, values, threshold)
+    cache.stats()
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from scoring import score_block
+
+MAX_ENTRIES = 4096  # A key and its answer are a few hundred bytes: about 1-2 MB when full
+
+
+class PredictionCache:
+    """Thread-safe LRU cache of (label, risk) per model and rounded input (see the module docstring)."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, decimals=None):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+        self.max_entries = max_entries
+        self.decimals = None if decimals is None else tuple(decimals)  # None = exact values
+        self._entries = OrderedDict()
+        self._fingerprint = None
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def key(self, values):
+        """The inputs as the widgets display them (rounded per column), as a hashable tuple."""
+        values = [float(v) for v in np.ravel(values)]
+        if self.decimals is None:
+            return tuple(values)
+        if len(values) != len(self.decimals):
+            raise ValueError(f"Expected {len(self.decimals)} values, got {len(values)}")
+        return tuple(round(v, d) for v, d in zip(values, self.decimals))
+
+    def predict(self, model, fingerprint, values, threshold):
+        """(label, malignant risk) for one patient: from the cache, or scored and remembered."""
+        inputs = self.key(values)
+        key = (fingerprint, float(threshold), inputs)
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                # A different model file: nothing cached for the old one is valid any more
+                if self._entries:
+                    self.invalidations += 1
+                    self._entries.clear()
+                self._fingerprint = fingerprint
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        labels, risk = score_block(model, np.array([inputs]), threshold)
+        result = (int(labels[0]), float(risk[0]))
+
+        with self._lock:
+            if fingerprint == self._fingerprint:  # Not if the model changed while we were scoring
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters for sizing max_entries: hits, misses, evictions, invalidations, size, hit_rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
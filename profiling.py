@@ -0,0 +1,373 @@
+"""
+Dataset Profiling in One Pass
+=============================
+Purpose: Compute, per diagnosis, the statistics that 03_data_exploration.sql
+and section 2 of 06_data_modeling.sql query one at a time (counts,
+percentages, averages, min/max, malignant vs benign comparisons) - plus
+standard deviation, quantiles and missing/negative counts - for ALL 30
+measurement columns, in a single chunked scan of the CSV.
+
+WHY WE DO THIS:
+Every statistic in the SQL scripts is its own full-table scan, and the numbers
+in KEY_FINDINGS.md were copied from their output by hand. Here each chunk of
+rows is read once and turned into a small summary; summaries of different
+chunks merge exactly, so the file never has to fit in memory.
+
+HOW IT WORKS:
+For every class and column a ClassProfile keeps:
+    count / missing / negative         plain counters
+    mean and M2 (sum of squared        merged with Chan's parallel formula,
+    deviations)                        which is exact and numerically stable
+    min / max
+    a quantile sketch                  counts in logarithmic buckets (each one
+                                       SKETCH_ACCURACY = 1% wide), merged by
+                                       adding the counts
+All of it is updated with whole-array NumPy operations per chunk.
+
+Profiles are cached in .dataset_cache/profiles/, keyed by the CSV's SHA-256
+(dataset_cache.source_hash), so profiling an unchanged file again is instant.
+
+Usage:
+    python profiling.py                            # profile data.csv and print the report
+    python profiling.py --data big.csv --chunk-size 200000 --output profile.csv
+    python profiling.py --markdown                 # comparison table for KEY_FINDINGS.md
+
+    profile = profile_csv('data.csv')
+    profile.summary()                              # DataFrame, one row per (class, column)
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import CACHE_DIR_NAME, source_hash
+
+PROFILE_FORMAT_VERSION = 1
+CHUNK_SIZE = 100_000
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Quantile sketch: |x| is bucketed on a log scale between SKETCH_MIN and
+# SKETCH_MAX; each bucket's representative value is within SKETCH_ACCURACY
+# (relative) of every value in it. Smaller magnitudes count as zero, larger ones land in the last bucket.
+SKETCH_ACCURACY = 0.01
+SKETCH_MIN = 1e-6
+SKETCH_MAX = 1e7
+_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+_LOG_GAMMA = np.log(_GAMMA)
+SKETCH_BUCKETS = int(np.ceil(np.log(SKETCH_MAX / SKETCH_MIN) / _LOG_GAMMA))
+# Sorted bucket layout: negatives (largest magnitude first), zero, positives
+_SKETCH_SIZE = 2 * SKETCH_BUCKETS + 1
+
+
+def _sketch_positions(values):
+    """Sorted-layout bucket of every value (NaN -> -1)."""
+    magnitude = np.abs(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bucket = np.floor(np.log(magnitude / SKETCH_MIN) / _LOG_GAMMA)
+    bucket = np.clip(np.nan_to_num(bucket, nan=0.0, neginf=0.0), 0, SKETCH_BUCKETS - 1).astype(np.int64)
+    positions = np.where(values < 0, SKETCH_BUCKETS - 1 - bucket, SKETCH_BUCKETS + 1 + bucket)
+    positions[magnitude < SKETCH_MIN] = SKETCH_BUCKETS
+    positions[np.isnan(values)] = -1
+    return positions
+
+
+def _sketch_values():
+    """Representative value of every sorted-layout bucket."""
+    # Bucket k holds [lower, lower * gamma); 2 * gamma / (1 + gamma) * lower is
+    # off by at most SKETCH_ACCURACY at both ends
+    lower = SKETCH_MIN * _GAMMA ** np.arange(SKETCH_BUCKETS)
+    representatives = lower * 2 * _GAMMA / (1 + _GAMMA)
+    return np.concatenate([-representatives[::-1], [0.0], representatives])
+
+
+class ClassProfile:
+    """Mergeable statistics of one class (or of all rows) for a list of columns."""
+
+    def __init__(self, n_columns):
+        self.rows = 0
+        self.count = np.zeros(n_columns, dtype=np.int64)  # Non-missing values
+        self.missing = np.zeros(n_columns, dtype=np.int64)
+        self.negative = np.zeros(n_columns, dtype=np.int64)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.minimum = np.full(n_columns, np.inf)
+        self.maximum = np.full(n_columns, -np.inf)
+        self.sketch = np.zeros((n_columns, _SKETCH_SIZE), dtype=np.int64)
+
+    @classmethod
+    def from_values(cls, values):
+        """Profile of a 2-D float array (rows x columns); NaN means missing."""
+        n_rows, n_columns = values.shape
+        profile = cls(n_columns)
+        profile.rows = n_rows
+        present = ~np.isnan(values)
+        profile.count = present.sum(axis=0)
+        profile.missing = n_rows - profile.count
+        profile.negative = (values < 0).sum(axis=0)
+        if n_rows:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                profile.mean = np.where(profile.count > 0, np.nansum(values, axis=0) / profile.count, 0.0)
+            profile.m2 = np.nansum((values - profile.mean) ** 2, axis=0)
+            profile.minimum = np.where(present, values, np.inf).min(axis=0)
+            profile.maximum = np.where(present, values, -np.inf).max(axis=0)
+
+            # One bincount for all columns: column c's buckets start at c * _SKETCH_SIZE
+            positions = _sketch_positions(values)
+            flat = (positions + np.arange(n_columns) * _SKETCH_SIZE)[positions >= 0]
+            profile.sketch = np.bincount(flat, minlength=n_columns * _SKETCH_SIZE).reshape(n_columns, _SKETCH_SIZE)
+        return profile
+
+    def merge(self, other):
+        """Add another profile's rows to this one (in place); returns self."""
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            share = np.where(total > 0, other.count / total, 0.0)
+        self.mean = self.mean + delta * share
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * share
+        self.count = total
+        self.rows += other.rows
+        self.missing = self.missing + other.missing
+        self.negative = self.negative + other.negative
+        self.minimum = np.minimum(self.minimum, other.minimum)
+        self.maximum = np.maximum(self.maximum, other.maximum)
+        self.sketch = self.sketch + other.sketch
+        return self
+
+    def std(self):
+        """Sample standard deviation (ddof=1, like pandas); NaN below two values."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+
+    def quantiles(self, qs=QUANTILES):
+        """Approximate quantiles (within SKETCH_ACCURACY), shape (columns, len(qs))."""
+        bucket_values = _sketch_values()
+        cumulative = np.cumsum(self.sketch, axis=1)
+        result = np.full((len(self.count), len(qs)), np.nan)
+        for column, counts in enumerate(cumulative):
+            n = counts[-1]
+            if n == 0:
+                continue
+            ranks = np.floor(np.asarray(qs) * (n - 1)) + 1  # 1-based rank of the quantile value
+            estimates = bucket_values[np.searchsorted(counts, ranks)]
+            # The true value lies in [min, max]; clamping makes q=0 and q=1 exact
+            result[column] = np.clip(estimates, self.minimum[column], self.maximum[column])
+        return result
+
+    def to_dict(self):
+        # Sketches are stored sparsely: most buckets are empty
+        columns, buckets = np.nonzero(self.sketch)
+        return {'rows': self.rows, 'count': self.count.tolist(), 'missing': self.missing.tolist(),
+                'negative': self.negative.tolist(), 'mean': self.mean.tolist(), 'm2': self.m2.tolist(),
+                'minimum': self.minimum.tolist(), 'maximum': self.maximum.tolist(),
+                'sketch': [columns.tolist(), buckets.tolist(), self.sketch[columns, buckets].tolist()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        profile = cls(len(data['count']))
+        profile.rows = data['rows']
+        for name in ('count', 'missing', 'negative'):
+            setattr(profile, name, np.asarray(data[name], dtype=np.int64))
+        for name in ('mean', 'm2', 'minimum', 'maximum'):
+            setattr(profile, name, np.asarray(data[name], dtype=np.float64))
+        columns, buckets, counts = data['sketch']
+        profile.sketch[np.asarray(columns, dtype=np.int64), np.asarray(buckets, dtype=np.int64)] = counts
+        return profile
+
+
+class DatasetProfile:
+    """Per-diagnosis ClassProfiles over the same measurement columns."""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.classes = {}
+
+    def update(self, diagnosis, values):
+        """Add a chunk: diagnosis labels (n,) and measurement values (n, columns)."""
+        diagnosis = np.asarray(diagnosis)
+        values = np.asarray(values, dtype=np.float64)
+        for label in pd.unique(diagnosis):
+            chunk_profile = ClassProfile.from_values(values[diagnosis == label])
+            if label in self.classes:
+                self.classes[label].merge(chunk_profile)
+            else:
+                self.classes[label] = chunk_profile
+        return self
+
+    def merge(self, other):
+        """Add another DatasetProfile over the same columns (e.g. from another chunk or file)."""
+        if other.columns != self.columns:
+            raise ValueError("Profiles cover different columns")
+        for label, class_profile in other.classes.items():
+            if label in self.classes:
+                self.classes[label].merge(class_profile)
+            else:
+                self.classes[label] = ClassProfile(len(self.columns)).merge(class_profile)  # A copy
+        return self
+
+    @property
+    def rows(self):
+        return sum(profile.rows for profile in self.classes.values())
+
+    def overall(self):
+        """All classes merged into one ClassProfile."""
+        total = ClassProfile(len(self.columns))
+        for profile in self.classes.values():
+            total.merge(profile)
+        return total
+
+    def class_counts(self):
+        """Rows and percentage per diagnosis (03_data_exploration.sql, section 1)."""
+        rows = self.rows
+        return pd.DataFrame([{'diagnosis': label, 'count': profile.rows,
+                              'percentage': round(100.0 * profile.rows / rows, 1) if rows else 0.0}
+                             for label, profile in sorted(self.classes.items())])
+
+    def summary(self, qs=QUANTILES):
+        """One row per (diagnosis, column), 'ALL' for every row together."""
+        frames = []
+        for label, profile in sorted(self.classes.items()) + [('ALL', self.overall())]:
+            frame = pd.DataFrame({
+                'diagnosis': label, 'column': self.columns, 'count': profile.count,
+                'missing': profile.missing, 'negative': profile.negative, 'mean': profile.mean,
+                'std': profile.std(),
+                'min': np.where(profile.count > 0, profile.minimum, np.nan),
+                'max': np.where(profile.count > 0, profile.maximum, np.nan),
+            })
+            quantiles = profile.quantiles(qs)
+            for position, q in enumerate(qs):
+                frame[f'p{round(q * 100):02d}'] = quantiles[:, position]
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True)
+
+    def comparison(self, first='M', second='B'):
+        """Average of every column for two classes and the difference (06_data_modeling.sql, section 2)."""
+        a, b = self.classes[first], self.classes[second]
+        return pd.DataFrame({'column': self.columns, f'{first}_mean': a.mean, f'{second}_mean': b.mean,
+                             'difference': a.mean - b.mean,
+                             # Difference in units of the overall spread, to rank columns
+                             'effect_size': (a.mean - b.mean) / self.overall().std()})
+
+    def to_dict(self):
+        return {'format_version': PROFILE_FORMAT_VERSION, 'columns': self.columns,
+                'sketch': {'accuracy': SKETCH_ACCURACY, 'min': SKETCH_MIN, 'max': SKETCH_MAX},
+                'classes': {label: profile.to_dict() for label, profile in self.classes.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        profile = cls(data['columns'])
+        profile.classes = {label: ClassProfile.from_dict(values) for label, values in data['classes'].items()}
+        return profile
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def _profile_path(csv_path):
+    root = os.path.join(os.path.dirname(os.path.abspath(csv_path)), CACHE_DIR_NAME, 'profiles')
+    return os.path.join(root, f'{source_hash(csv_path)[:16]}.json')
+
+
+def _cache_is_current(data):
+    return (data.get('format_version') == PROFILE_FORMAT_VERSION
+            and data.get('sketch') == {'accuracy': SKETCH_ACCURACY, 'min': SKETCH_MIN, 'max': SKETCH_MAX})
+
+
+def profile_csv(csv_path, chunk_size=CHUNK_SIZE, use_cache=True):
+    """
+    Profile every measurement column of a CSV like data.csv, one chunk at a time.
+    With use_cache the result is stored by the file's hash and reused while it is unchanged.
+    """
+    cache_path = _profile_path(csv_path) if use_cache else None
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            data = json.load(f)
+        if _cache_is_current(data):
+            return DatasetProfile.from_dict(data)
+
+    header = pd.read_csv(csv_path, nrows=0).columns
+    names = {column: column.strip().replace(' ', '_') for column in header if not column.startswith('Unnamed')}
+    measurements = [column for column in names if column not in ('id', 'diagnosis')]
+
+    profile = DatasetProfile([names[column] for column in measurements])
+    for chunk in pd.read_csv(csv_path, usecols=['diagnosis'] + measurements, chunksize=chunk_size):
+        diagnosis = chunk['diagnosis'].astype(str).str.strip().str.upper().to_numpy()
+        values = chunk[measurements].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+        profile.update(diagnosis, values)
+
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # Profiles of older versions of files in this folder are kept; they are a few KB each
+        temporary = cache_path + '.tmp'
+        profile.save(temporary)
+        os.replace(temporary, cache_path)
+    return profile
+
+
+def markdown_comparison(profile, columns=('radius_mean', 'area_mean', 'concavity_mean')):
+    """The 'Average Values Comparison' table of KEY_FINDINGS.md, from the profile."""
+    comparison = profile.comparison().set_index('column')
+    lines = ["| Feature | Malignant | Benign | Difference |", "|---------|-----------|--------|------------|"]
+    for column in columns:
+        row = comparison.loc[column]
+        digits = 2 if abs(row['M_mean']) < 10 else 1
+        name = column.replace('_', ' ').title()
+        lines.append(f"| {name} | {row['M_mean']:.{digits}f} | {row['B_mean']:.{digits}f} "
+                     f"| {row['difference']:+.{digits}f} |")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile all measurement columns per diagnosis in one pass.")
+    parser.add_argument('--data', default='data.csv', help="CSV to profile (default: data.csv)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help=f"Rows per chunk (default: {CHUNK_SIZE:,})")
+    parser.add_argument('--no-cache', action='store_true', help="Always rescan the file")
+    parser.add_argument('--output', help="Save the full per-class summary to this CSV file")
+    parser.add_argument('--markdown', action='store_true', help="Print the KEY_FINDINGS.md comparison table")
+    args = parser.parse_args()
+
+    profile = profile_csv(args.data, args.chunk_size, use_cache=not args.no_cache)
+
+    if args.markdown:
+        print(markdown_comparison(profile))
+        return
+
+    print("=" * 70)
+    print(f"DATASET PROFILE: {args.data}")
+    print("=" * 70)
+    print(f"\nRecords: {profile.rows:,}")
+    for _, row in profile.class_counts().iterrows():
+        print(f"   {row['diagnosis']}: {row['count']:,} ({row['percentage']}%)")
+
+    overall = profile.summary().query("diagnosis == 'ALL'")
+    problems = overall[(overall['missing'] > 0) | (overall['negative'] > 0)]
+    print(f"\nData quality: {int(overall['missing'].sum())} missing and {int(overall['negative'].sum())} "
+          f"negative values in {len(profile.columns)} columns")
+    for _, row in problems.iterrows():
+        print(f"   {row['column']}: {row['missing']} missing, {row['negative']} negative")
+
+    if {'M', 'B'} <= set(profile.classes):
+        print("\nMalignant vs benign (sorted by effect size = difference / overall std):")
+        comparison = profile.comparison().sort_values('effect_size', ascending=False, key=abs)
+        print(comparison.to_string(index=False, float_format=lambda value: f'{value:.4f}'))
+
+    print("\nQuantiles (all rows):")
+    columns = ['column', 'min'] + [f'p{round(q * 100):02d}' for q in QUANTILES] + ['max']
+    print(overall[columns].to_string(index=False, float_format=lambda value: f'{value:.4g}'))
+
+    if args.output:
+        profile.summary().to_csv(args.output, index=False)
+        print(f"\n✓ Profile saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Shared Scoring Helpers
+======================
+Purpose: Load the trained model and score blocks of patients in one vectorized call.
+Used by: batch_score.py (and anything else that needs predictions outside the app)
+
+load_model() accepts either the scikit-learn pickle (cancer_model.pkl) or the
+compact JSON artifact (cancer_model.json). Both score identically; the JSON one
+only needs NumPy, so it starts much faster.
+"""
+
+import os
+
+import numpy as np
+
+# The six inputs the model was trained on (must match 07_ml_models.py and the App)
+FEATURES = ['radius_mean', 'texture_mean', 'perimeter_mean', 'area_mean', 'smoothness_mean', 'concavity_mean']
+
+MODEL_FILE = 'cancer_model.pkl'
+DEFAULT_THRESHOLD = 0.5
+
+# Trainers store their chosen cut-off on the model under this attribute (see evaluation.py)
+THRESHOLD_ATTRIBUTE = 'decision_threshold_'
+
+
+def load_model(path=MODEL_FILE):
+    """Load the trained model from disk (.pkl via joblib, .json via CompactModel)."""
+    if path.endswith('.json'):
+        from compact_model import CompactModel
+        return CompactModel.load(path)
+
+    import joblib
+    return joblib.load(path)
+
+
+def model_threshold(model, default=DEFAULT_THRESHOLD):
+    """The cut-off stored with the model by the trainer, or `default` for older models without one."""
+    threshold = getattr(model, THRESHOLD_ATTRIBUTE, None)
+    return default if threshold is None else float(threshold)
+
+
+def model_fingerprint(path=MODEL_FILE):
+    """
+    Cheap identity of the model file: (modification time, size).
+    Changes whenever the trainer writes a new model, so caches keyed on it reload.
+    """
+    info = os.stat(path)
+    return info.st_mtime_ns, info.st_size
+
+
+def score_block(model, X, threshold=DEFAULT_THRESHOLD):
+    """
+    Score a 2-D block of patients (rows) x FEATURES (columns).
+
+    Returns (labels, probabilities) where labels is 1 for Malignant / 0 for Benign
+    and probabilities is the Malignant risk for every row.
+
+    WHY: model.predict() recomputes the probabilities that predict_proba() already
+    gives us, so we make one pass and derive the label from the probability.
+    """
+    proba = model.predict_proba(X)
+    malignant = proba[:, list(model.classes_).index(1)]
+    labels = (malignant >= threshold).astype(np.int8)
+    return labels, malignant
@@ -0,0 +1,364 @@
+"""
+Breast Cancer Prediction Service
+================================
+Purpose: Serve the same six-feature model as app.py over HTTP for other systems
+(e.g. the EHR integration), using only the Python standard library + NumPy.
+
+WHY WE DO THIS:
+Streamlit re-runs the whole app script on every interaction, so it can't be
+used as a backend. This service loads the model once and keeps it in memory.
+Concurrent single-patient requests are collected for a very short window and
+scored together in ONE vectorized predict_proba call (dynamic micro-batching),
+which is much cheaper than scoring them one by one.
+
+Endpoints:
+    POST /predict   {"features": {"radius_mean": 14.0, ...}}          -> one prediction
+                    {"features": [14.0, 19.0, 90.0, 600.0, 0.09, 0.08]}
+                    {"instances": [{...}, {...}, ...]}                  -> list of predictions
+    GET  /metrics   latency percentiles (p50/p99), throughput and batching counters
+    GET  /drift     input drift vs the training data, per window of scored rows
+                    (drift_monitor.py; needs drift_reference.json from 07_ml_models.py)
+    GET  /health    {"status": "ok"}
+
+Usage:
+    python serve.py --model cancer_model.json --port 8000 --max-batch-size 64 --max-wait-ms 2
+    python serve.py --drift-window 5000 --drift-log drift_reports.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+from drift_monitor import DRIFT_REFERENCE_FILE, WINDOW_ROWS, DriftMonitor, DriftReference
+from scoring import FEATURES, MODEL_FILE, DEFAULT_THRESHOLD, load_model, model_threshold, score_block
+
+MAX_BATCH_SIZE = 64     # Most single requests scored in one model call
+MAX_WAIT_MS = 2.0       # Longest a request waits for others to join its batch
+LATENCY_WINDOW = 10_000  # Recent request latencies kept for the percentiles
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class BadRequest(Exception):
+    """The request body can't be turned into feature rows."""
+
+
+def parse_rows(payload):
+    """
+    Turn a request body into (rows, is_batch).
+    Each instance can be a {feature: value} object or a list in FEATURES order.
+    """
+    if not isinstance(payload, dict):
+        raise BadRequest("Body must be a JSON object")
+    if 'instances' in payload:
+        instances, is_batch = payload['instances'], True
+        if not isinstance(instances, list) or not instances:
+            raise BadRequest("'instances' must be a non-empty list")
+    elif 'features' in payload:
+        instances, is_batch = [payload['features']], False
+    else:
+        raise BadRequest("Expected 'features' (one patient) or 'instances' (many patients)")
+
+    rows = []
+    for instance in instances:
+        if isinstance(instance, dict):
+            missing = [name for name in FEATURES if name not in instance]
+            if missing:
+                raise BadRequest(f"Missing features: {', '.join(missing)}")
+            values = [instance[name] for name in FEATURES]
+        elif isinstance(instance, list) and len(instance) == len(FEATURES):
+            values = instance
+        else:
+            raise BadRequest(f"Each instance needs the {len(FEATURES)} features: {', '.join(FEATURES)}")
+        try:
+            rows.append([float(v) for v in values])
+        except (TypeError, ValueError):
+            raise BadRequest("Feature values must be numbers")
+    rows = np.array(rows, dtype=np.float64)
+    # json accepts NaN/Infinity: caught here, one bad row would fail the whole micro-batch it joins
+    bad = np.flatnonzero(~np.isfinite(rows).all(axis=1))
+    if len(bad):
+        raise BadRequest(f"Feature values must be finite numbers (instance {int(bad[0])})")
+    return rows, is_batch
+
+
+def prediction_json(label, probability):
+    return {'prediction': 'M' if label == 1 else 'B', 'malignant_probability': round(float(probability), 6)}
+
+
+class Metrics:
+    """Request latency percentiles, throughput and batching counters."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.errors = 0
+        self.predictions = 0
+        self.model_calls = 0
+        self.micro_batches = 0
+        self.micro_batched_rows = 0
+
+    def record_request(self, seconds, ok=True):
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self.latencies.append(seconds)
+
+    def record_model_call(self, rows, micro_batch=False):
+        self.model_calls += 1
+        self.predictions += rows
+        if micro_batch:
+            self.micro_batches += 1
+            self.micro_batched_rows += rows
+
+    def snapshot(self):
+        uptime = time.perf_counter() - self.started
+        latencies_ms = np.array(self.latencies) * 1000.0
+        p50, p99 = np.percentile(latencies_ms, [50, 99]) if len(latencies_ms) else (0.0, 0.0)
+        return {
+            'uptime_seconds': round(uptime, 3),
+            'requests': self.requests,
+            'errors': self.errors,
+            'predictions': self.predictions,
+            'model_calls': self.model_calls,
+            'micro_batches': self.micro_batches,
+            'mean_micro_batch_size': (round(self.micro_batched_rows / self.micro_batches, 2)
+                                      if self.micro_batches else 0.0),
+            'requests_per_second': round(self.requests / uptime, 2) if uptime else 0.0,
+            'predictions_per_second': round(self.predictions / uptime, 2) if uptime else 0.0,
+            'latency_ms': {'p50': round(float(p50), 3), 'p99': round(float(p99), 3),
+                           'window': len(latencies_ms)},
+        }
+
+
+def observe_drift(drift, rows):
+    """Feed scored rows to the drift monitor (if any). Monitoring never fails or holds up a prediction."""
+    if drift is None:
+        return
+    try:
+        drift.observe(rows)
+    except Exception as e:
+        print(f"   WARNING: drift monitoring skipped {len(rows)} rows ({type(e).__name__}: {e})")
+
+
+class MicroBatcher:
+    """
+    Collects single-patient requests and scores them together.
+
+    A batch is scored as soon as it has max_batch_size rows, or max_wait_ms after
+    its first row arrived, whichever comes first.
+    """
+
+    def __init__(self, model, metrics, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS,
+                 threshold=DEFAULT_THRESHOLD, drift=None):
+        self.model = model
+        self.metrics = metrics
+        self.drift = drift
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.threshold = threshold
+        self.queue = asyncio.Queue()
+
+    async def predict(self, row):
+        """Queue one feature row and wait for its (label, probability)."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            rows = np.stack([row for row, _ in batch])
+            try:
+                labels, proba = score_block(self.model, rows, self.threshold)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.metrics.record_model_call(len(batch), micro_batch=True)
+            for i, (_, future) in enumerate(batch):
+                if not future.done():  # The client may have gone away
+                    future.set_result((labels[i], proba[i]))
+            # After the answers: the waiting requests don't depend on the monitor
+            observe_drift(self.drift, rows)
+
+
+class PredictionServer:
+    """Minimal HTTP/1.1 server (keep-alive, JSON bodies) on top of asyncio streams."""
+
+    def __init__(self, model, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS,
+                 threshold=DEFAULT_THRESHOLD, drift=None):
+        self.model = model
+        self.threshold = threshold
+        self.metrics = Metrics()
+        self.drift = drift
+        self.batcher = MicroBatcher(model, self.metrics, max_batch_size, max_wait_ms, threshold, drift)
+
+    async def handle_predict(self, body):
+        try:
+            rows, is_batch = parse_rows(json.loads(body or b'null'))
+        except (ValueError, BadRequest) as e:
+            return 400, {'error': str(e)}
+
+        if not is_batch:
+            label, probability = await self.batcher.predict(rows[0])
+            return 200, prediction_json(label, probability)
+
+        # Batch requests are already vectorized, score them directly
+        labels, proba = score_block(self.model, rows, self.threshold)
+        self.metrics.record_model_call(len(rows))
+        observe_drift(self.drift, rows)
+        return 200, {'predictions': [prediction_json(l, p) for l, p in zip(labels, proba)]}
+
+    async def route(self, method, path, body):
+        if path == '/predict':
+            if method != 'POST':
+                return 405, {'error': 'Use POST'}
+            return await self.handle_predict(body)
+        if path == '/metrics':
+            return 200, self.metrics.snapshot()
+        if path == '/drift':
+            if self.drift is None:
+                return 404, {'error': f"Drift monitoring is off (no {DRIFT_REFERENCE_FILE})"}
+            return 200, self.drift.snapshot()
+        if path == '/health':
+            return 200, {'status': 'ok', 'features': FEATURES}
+        return 404, {'error': f"Unknown path '{path}'"}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                start = time.perf_counter()
+                try:
+                    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    status, response = 400, {'error': 'Invalid Content-Length'}
+                    body = b''
+                elif length > MAX_BODY_BYTES:
+                    status, response = 413, {'error': 'Request body too large'}
+                    body = b''
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    try:
+                        status, response = await self.route(method.upper(), path.split('?', 1)[0], body)
+                    except Exception as e:
+                        status, response = 500, {'error': str(e)}
+
+                payload = json.dumps(response).encode()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + payload
+                )
+                await writer.drain()
+
+                if path.startswith('/predict'):
+                    self.metrics.record_request(time.perf_counter() - start, ok=(status == 200))
+                if not keep_alive or status == 413 or length < 0:  # Can't find the next request
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        batcher_task = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"✓ Listening on http://{host}:{port} "
+              f"(max batch {self.batcher.max_batch_size}, max wait {self.batcher.max_wait * 1000:g} ms)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher_task.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP prediction service for the breast cancer model.")
+    parser.add_argument('--model', default=MODEL_FILE, help=f"Model file, .pkl or .json (default: {MODEL_FILE})")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE,
+                        help=f"Most single requests per model call (default: {MAX_BATCH_SIZE})")
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS,
+                        help=f"Longest wait for a batch to fill, in ms (default: {MAX_WAIT_MS})")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="Malignant probability cut-off (default: the one stored with the model, else 0.5)")
+    parser.add_argument('--drift-reference', default=DRIFT_REFERENCE_FILE,
+                        help=f"Training profile for GET /drift (default: {DRIFT_REFERENCE_FILE}; skipped if missing)")
+    parser.add_argument('--drift-window', type=int, default=WINDOW_ROWS,
+                        help=f"Scored rows per drift report (default: {WINDOW_ROWS})")
+    parser.add_argument('--drift-log', help="Append every drift report to this JSON lines file")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BREAST CANCER PREDICTION SERVICE")
+    print("=" * 60)
+    print(f"Loading model from '{args.model}'...")
+    model = load_model(args.model)
+    threshold = model_threshold(model) if args.threshold is None else args.threshold
+    print(f"Decision threshold: {threshold:.4f}")
+
+    drift = None
+    if os.path.exists(args.drift_reference):
+        reference = DriftReference.load(args.drift_reference)
+        if reference.features != FEATURES:
+            raise SystemExit(f"ERROR: {args.drift_reference} is for features {reference.features}, not {FEATURES}")
+        drift = DriftMonitor(reference, args.drift_window, args.drift_log)
+        print(f"Drift monitoring: reports every {args.drift_window:,} rows vs '{args.drift_reference}'")
+    else:
+        print(f"Drift monitoring off: '{args.drift_reference}' not found (run 07_ml_models.py)")
+
+    server = PredictionServer(model, args.max_batch_size, args.max_wait_ms, threshold, drift)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n✓ Service stopped")
+    finally:
+        if drift is not None:
+            drift.flush()  # The last, partial window (logged with --drift-log)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Deterministic Stratified Train/Test Split
+=========================================
+Purpose: Decide train vs test from the patient id and diagnosis, the same way
+in Python (NumPy), SQLite and MySQL, so every trainer and the SQL pipeline
+agree.
+
+HOW IT WORKS:
+1. Each id is mixed with a salt into a bucket number 0-9999:
+       x = ((id mod P) * A + salt) mod P
+       x = (x * x + A) mod P
+       x = (x * x + salt) mod P
+       bucket = x mod 10000               (P = 2^31 - 1, A = 48271)
+   Every product stays below 2^62, so plain BIGINT arithmetic gives the same
+   answer in every engine.
+2. Stratification: per diagnosis, count the rows in every bucket and cut at
+   the lowest bucket where the running count reaches the class's target,
+   round(TEST_FRACTION * class rows). The test set is every row whose bucket
+   is below its class's cut-off. So each class gets 20% test rows, up to
+   ties within the last bucket (a bucket holds 1/10000 of the ids).
+
+The per-class bucket counts add up across chunks (bucket_counts), so the
+streaming trainer gets the same cut-offs from one extra pass over id and
+diagnosis, with memory for 10000 counters per class. In SQL it is a GROUP BY
+plus a running SUM() OVER (window functions: MySQL 8+, SQLite 3.25+).
+
+WHY:
+- One pass over the rows plus a running sum over 10000 counters per class:
+  no ORDER BY RAND() sort of the table.
+- The same split on every run and in every tool.
+- Nearly stable: a new patient never changes an existing patient's bucket.
+  It can move its class's cut-off by at most one bucket, so only patients
+  in the boundary bucket can change sides.
+
+About SPLIT_SALT: 30 was hand-picked. When the split was a plain
+"bucket < 2000" cut (no stratification), it was one of the few salts in 0-59
+that put both classes of data.csv near 20% test rows. The per-class cut makes
+that tuning unnecessary. The value is kept so the held-out patients stay
+almost the same as before the change.
+
+Usage:
+    test = is_test(df['id'], df['diagnosis'])                    # NumPy / pandas
+    f"INSERT INTO train_test_split (id, dataset_type) {sql_split_select()}"   # SQL
+"""
+
+import numpy as np
+
+PRIME = 2_147_483_647  # 2^31 - 1
+MULTIPLIER = 48_271
+BUCKETS = 10_000
+SPLIT_SALT = 30  # Hand-picked (see above); also in SQL_Analysis/06_data_modeling.sql
+TEST_FRACTION = 0.2
+
+
+def split_bucket(ids, salt=SPLIT_SALT):
+    """Bucket 0-9999 for every id (vectorized)."""
+    x = np.asarray(ids, dtype=np.int64) % PRIME
+    x = (x * MULTIPLIER + salt) % PRIME
+    x = (x * x + MULTIPLIER) % PRIME
+    x = (x * x + salt) % PRIME
+    return x % BUCKETS
+
+
+def _test_buckets(test_fraction):
+    return int(round(test_fraction * BUCKETS))
+
+
+def class_target(rows, test_fraction=TEST_FRACTION):
+    """Test rows for a class of `rows` rows: round half up, in integers (the SQL does the same)."""
+    return (rows * _test_buckets(test_fraction) + BUCKETS // 2) // BUCKETS
+
+
+def bucket_counts(ids, labels, salt=SPLIT_SALT, counts=None):
+    """
+    {label: rows per bucket (array of BUCKETS)} for these rows.
+    Pass the result back in as `counts` to add more chunks.
+    """
+    counts = {} if counts is None else counts
+    buckets = split_bucket(ids, salt)
+    labels = np.asarray(labels)
+    for label in np.unique(labels):
+        histogram = np.bincount(buckets[labels == label], minlength=BUCKETS)
+        key = label.item() if hasattr(label, 'item') else label
+        counts[key] = counts[key] + histogram if key in counts else histogram
+    return counts
+
+
+def cutoffs_from_counts(counts, test_fraction=TEST_FRACTION):
+    """{label: cut-off bucket}: the class's rows in buckets below it are its test rows."""
+    cutoffs = {}
+    for label, histogram in counts.items():
+        target = class_target(int(histogram.sum()), test_fraction)
+        # First bucket whose running count reaches the target; everything up to and including it is test
+        cutoffs[label] = int(np.searchsorted(np.cumsum(histogram), target) + 1) if target else 0
+    return cutoffs
+
+
+def test_cutoffs(ids, labels, test_fraction=TEST_FRACTION, salt=SPLIT_SALT):
+    return cutoffs_from_counts(bucket_counts(ids, labels, salt), test_fraction)
+
+
+def is_test(ids, labels, test_fraction=TEST_FRACTION, salt=SPLIT_SALT, cutoffs=None):
+    """
+    Boolean mask: True for the ids in the test set.
+    cutoffs: from cutoffs_from_counts() over the whole dataset, when these rows are only a chunk of it.
+    """
+    if cutoffs is None:
+        cutoffs = test_cutoffs(ids, labels, test_fraction, salt)
+    buckets = split_bucket(ids, salt)
+    labels = np.asarray(labels)
+    test = np.zeros(len(buckets), dtype=bool)
+    for label in np.unique(labels):
+        rows = labels == label
+        test[rows] = buckets[rows] < cutoffs[label.item() if hasattr(label, 'item') else label]
+    return test
+
+
+def dataset_type(ids, labels, test_fraction=TEST_FRACTION, salt=SPLIT_SALT):
+    """'train' / 'test' for every id, like the train_test_split table."""
+    return np.where(is_test(ids, labels, test_fraction, salt), 'test', 'train')
+
+
+def sql_bucket(column='id', salt=SPLIT_SALT):
+    """The bucket as a SQL expression (MySQL and SQLite)."""
+    x = f"((({column}) % {PRIME}) * {MULTIPLIER} + {salt}) % {PRIME}"
+    x = f"(({x}) * ({x}) + {MULTIPLIER}) % {PRIME}"
+    x = f"(({x}) * ({x}) + {salt}) % {PRIME}"
+    return f"(({x}) % {BUCKETS})"
+
+
+def sql_split_select(table='cleaned_breast_cancer_data', id_column='id', label_column='diagnosis',
+                     test_fraction=TEST_FRACTION, salt=SPLIT_SALT):
+    """
+    SELECT of (id, dataset_type) for every row of `table`, with the same per-class cut-offs as
+    is_test(). Derived tables only (no WITH), so it also works after MySQL's INSERT INTO ... .
+    """
+    test_buckets = _test_buckets(test_fraction)
+    # running >= round-half-up(total * test_buckets / BUCKETS), without division:
+    reached = f"(running + 1) * {BUCKETS} > total * {test_buckets} + {BUCKETS // 2}"
+    no_test_rows = f"total * {test_buckets} + {BUCKETS // 2} < {BUCKETS}"
+    return f"""
+        SELECT rows_.id, CASE WHEN rows_.bucket < cut.cutoff THEN 'test' ELSE 'train' END AS dataset_type
+        FROM (SELECT {id_column} AS id, {label_column} AS label, {sql_bucket(id_column, salt)} AS bucket
+              FROM {table}) AS rows_
+        JOIN (
+            SELECT label, MIN(CASE WHEN {no_test_rows} THEN 0 ELSE bucket + 1 END) AS cutoff
+            FROM (
+                SELECT label, bucket,
+                       SUM(n) OVER (PARTITION BY label ORDER BY bucket) AS running,
+                       SUM(n) OVER (PARTITION BY label) AS total
+                FROM (
+                    SELECT label, bucket, COUNT(*) AS n
+                    FROM (SELECT {label_column} AS label, {sql_bucket(id_column, salt)} AS bucket
+                          FROM {table}) AS bucketed
+                    GROUP BY label, bucket
+                ) AS histogram
+            ) AS cumulative
+            WHERE {reached}
+            GROUP BY label
+        ) AS cut ON cut.label = rows_.label
+    """
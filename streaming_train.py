@@ -0,0 +1,166 @@
+"""
+Out-of-Core (Streaming) Training
+================================
+Purpose: Train the breast cancer model on CSV files that are larger than RAM.
+
+HOW IT WORKS:
+0. Pass 0 reads only id and diagnosis and counts rows per split bucket and
+   class, which gives the stratified split's cut-offs (split.py).
+1. Pass 1 reads the file in chunks and computes the mean / std of every
+   feature over the training rows (for scaling).
+2. Each epoch reads the file in chunks again and updates an incremental
+   logistic-regression model (SGDClassifier with log loss) with partial_fit().
+   A second model sees the same chunks minus the calibration fold: 1 in 5
+   training rows, picked by hashing the id with another salt.
+3. The decision threshold: the second model scores the fold's malignant rows,
+   rows it never trained on, and the threshold is the highest one that keeps
+   --min-recall on them. This is what the in-memory trainer does with 5-fold
+   out-of-fold predictions, with one fold. Only those scores are kept in
+   memory (8 bytes per malignant calibration row; recall needs no others).
+4. A final pass scores the held-out test rows at that threshold.
+
+The test rows are picked by hashing the patient id and cutting per diagnosis
+(split.py), so the same rows are held out on every pass and every run - and
+they are the same test rows the in-memory trainer and the SQL pipeline use -
+without keeping a list in memory.
+Only one chunk is ever in memory, so memory use doesn't grow with the file.
+
+The scaling is folded into the final coefficients, so the saved model takes raw
+measurements like the in-memory model does (app.py and batch_score.py work
+unchanged).
+
+Used by: python 07_ml_models.py --streaming
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+
+from evaluation import MIN_RECALL, recall_operating_point, threshold_curve
+from scoring import DEFAULT_THRESHOLD, THRESHOLD_ATTRIBUTE
+from split import bucket_counts, cutoffs_from_counts, is_test, split_bucket
+
+CHUNK_SIZE = 100_000
+EPOCHS = 5
+RANDOM_STATE = 42
+CALIBRATION_SALT = 7  # Any salt but split.SPLIT_SALT, so the fold doesn't follow the test split
+CALIBRATION_FOLDS = 5  # 1 in 5 training rows picks the threshold
+
+
+def split_cutoffs(path, chunk_size=CHUNK_SIZE):
+    """Pass 0: the stratified split's per-class cut-offs for the whole file (split.py)."""
+    counts = None
+    for chunk in pd.read_csv(path, usecols=['id', 'diagnosis'], chunksize=chunk_size):
+        y = (chunk['diagnosis'].to_numpy() == 'M').astype(np.int8)
+        counts = bucket_counts(chunk['id'].to_numpy(), y, counts=counts)
+    return cutoffs_from_counts(counts or {})
+
+
+def read_chunks(path, features, cutoffs, chunk_size=CHUNK_SIZE):
+    """
+    Yield (X, y, is_test, is_calibration) for each chunk, parsing only the columns we need.
+    cutoffs: split_cutoffs(). is_calibration marks the training rows of the calibration fold.
+    """
+    for chunk in pd.read_csv(path, usecols=['id', 'diagnosis'] + features, chunksize=chunk_size):
+        X = chunk[features].to_numpy(dtype=np.float64)
+        y = (chunk['diagnosis'].to_numpy() == 'M').astype(np.int8)
+        ids = chunk['id'].to_numpy()
+        test = is_test(ids, y, cutoffs=cutoffs)
+        yield X, y, test, ~test & (split_bucket(ids, CALIBRATION_SALT) % CALIBRATION_FOLDS == 0)
+
+
+def scaling_stats(path, features, cutoffs, chunk_size=CHUNK_SIZE):
+    """
+    Pass 1: mean and std of every feature over the training rows.
+    Chunk results are merged with Chan's parallel formula, so it stays accurate for huge files.
+    """
+    count = 0
+    mean = np.zeros(len(features))
+    m2 = np.zeros(len(features))
+    for X, _, is_test, _ in read_chunks(path, features, cutoffs, chunk_size):
+        X = X[~is_test]
+        if len(X) == 0:
+            continue
+        n = len(X)
+        chunk_mean = X.mean(axis=0)
+        chunk_m2 = ((X - chunk_mean) ** 2).sum(axis=0)
+
+        delta = chunk_mean - mean
+        total = count + n
+        mean = mean + delta * n / total
+        m2 = m2 + chunk_m2 + delta ** 2 * count * n / total
+        count = total
+
+    std = np.sqrt(m2 / count)
+    std[std == 0] = 1.0
+    return mean, std, count
+
+
+def train_streaming(path, features, chunk_size=CHUNK_SIZE, epochs=EPOCHS, random_state=RANDOM_STATE,
+                    verbose=True, cutoffs=None, min_recall=MIN_RECALL):
+    """
+    Fit an SGD logistic regression over chunked reads of `path`.
+    Returns (model, accuracy, confusion_matrix) with the metrics from the hash-held-out test rows,
+    at the model's decision_threshold_ (picked for `min_recall` on the calibration fold). With no
+    malignant row in the fold there is nothing to pick it from: the model gets no threshold.
+    cutoffs: split_cutoffs(path), if the caller already has them.
+    """
+    if cutoffs is None:
+        cutoffs = split_cutoffs(path, chunk_size)
+    mean, std, train_rows = scaling_stats(path, features, cutoffs, chunk_size)
+    if verbose:
+        print(f"   Pass 1: scaling statistics from {train_rows:,} training rows")
+
+    rng = np.random.default_rng(random_state)
+    model = SGDClassifier(loss='log_loss', alpha=1e-4, random_state=random_state)
+    # Same settings and chunks, without the calibration fold: its scores on the fold pick the threshold
+    calibration_model = SGDClassifier(loss='log_loss', alpha=1e-4, random_state=random_state)
+    for epoch in range(1, epochs + 1):
+        for X, y, is_test, is_calibration in read_chunks(path, features, cutoffs, chunk_size):
+            train = ~is_test
+            if not train.any():
+                continue
+            # Shuffle within the chunk so SGD doesn't see long runs of one class
+            order = rng.permutation(int(train.sum()))
+            X_train, y_train = ((X[train] - mean) / std)[order], y[train][order]
+            model.partial_fit(X_train, y_train, classes=[0, 1])
+            fit = ~is_calibration[train][order]
+            if fit.any():
+                calibration_model.partial_fit(X_train[fit], y_train[fit], classes=[0, 1])
+        if verbose:
+            print(f"   Epoch {epoch}/{epochs} done")
+
+    # Threshold pass: out-of-fold malignant probabilities for the calibration rows
+    malignant_scores = []
+    if hasattr(calibration_model, 'coef_'):
+        for X, y, _, is_calibration in read_chunks(path, features, cutoffs, chunk_size):
+            rows = is_calibration & (y == 1)
+            if rows.any():
+                malignant_scores.append(calibration_model.predict_proba((X[rows] - mean) / std)[:, 1])
+    threshold = None
+    if malignant_scores:
+        scores = np.concatenate(malignant_scores)
+        threshold = recall_operating_point(threshold_curve(np.ones(len(scores)), scores), min_recall)
+        setattr(model, THRESHOLD_ATTRIBUTE, threshold)
+        if verbose:
+            print(f"   Threshold pass: {threshold:.3g} keeps recall >= {min_recall:.0%} "
+                  f"on {len(scores):,} malignant calibration rows")
+    elif verbose:
+        print("   Threshold pass: no malignant calibration rows - the model gets no decision threshold")
+
+    # Fold the scaling into the coefficients: w.(x - mean)/std + b == (w/std).x + (b - w.mean/std)
+    weights = model.coef_[0] / std
+    model.coef_ = weights.reshape(1, -1)
+    model.intercept_ = model.intercept_ - np.dot(weights, mean)
+    model.feature_names_in_ = np.array(features, dtype=object)
+
+    # Final pass: evaluate on the held-out rows, at the threshold (0.5 without one)
+    cutoff = DEFAULT_THRESHOLD if threshold is None else threshold
+    cm = np.zeros((2, 2), dtype=np.int64)
+    for X, y, is_test, _ in read_chunks(path, features, cutoffs, chunk_size):
+        if is_test.any():
+            malignant = 1 / (1 + np.exp(-(X[is_test] @ weights + model.intercept_[0])))
+            predicted = (malignant >= cutoff).astype(np.int8)
+            np.add.at(cm, (y[is_test], predicted), 1)
+    accuracy = np.trace(cm) / cm.sum() if cm.sum() else float('nan')
+    return model, accuracy, cm
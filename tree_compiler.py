@@ -0,0 +1,153 @@
+"""
+Compiled Decision Trees
+=======================
+Purpose: Serve the decision tree (or a forest of them) from a few flat NumPy
+arrays, scoring whole batches without walking the tree row by row.
+
+HOW IT WORKS:
+compile_tree() copies the fitted tree(s) into contiguous arrays:
+    feature[node], threshold[node]   the split test  x[feature] <= threshold
+    left[node], right[node]          where each answer goes
+    proba[node]                      class probabilities at the leaves
+Leaves point to themselves, so after `depth` steps every row has reached its
+leaf. Each step moves ALL rows (and all trees) one level down with a single
+vectorized gather + compare, instead of a Python-level walk per row.
+
+Inputs are compared as float32, exactly like scikit-learn does internally,
+so predict() / predict_proba() give the same results as the original model.
+For forests the per-tree probabilities are averaged (like RandomForestClassifier).
+
+Usage:
+    compiled = compile_tree(model_dt)
+    compiled.save('decision_tree.npz')
+    compiled = CompiledTrees.load('decision_tree.npz')
+    risk = compiled.predict_proba(X)[:, 1]
+"""
+
+import json
+
+import numpy as np
+
+COMPILED_TREE_FILE = 'decision_tree.npz'
+BLOCK_SIZE = 16_384  # (row, tree) pairs moved down the trees at a time
+
+
+class CompiledTrees:
+    """One or more compiled trees, all evaluated together."""
+
+    def __init__(self, feature, threshold, left, right, missing_left, proba, roots, depth, classes,
+                 feature_names=None, metadata=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        self.missing_left = np.ascontiguousarray(missing_left, dtype=bool)
+        self.proba = np.ascontiguousarray(proba, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.depth = int(depth)
+        self.classes_ = np.asarray(classes)
+        self.feature_names = None if feature_names is None else list(feature_names)
+        self.metadata = metadata or {}
+
+        # Scoring layout: children[2 * node + went_right], and float32 thresholds
+        # rounded DOWN, so for any float32 x:  x <= threshold32  <=>  x <= threshold
+        self._children = np.column_stack([self.left, self.right]).ravel()
+        threshold32 = self.threshold.astype(np.float32)
+        too_high = threshold32.astype(np.float64) > self.threshold
+        threshold32[too_high] = np.nextafter(threshold32[too_high], np.float32(-np.inf))
+        self._threshold32 = threshold32
+
+    def _matrix(self, X):
+        # DataFrames are reordered by name, arrays must already be in feature order
+        if hasattr(X, 'columns') and self.feature_names is not None:
+            X = X[self.feature_names]
+        X = np.ascontiguousarray(X)
+        if X.dtype not in (np.float32, np.float64):
+            X = X.astype(np.float64)
+        return X
+
+    def apply(self, X, block_size=BLOCK_SIZE):
+        """Leaf index of every row in every tree: shape (n_rows, n_trees)."""
+        X = self._matrix(X)
+        n_rows, n_features = X.shape
+        n_trees = len(self.roots)
+        flat = X.ravel()
+        check_missing = self.missing_left.any()
+        leaves = np.empty((n_rows, n_trees), dtype=np.int32)
+
+        # Blocks of rows keep the per-level temporaries in cache
+        rows_per_block = max(1, block_size // n_trees)
+        for start in range(0, n_rows, rows_per_block):
+            stop = min(start + rows_per_block, n_rows)
+            row_offsets = (np.arange(start, stop, dtype=np.int64) * n_features)[:, None]
+            nodes = np.broadcast_to(self.roots, (stop - start, n_trees)).copy()
+            for _ in range(self.depth):
+                # Only the gathered values are cast to float32 (what scikit-learn compares), not all of X
+                values = flat[row_offsets + self.feature[nodes]].astype(np.float32)
+                go_right = ~(values <= self._threshold32[nodes])  # NaN goes right...
+                if check_missing:
+                    go_right &= ~(np.isnan(values) & self.missing_left[nodes])  # ...unless trained otherwise
+                nodes = self._children[2 * nodes + go_right]
+            leaves[start:stop] = nodes
+        return leaves
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        if leaves.shape[1] == 1:
+            return self.proba[leaves[:, 0]]
+        return self.proba[leaves].mean(axis=1)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, path=COMPILED_TREE_FILE):
+        np.savez(path, feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+                 missing_left=self.missing_left, proba=self.proba, roots=self.roots,
+                 depth=np.int64(self.depth), classes=self.classes_,
+                 feature_names=np.array(self.feature_names or [], dtype=str),
+                 metadata=np.array(json.dumps(self.metadata)))
+
+    @classmethod
+    def load(cls, path=COMPILED_TREE_FILE):
+        with np.load(path) as data:
+            feature_names = [str(name) for name in data['feature_names']] or None
+            return cls(data['feature'], data['threshold'], data['left'], data['right'], data['missing_left'],
+                       data['proba'], data['roots'], data['depth'], data['classes'], feature_names,
+                       json.loads(str(data['metadata'])))
+
+
+def compile_tree(model, metadata=None):
+    """
+    Flatten a fitted DecisionTreeClassifier, or a forest with estimators_
+    (RandomForestClassifier, ExtraTreesClassifier), into a CompiledTrees.
+    """
+    estimators = getattr(model, 'estimators_', [model])
+    parts = {'feature': [], 'threshold': [], 'left': [], 'right': [], 'missing_left': [], 'proba': []}
+    roots = []
+    offset = 0
+    depth = 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+        own = np.arange(offset, offset + n)
+
+        # Leaves loop back to themselves with a test that never matters
+        parts['feature'].append(np.where(is_leaf, 0, tree.feature))
+        parts['threshold'].append(np.where(is_leaf, np.inf, tree.threshold))
+        parts['left'].append(np.where(is_leaf, own, tree.children_left + offset))
+        parts['right'].append(np.where(is_leaf, own, tree.children_right + offset))
+        missing = getattr(tree, 'missing_go_to_left', np.zeros(n, dtype=np.uint8))
+        parts['missing_left'].append(np.asarray(missing, dtype=bool) & ~is_leaf)
+
+        value = tree.value[:, 0, :]
+        parts['proba'].append(value / value.sum(axis=1, keepdims=True))
+
+        roots.append(offset)
+        offset += n
+        depth = max(depth, tree.max_depth)
+
+    arrays = {name: np.concatenate(values) for name, values in parts.items()}
+    return CompiledTrees(roots=roots, depth=depth, classes=model.classes_,
+                         feature_names=getattr(model, 'feature_names_in_', None),
+                         metadata=dict(metadata or {}, model_type=type(model).__name__), **arrays)
@@ -0,0 +1,248 @@
+"""
+Ingest Validation with a Quarantine File
+========================================
+Purpose: Check every row of a data.csv-style file before it is loaded, fix
+what can be fixed (missing measurements) and set aside what can't, with the
+reason, in a quarantine CSV.
+
+WHY WE DO THIS:
+04_data_cleaning.sql only looks at radius_mean and area_mean, fills missing
+values with a correlated `SELECT AVG(...)` per updated row and rewrites the
+diagnosis of every row. Here all 30 measurement columns are checked, per
+chunk, with whole-array masks:
+
+    missing_id          id is empty or not a whole number
+    duplicate_id        id already seen (in this chunk or an earlier one)
+    unknown_diagnosis   diagnosis is not M or B after trimming/uppercasing
+    negative_value      a measurement below 0
+    out_of_range        a measurement above RANGE_FACTOR x the largest value
+                        of the reference data (data.csv), or not a number
+
+Rows with any of these go to the quarantine file (reason codes joined by
+';', plus the columns involved). Missing measurements are NOT a reason to
+drop a row: they are filled with the mean of the row's diagnosis from the
+reference profile (profiling.py, computed once and cached by file hash).
+
+Usage:
+    python validation.py --data new_batch.csv                  # report + quarantine.csv
+    python validation.py --data new_batch.csv --output clean.csv
+    python SQL_Analysis/load_data_alternative.py --mode bulk --validate
+
+    validator = Validator.from_reference('data.csv')
+    accepted, quarantined = validator.validate(chunk)
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from profiling import profile_csv
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+REFERENCE_CSV = os.path.join(PROJECT_ROOT, 'data.csv')
+QUARANTINE_FILE = 'quarantine.csv'
+CHUNK_SIZE = 100_000
+VALID_DIAGNOSES = ('M', 'B')
+RANGE_FACTOR = 2.0
+
+REASONS = ('missing_id', 'duplicate_id', 'unknown_diagnosis', 'negative_value', 'out_of_range')
+
+
+class Validator:
+    """
+    Validates chunks of rows against reference statistics.
+    Keeps the ids seen so far (a sorted int64 array), so duplicates are found
+    across chunks; use one Validator per file.
+    """
+
+    def __init__(self, columns, upper_limits, class_means, overall_means):
+        self.columns = list(columns)  # Measurement columns, database spelling ('concave_points_mean')
+        self.upper_limits = np.asarray(upper_limits, dtype=np.float64)
+        self.class_means = {label: np.asarray(means, dtype=np.float64) for label, means in class_means.items()}
+        self.overall_means = np.asarray(overall_means, dtype=np.float64)
+        self._seen_ids = np.empty(0, dtype=np.int64)
+        self.counts = dict.fromkeys(('rows', 'accepted', 'quarantined', 'imputed_values') + REASONS, 0)
+
+    @classmethod
+    def from_reference(cls, reference_csv=REFERENCE_CSV, range_factor=RANGE_FACTOR):
+        """Limits and imputation means from the profile of a trusted file (cached by its hash)."""
+        profile = profile_csv(reference_csv)
+        overall = profile.overall()
+        class_means = {label: profile.classes[label].mean for label in VALID_DIAGNOSES if label in profile.classes}
+        return cls(profile.columns, overall.maximum * range_factor, class_means, overall.mean)
+
+    def _measurement_columns(self, chunk):
+        by_db_name = {column.strip().replace(' ', '_'): column for column in chunk.columns}
+        missing = [column for column in self.columns if column not in by_db_name]
+        if missing:
+            raise ValueError(f"Missing measurement columns: {', '.join(missing)}")
+        return [by_db_name[column] for column in self.columns]
+
+    def _duplicate_ids(self, ids, valid):
+        """True for ids seen before (earlier chunk or earlier in this chunk); remembers the new ones."""
+        duplicate = np.zeros(len(ids), dtype=bool)
+        candidates = np.flatnonzero(valid)
+        values = ids[candidates]
+
+        if len(self._seen_ids):
+            positions = np.searchsorted(self._seen_ids, values).clip(max=len(self._seen_ids) - 1)
+            duplicate[candidates[self._seen_ids[positions] == values]] = True
+
+        # Within the chunk: every occurrence after the first
+        _, first = np.unique(values, return_index=True)
+        repeated = np.ones(len(values), dtype=bool)
+        repeated[first] = False
+        duplicate[candidates[repeated]] = True
+
+        new_ids = np.unique(ids[valid & ~duplicate])
+        # Both parts are sorted, so the stable sort is a linear-time merge
+        self._seen_ids = np.sort(np.concatenate([self._seen_ids, new_ids]), kind='stable')
+        return duplicate
+
+    def validate(self, chunk):
+        """
+        Split a chunk (CSV column names) into (accepted, quarantined) DataFrames.
+        Accepted rows have a clean diagnosis and no missing measurements (imputed).
+        Quarantined rows keep their original values plus 'reason' and 'columns'.
+        """
+        measurement_names = self._measurement_columns(chunk)
+        n_rows = len(chunk)
+
+        ids = pd.to_numeric(chunk['id'], errors='coerce').to_numpy(dtype=np.float64)
+        id_ok = ~np.isnan(ids) & (ids == np.round(ids))
+        int_ids = np.where(id_ok, ids, 0).astype(np.int64)
+
+        diagnosis = chunk['diagnosis'].astype(str).str.strip().str.upper().to_numpy()
+        diagnosis_ok = np.isin(diagnosis, VALID_DIAGNOSES)
+
+        raw = chunk[measurement_names]
+        if all(pd.api.types.is_numeric_dtype(dtype) for dtype in raw.dtypes):
+            values = raw.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:  # Some text in the columns: it becomes NaN here and out_of_range below
+            values = raw.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+        not_a_number = np.isnan(values) & raw.notna().to_numpy()  # Text in a numeric column
+        missing = np.isnan(values) & ~not_a_number
+        negative = values < 0
+        too_large = (values > self.upper_limits) | not_a_number
+
+        masks = {
+            'missing_id': ~id_ok,
+            'duplicate_id': self._duplicate_ids(int_ids, id_ok),
+            'unknown_diagnosis': ~diagnosis_ok,
+            'negative_value': negative.any(axis=1),
+            'out_of_range': too_large.any(axis=1),
+        }
+        bad = np.logical_or.reduce(list(masks.values()))
+
+        # Missing measurements of good rows: the class mean from the reference data
+        accepted = chunk[~bad].copy()
+        accepted['diagnosis'] = diagnosis[~bad]
+        fill = missing[~bad]
+        if fill.any():
+            filled = np.where(fill, self.overall_means, values[~bad])
+            for label, means in self.class_means.items():
+                filled = np.where(fill & (diagnosis[~bad] == label)[:, None], means, filled)
+            accepted[measurement_names] = filled
+        self.counts['imputed_values'] += int(fill.sum())
+
+        quarantined = chunk[bad].copy()
+        if bad.any():
+            reason_matrix = np.column_stack([masks[reason][bad] for reason in REASONS])
+            quarantined['reason'] = [';'.join(np.asarray(REASONS)[row]) for row in reason_matrix]
+            column_matrix = (negative | too_large)[bad]
+            names = np.asarray(self.columns)
+            quarantined['columns'] = [';'.join(names[row]) for row in column_matrix]
+        else:
+            quarantined['reason'] = pd.Series(dtype=object)
+            quarantined['columns'] = pd.Series(dtype=object)
+
+        self.counts['rows'] += n_rows
+        self.counts['accepted'] += int((~bad).sum())
+        self.counts['quarantined'] += int(bad.sum())
+        for reason, mask in masks.items():
+            self.counts[reason] += int(mask.sum())
+        return accepted, quarantined
+
+
+class QuarantineWriter:
+    """Appends quarantined rows to one CSV (header written once)."""
+
+    def __init__(self, path=QUARANTINE_FILE):
+        self.path = path
+        self.rows = 0
+        if os.path.exists(path):
+            os.remove(path)
+
+    def write(self, quarantined):
+        if len(quarantined):
+            quarantined.to_csv(self.path, mode='a', header=self.rows == 0, index=False)
+            self.rows += len(quarantined)
+
+
+def validate_frame(df, validator, quarantine_path=QUARANTINE_FILE, chunk_size=CHUNK_SIZE):
+    """Validate an in-memory DataFrame chunk by chunk; returns the accepted rows."""
+    writer = QuarantineWriter(quarantine_path)
+    parts = []
+    for start in range(0, len(df), chunk_size):
+        accepted, quarantined = validator.validate(df.iloc[start:start + chunk_size])
+        parts.append(accepted)
+        writer.write(quarantined)
+    return pd.concat(parts) if parts else df.iloc[:0]
+
+
+def validate_csv(csv_path, output_path, validator, quarantine_path=QUARANTINE_FILE, chunk_size=CHUNK_SIZE):
+    """
+    Stream a CSV through the validator: accepted rows to output_path (None = don't write them),
+    the rest to the quarantine file. Writing CSV text is far slower than validating
+    (pandas formats every float), so skip output_path when only the check is needed.
+    """
+    writer = QuarantineWriter(quarantine_path)
+    header = pd.read_csv(csv_path, nrows=0).columns
+    columns = [column for column in header if not column.startswith('Unnamed')]
+    first = True
+    for chunk in pd.read_csv(csv_path, usecols=columns, chunksize=chunk_size):
+        accepted, quarantined = validator.validate(chunk)
+        if output_path:
+            accepted.to_csv(output_path, mode='w' if first else 'a', header=first, index=False)
+        writer.write(quarantined)
+        first = False
+    return validator.counts
+
+
+def print_counts(counts, seconds=None):
+    rate = f" in {seconds:.2f}s ({counts['rows'] / seconds:,.0f} rows/s)" if seconds else ""
+    print(f"✓ Validated {counts['rows']:,} rows{rate}")
+    print(f"  Accepted:    {counts['accepted']:,} ({counts['imputed_values']:,} missing values imputed)")
+    print(f"  Quarantined: {counts['quarantined']:,}")
+    for reason in REASONS:
+        if counts[reason]:
+            print(f"    {reason}: {counts[reason]:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a data.csv-style file and quarantine bad rows.")
+    parser.add_argument('--data', required=True, help="CSV to validate")
+    parser.add_argument('--output', help="Also write the accepted (imputed) rows to this CSV")
+    parser.add_argument('--quarantine', default=QUARANTINE_FILE, help=f"Rejected rows (default: {QUARANTINE_FILE})")
+    parser.add_argument('--reference', default=REFERENCE_CSV, help="Trusted data for limits and imputation means")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"VALIDATING {args.data}")
+    print("=" * 60)
+    validator = Validator.from_reference(args.reference)
+    start = time.perf_counter()
+    counts = validate_csv(args.data, args.output, validator, args.quarantine, args.chunk_size)
+    print_counts(counts, time.perf_counter() - start)
+    if args.output:
+        print(f"✓ Accepted rows saved to {args.output}")
+    if counts['quarantined']:
+        print(f"✓ Quarantined rows saved to {args.quarantine}")
+
+
+if __name__ == "__main__":
+    main()